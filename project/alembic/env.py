@@ -5,6 +5,7 @@ from alembic import context
 from app.database import Base
 from app.models.user import User      # noqa: F401
 from app.models.article import Article  # noqa: F401
+from app.models.stats import AuthorArticleStats, DailyArticleStats  # noqa: F401
 
 config = context.config
 if config.config_file_name is not None:
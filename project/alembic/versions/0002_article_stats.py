@@ -0,0 +1,50 @@
+"""article statistics rollups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-02-01 00:00:00
+"""
+from typing import Sequence, Union
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "author_article_stats",
+        sa.Column("author_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("article_count", sa.Integer(), nullable=False, server_default="0"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "idx_author_article_stats_count", "author_article_stats", ["article_count"], if_not_exists=True
+    )
+    op.create_table(
+        "daily_article_stats",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("article_count", sa.Integer(), nullable=False, server_default="0"),
+        if_not_exists=True,
+    )
+
+    # Backfill once from the existing rows; the write routes keep them current afterwards
+    op.execute("""
+        INSERT INTO author_article_stats (author_id, article_count)
+        SELECT author_id, COUNT(*) FROM articles GROUP BY author_id
+        ON CONFLICT (author_id) DO UPDATE SET article_count = EXCLUDED.article_count
+    """)
+    # Days are UTC like app.services.stats, not the session time zone
+    op.execute("""
+        INSERT INTO daily_article_stats (day, article_count)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, COUNT(*) FROM articles GROUP BY 1
+        ON CONFLICT (day) DO UPDATE SET article_count = EXCLUDED.article_count
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("daily_article_stats")
+    op.drop_table("author_article_stats")
@@ -0,0 +1,106 @@
+"""range-partition articles by created_at (monthly)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-03-01 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENSURE_PARTITIONS_FN = """
+    CREATE OR REPLACE FUNCTION ensure_article_partitions(months_ahead integer DEFAULT 3, from_month date DEFAULT NULL)
+    RETURNS integer LANGUAGE plpgsql AS $$
+    DECLARE
+        month_start date := date_trunc('month', COALESCE(from_month, now()::date))::date;
+        last_month date := (date_trunc('month', now()) + make_interval(months => months_ahead))::date;
+        month_end date;
+        part_name text;
+        stranded boolean;
+        created integer := 0;
+    BEGIN
+        -- Serialise concurrent callers (every worker runs this on startup)
+        PERFORM pg_advisory_xact_lock(hashtext('ensure_article_partitions'));
+        WHILE month_start <= last_month LOOP
+            part_name := format('articles_p%s', to_char(month_start, 'YYYYMM'));
+            month_end := (month_start + interval '1 month')::date;
+            IF to_regclass(part_name) IS NULL THEN
+                -- PARTITION OF fails while the default partition holds rows of that month:
+                -- detach the default, create the month, move the rows over, attach it again
+                stranded := EXISTS (
+                    SELECT 1 FROM articles_default WHERE created_at >= month_start AND created_at < month_end
+                );
+                IF stranded THEN
+                    ALTER TABLE articles DETACH PARTITION articles_default;
+                END IF;
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF articles FOR VALUES FROM (%L) TO (%L)',
+                    part_name, month_start, month_end
+                );
+                IF stranded THEN
+                    WITH moved AS (
+                        DELETE FROM articles_default
+                        WHERE created_at >= month_start AND created_at < month_end
+                        RETURNING *
+                    )
+                    INSERT INTO articles SELECT * FROM moved;
+                    ALTER TABLE articles ATTACH PARTITION articles_default DEFAULT;
+                END IF;
+                created := created + 1;
+            END IF;
+            month_start := month_end;
+        END LOOP;
+        RETURN created;
+    END $$
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE articles RENAME TO articles_legacy")
+    op.execute("""
+        CREATE TABLE articles (LIKE articles_legacy INCLUDING DEFAULTS)
+        PARTITION BY RANGE (created_at)
+    """)
+    op.execute("UPDATE articles_legacy SET created_at = now() WHERE created_at IS NULL")
+    op.execute("ALTER TABLE articles ALTER COLUMN created_at SET NOT NULL")
+    op.execute("CREATE TABLE articles_default PARTITION OF articles DEFAULT")
+    op.execute(ENSURE_PARTITIONS_FN)
+    op.execute("""
+        SELECT ensure_article_partitions(
+            3, COALESCE((SELECT min(created_at)::date FROM articles_legacy), now()::date)
+        )
+    """)
+
+    op.execute("INSERT INTO articles SELECT * FROM articles_legacy")
+    op.execute("ALTER SEQUENCE articles_id_seq OWNED BY articles.id")
+    op.execute("DROP TABLE articles_legacy")
+
+    # The partition key has to be part of every unique constraint
+    op.execute("ALTER TABLE articles ADD PRIMARY KEY (id, created_at)")
+    op.execute("""
+        ALTER TABLE articles ADD CONSTRAINT articles_author_id_fkey
+        FOREIGN KEY (author_id) REFERENCES users(id) ON DELETE CASCADE
+    """)
+    op.execute("CREATE INDEX idx_articles_title ON articles (title)")
+    op.execute("CREATE INDEX idx_articles_author ON articles (author_id)")
+    op.execute("CREATE INDEX idx_articles_created_at ON articles (created_at)")
+
+
+def downgrade() -> None:
+    op.execute("CREATE TABLE articles_plain (LIKE articles INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO articles_plain SELECT * FROM articles")
+    op.execute("ALTER SEQUENCE articles_id_seq OWNED BY articles_plain.id")
+    op.execute("DROP TABLE articles CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS ensure_article_partitions(integer, date)")
+    op.execute("ALTER TABLE articles_plain RENAME TO articles")
+    op.execute("ALTER TABLE articles ADD PRIMARY KEY (id)")
+    op.execute("""
+        ALTER TABLE articles ADD CONSTRAINT articles_author_id_fkey
+        FOREIGN KEY (author_id) REFERENCES users(id) ON DELETE CASCADE
+    """)
+    op.execute("CREATE INDEX idx_articles_title ON articles (title)")
+    op.execute("CREATE INDEX idx_articles_author ON articles (author_id)")
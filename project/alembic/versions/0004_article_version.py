@@ -0,0 +1,23 @@
+"""article version column for optimistic concurrency
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-04-01 00:00:00
+"""
+from typing import Sequence, Union
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Added on the partitioned parent, so every partition gets it; constant default = no rewrite
+    op.add_column("articles", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    op.drop_column("articles", "version")
@@ -0,0 +1,53 @@
+"""article change sequence and tombstones for incremental sync
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-04-15 00:00:00
+"""
+from typing import Sequence, Union
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS article_change_seq")
+    op.add_column("articles", sa.Column("change_seq", sa.BigInteger(), nullable=True))
+
+    # Backfill in write order so a first sync pages through history oldest-first
+    op.execute("""
+        UPDATE articles AS a SET change_seq = ordered.seq
+        FROM (
+            SELECT id, created_at, row_number() OVER (ORDER BY updated_at, id) AS seq
+            FROM articles
+        ) AS ordered
+        WHERE a.id = ordered.id AND a.created_at = ordered.created_at
+    """)
+    op.execute("SELECT setval('article_change_seq', COALESCE((SELECT MAX(change_seq) FROM articles), 0) + 1, false)")
+    op.alter_column(
+        "articles", "change_seq", nullable=False, server_default=sa.text("nextval('article_change_seq')")
+    )
+    op.create_index("idx_articles_change_seq", "articles", ["change_seq"], if_not_exists=True)
+
+    op.create_table(
+        "article_tombstones",
+        sa.Column("article_id", sa.Integer(), primary_key=True),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.Column("change_seq", sa.BigInteger(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "idx_article_tombstones_change_seq", "article_tombstones", ["change_seq"], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("article_tombstones")
+    op.drop_index("idx_articles_change_seq", table_name="articles")
+    op.drop_column("articles", "change_seq")
+    op.execute("DROP SEQUENCE IF EXISTS article_change_seq")
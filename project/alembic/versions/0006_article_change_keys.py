@@ -0,0 +1,25 @@
+"""lock-free article change keys
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-05-01 00:00:00
+"""
+from typing import Sequence, Union
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mirrors app.models.article.CHANGE_KEY_SQL; existing keys are smaller, so cursors stay valid
+CHANGE_KEY_SQL = "(pg_current_xact_id()::text::bigint << 24) | (nextval('article_change_seq') & 16777215)"
+
+
+def upgrade() -> None:
+    op.alter_column("articles", "change_seq", server_default=sa.text(CHANGE_KEY_SQL))
+
+
+def downgrade() -> None:
+    op.alter_column("articles", "change_seq", server_default=sa.text("nextval('article_change_seq')"))
@@ -0,0 +1,22 @@
+"""article title prefix index
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2024-05-08 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # idx_articles_title follows the database collation, which LIKE 'prefix%' cannot use
+    op.execute("CREATE INDEX IF NOT EXISTS idx_articles_title_pattern ON articles (title text_pattern_ops)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_articles_title_pattern")
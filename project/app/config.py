@@ -10,6 +10,150 @@ class Settings(BaseSettings):
     ALGORITHM: str = 'HS256'
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Statement caching: SQLAlchemy compiled cache size, and server-side prepare after N
+    # executions when DATABASE_URL uses the psycopg (v3) driver (postgresql+psycopg://)
+    DB_QUERY_CACHE_SIZE: int = 1200
+    DB_PREPARE_THRESHOLD: int = 2
+
+    # Production serving (app/server.py); WEB_CONCURRENCY=0 sizes workers from available CPUs
+    WEB_CONCURRENCY: int = 0
+    BIND: str = '0.0.0.0:8000'
+    KEEPALIVE_TIMEOUT: int = 5
+    GRACEFUL_TIMEOUT: int = 30
+    WORKER_TIMEOUT: int = 60
+    MAX_REQUESTS: int = 10000
+    MAX_REQUESTS_JITTER: int = 1000
+
+    # Optional article sharding by author_id: shard name -> database URL. Users stay on
+    # DATABASE_URL; names (not URLs) are hashed onto the ring, so keep them stable
+    ARTICLE_SHARDS: dict[str, str] = {}
+    ARTICLE_SHARD_VNODES: int = 128
+    # Article ids each worker reserves from the primary at a time
+    ARTICLE_ID_BLOCK_SIZE: int = 1000
+
+    # Monthly partitions of articles created ahead of time (Postgres only)
+    ARTICLE_PARTITION_MONTHS_AHEAD: int = 3
+
+    # Cold storage for old articles (scripts/archive_articles.py)
+    ARCHIVE_DIR: str = 'archive'
+    ARCHIVE_AFTER_DAYS: int = 365
+    ARCHIVE_ROW_GROUP_SIZE: int = 256
+
+    # Adaptive concurrency limiter (app/middleware/concurrency.py)
+    LIMITER_ENABLED: bool = True
+    LIMITER_INITIAL_LIMIT: int = 64
+    LIMITER_MIN_LIMIT: int = 4
+    LIMITER_MAX_LIMIT: int = 512
+    LIMITER_LATENCY_TOLERANCE: float = 2.0
+    LIMITER_BACKOFF: float = 0.9
+    LIMITER_MAX_QUEUE: int = 256
+    LIMITER_MAX_WAIT_MS: int = 500
+    # Longest matching path prefix wins; unmatched paths are "normal"
+    LIMITER_ROUTE_PRIORITIES: dict[str, str] = {
+        "/health": "critical",
+        "/auth/login": "critical",
+        "/metrics": "critical",
+        "/articles/search": "low",
+        "/articles/stream": "exempt",
+    }
+
+    # Per-route Postgres statement_timeout in ms (longest path prefix wins; 0 = no deadline)
+    DEFAULT_STATEMENT_TIMEOUT_MS: int = 0
+    STATEMENT_TIMEOUTS_MS: dict[str, int] = {
+        "/articles/search": 5000,
+        "/users/search": 5000,
+        "/stats": 10000,
+    }
+    # A read waits this long for an identical in-flight read when its route has no deadline
+    SINGLE_FLIGHT_MAX_WAIT_MS: int = 2000
+
+    # On-demand profiling (admin + "X-Profile: 1")
+    PROFILE_DIR: str = 'profiles'
+    PROFILE_KEEP: int = 50
+    PROFILE_SAMPLE_INTERVAL_MS: float = 1.0
+
+    # Slow-request journal (SLOW_REQUEST_MS=0 disables it)
+    SLOW_REQUEST_MS: float = 1000
+    SLOW_JOURNAL_PATH: str = 'slow_requests.journal'
+    SLOW_JOURNAL_SLOTS: int = 256
+    SLOW_JOURNAL_SLOT_BYTES: int = 32768
+    SLOW_JOURNAL_MAX_STATEMENTS: int = 200
+
+    # Logging: JSON lines through a bounded queue drained by a background thread
+    LOG_LEVEL: str = 'INFO'
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_ACCESS: bool = True
+    LOG_SLOW_SQL_MS: float = 250
+
+    # Title autocomplete (GET /articles/suggest); past SUGGEST_MAX_ENTRIES titles the
+    # in-memory index is dropped and the idx_articles_title_pattern btree serves suggestions
+    SUGGEST_MAX_ENTRIES: int = 500000
+    SUGGEST_KEY_CHARS: int = 64
+    SUGGEST_REFRESH_SECONDS: float = 60
+    SUGGEST_SYNC_BATCH: int = 5000
+
+    # Semantic search (GET /articles/semantic-search). SEMANTIC_EMBEDDER is 'hash' or a
+    # 'module:factory' path; SEMANTIC_INDEX_DIR holds the memory-mapped matrix ('' = none)
+    SEMANTIC_ENABLED: bool = True
+    SEMANTIC_EMBEDDER: str = 'hash'
+    SEMANTIC_DIM: int = 256
+    SEMANTIC_INDEX_DIR: str = 'semantic_index'
+    SEMANTIC_REFRESH_SECONDS: float = 60
+    SEMANTIC_SYNC_BATCH: int = 500
+
+    # Related articles (GET /articles/{id}/related) and the duplicate check on create:
+    # MinHash over RELATED_SHINGLE_WORDS-word shingles, LSH with NUM_PERM / BANDS rows per band
+    RELATED_ENABLED: bool = True
+    RELATED_NUM_PERM: int = 128
+    RELATED_BANDS: int = 32
+    RELATED_SHINGLE_WORDS: int = 3
+    RELATED_MIN_SIMILARITY: float = 0.1
+    RELATED_DUPLICATE_THRESHOLD: float = 0.8
+    RELATED_REFRESH_SECONDS: float = 300
+    RELATED_SYNC_BATCH: int = 1000
+
+    # User import (POST /users/bulk, scripts/create_user.py --from-csv); bcrypt runs in a
+    # process pool of PASSWORD_HASH_WORKERS (0 = CPUs / server workers) for batches of
+    # PARALLEL_MIN or more. Bigger imports than USER_BULK_MAX_ROWS go through the CSV script.
+    USER_BULK_MAX_ROWS: int = 200
+    USER_BULK_BATCH_SIZE: int = 1000
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_PARALLEL_MIN: int = 32
+
+    # Failed-login backoff (per username and per client IP), checked before any bcrypt work
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_FREE_FAILURES: int = 5
+    LOGIN_IP_FREE_FAILURES: int = 50
+    LOGIN_BACKOFF_BASE_SECONDS: float = 1.0
+    LOGIN_BACKOFF_MAX_SECONDS: float = 900
+    LOGIN_FAILURE_TTL_SECONDS: float = 3600
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000
+
+    # Worker threads for sync handlers and dependencies (AnyIO's default limiter is 40).
+    # Requests spending THREADPOOL_WAIT_DOMINANT_RATIO of their latency waiting are flagged.
+    THREADPOOL_SIZE: int = 40
+    THREADPOOL_WAIT_DOMINANT_RATIO: float = 0.5
+    THREADPOOL_DIAGNOSE_MIN_MS: float = 50
+    # How often a no-op is queued on the threadpool to measure the wait for a thread
+    THREADPOOL_PROBE_SECONDS: float = 1.0
+
+    # Startup warm-up; /health/ready answers 503 until it has finished
+    WARMUP_ENABLED: bool = True
+    WARMUP_POOL_CONNECTIONS: int = 5
+    WARMUP_RECENT_ROWS: int = 50
+
+    # Multi-get (GET /articles/batch?ids=..., GET /users/batch?ids=...)
+    MULTI_GET_MAX_IDS: int = 100
+
+    # Incremental sync (GET /articles/changes)
+    ARTICLE_CHANGES_DEFAULT_LIMIT: int = 100
+    ARTICLE_CHANGES_MAX_LIMIT: int = 1000
+
+    # Article change feed (GET /articles/stream)
+    ARTICLE_STREAM_QUEUE_SIZE: int = 1000
+    ARTICLE_STREAM_HEARTBEAT_SECONDS: float = 15.0
+
 
 settings = Settings()
 
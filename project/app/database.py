@@ -1,9 +1,21 @@
-﻿from sqlalchemy import create_engine
+﻿from fastapi import Request
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 from app.config import settings
+from app.services import deadlines
 
-engine = create_engine(settings.DATABASE_URL)
+
+def _engine_kwargs(url: str) -> dict:
+    kwargs = {"query_cache_size": settings.DB_QUERY_CACHE_SIZE}
+    # psycopg (v3) can prepare statements server-side; psycopg2 has no such support
+    if make_url(url).get_driver_name() == "psycopg":
+        kwargs["connect_args"] = {"prepare_threshold": settings.DB_PREPARE_THRESHOLD}
+    return kwargs
+
+
+engine = create_engine(settings.DATABASE_URL, **_engine_kwargs(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -11,8 +23,26 @@ class Base(DeclarativeBase):
     pass
 
 
-def get_db():
+sharded_db = None
+if settings.ARTICLE_SHARDS:
+    # Imported here: the sharding module needs the models, and the models need Base
+    from app.services.sharding import ShardedDatabase
+
+    shard_engines = {name: create_engine(url, **_engine_kwargs(url)) for name, url in settings.ARTICLE_SHARDS.items()}
+    sharded_db = ShardedDatabase(
+        engine,
+        shard_engines,
+        settings.ARTICLE_SHARD_VNODES,
+        settings.ARTICLE_ID_BLOCK_SIZE,
+        # every request thread may fan out at once
+        concurrency=settings.THREADPOOL_SIZE,
+    )
+    SessionLocal = sharded_db.sessionmaker
+
+
+def get_db(request: Request):
     db = SessionLocal()
+    deadlines.attach(db, request)
     try:
         yield db
     finally:
@@ -1,18 +1,108 @@
-﻿from fastapi import FastAPI
+﻿import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm.exc import StaleDataError
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.middleware.access_log import AccessLogMiddleware
+from app.middleware.concurrency import ConcurrencyLimitMiddleware
+from app.middleware.disconnect import DisconnectCancelMiddleware
+from app.middleware.journal import SlowRequestMiddleware
+from app.middleware.threadpool import ThreadpoolWaitMiddleware
+from app.routers import auth, users, articles, metrics, profiles, slow_requests, stats
+from app.services import deadlines, threadpool, warmup
+from app.services.events import shutdown_broker
+from app.services.logs import setup_logging, shutdown_logging
+from app.services.partitions import ensure_article_partitions_safely
+from app.services.related import keep_related_index_fresh
+from app.services.semantic import keep_semantic_index_fresh
+from app.services.suggest import keep_title_index_fresh
+from app.services.users import shutdown_hash_pool
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    setup_logging()
+    threadpool.install(settings.THREADPOOL_SIZE)
+    threadpool_probe_task = asyncio.create_task(threadpool.keep_probing())
+    await run_in_threadpool(ensure_article_partitions_safely)
+    if settings.WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(run_in_threadpool(warmup.warm_up))
+    else:
+        warmup_task = None
+        warmup.state["ready"] = True
+    title_index_task = asyncio.create_task(keep_title_index_fresh(build_first=not settings.WARMUP_ENABLED))
+    semantic_index_task = asyncio.create_task(keep_semantic_index_fresh(build_first=not settings.WARMUP_ENABLED))
+    related_index_task = asyncio.create_task(keep_related_index_fresh(build_first=not settings.WARMUP_ENABLED))
+    yield
+    threadpool_probe_task.cancel()
+    title_index_task.cancel()
+    semantic_index_task.cancel()
+    related_index_task.cancel()
+    if warmup_task is not None:
+        warmup_task.cancel()
+    shutdown_broker()
+    shutdown_hash_pool()
+    shutdown_logging()
 
-from app.routers import auth, users, articles
 
 app = FastAPI(
     title="Articles API",
     version="1.0.0",
     description="REST API with JWT auth and role-based access control",
+    lifespan=lifespan,
 )
 
+app.add_middleware(SlowRequestMiddleware)
+app.add_middleware(DisconnectCancelMiddleware)
+app.add_middleware(ThreadpoolWaitMiddleware)
+if settings.LIMITER_ENABLED:
+    app.add_middleware(ConcurrencyLimitMiddleware)
+app.add_middleware(AccessLogMiddleware)
+
+
+@app.exception_handler(OperationalError)
+async def operational_error_handler(request: Request, exc: OperationalError):
+    if not deadlines.is_query_cancelled(exc):
+        raise exc
+    deadlines.counters["deadline_exceeded"] += 1
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "Query deadline exceeded"},
+    )
+
+
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    # A versioned UPDATE/DELETE matched no row: someone else changed it since it was read
+    return JSONResponse(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        content={"detail": "Resource was modified concurrently; reload it and retry"},
+    )
+
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(articles.router)
+app.include_router(stats.router)
+app.include_router(metrics.router)
+app.include_router(profiles.router)
+app.include_router(slow_requests.router)
 
 
 @app.get("/health", tags=["health"])
 def health():
     return {"status": "ok"}
+
+
+@app.get("/health/ready", tags=["health"])
+def ready():
+    if not warmup.state["ready"]:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming_up"},
+        )
+    return {"status": "ready", "warmup": warmup.state}
@@ -0,0 +1,61 @@
+import logging
+import re
+import time
+import uuid
+
+from app.config import settings
+from app.services.logs import request_id
+
+logger = logging.getLogger("app.access")
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Accept a caller's id only if it is short and printable, so it can't forge log lines
+_VALID_ID = re.compile(rb"^[A-Za-z0-9._:-]{1,64}$")
+
+
+class AccessLogMiddleware:
+    """
+    Outermost middleware: assigns the request id (``X-Request-ID`` in, or a new one),
+    echoes it on the response and emits one structured access line per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(REQUEST_ID_HEADER, b"")
+        rid = incoming.decode() if _VALID_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id.set(rid)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER, rid.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if settings.LOG_ACCESS:
+                client = scope.get("client")
+                logger.info(
+                    "%s %s %s",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                        "client": client[0] if client else None,
+                    },
+                )
+            request_id.reset(token)
@@ -0,0 +1,209 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from app.config import settings
+from app.middleware.paths import longest_prefix
+from app.services import metrics
+
+CRITICAL, HIGH, NORMAL, LOW = "critical", "high", "normal", "low"
+EXEMPT = "exempt"
+
+# Fraction of the current limit each class may occupy. Critical requests are always admitted
+# (and counted), so /auth/login and /health are never starved by bulk traffic.
+SHARES = {CRITICAL: math.inf, HIGH: 1.0, NORMAL: 0.9, LOW: 0.5}
+_WAKE_ORDER = (CRITICAL, HIGH, NORMAL, LOW)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit driven by observed latency.
+
+    Each route keeps its own baseline, the lowest recent latency of that route, so a 1 ms
+    health check does not make a 15 ms read look congested. A sample slower than its
+    route's ``baseline * tolerance`` (or a 5xx) shrinks the limit multiplicatively, at most
+    once per latency window; otherwise the limit grows by roughly one per window while it
+    is in use.
+    """
+
+    def __init__(
+        self,
+        initial: int = None,
+        min_limit: int = None,
+        max_limit: int = None,
+        tolerance: float = None,
+        backoff: float = None,
+        max_queue: int = None,
+        max_wait: float = None,
+    ):
+        self.limit = float(initial or settings.LIMITER_INITIAL_LIMIT)
+        self.min_limit = min_limit or settings.LIMITER_MIN_LIMIT
+        self.max_limit = max_limit or settings.LIMITER_MAX_LIMIT
+        self.tolerance = tolerance or settings.LIMITER_LATENCY_TOLERANCE
+        self.backoff = backoff or settings.LIMITER_BACKOFF
+        self.max_queue = settings.LIMITER_MAX_QUEUE if max_queue is None else max_queue
+        self.max_wait = settings.LIMITER_MAX_WAIT_MS / 1000 if max_wait is None else max_wait
+        self.in_flight = 0
+        self.baselines: Dict[str, float] = {}
+        self._last_decrease = 0.0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {p: deque() for p in _WAKE_ORDER}
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    def _fits(self, priority: str) -> bool:
+        return self.in_flight < self.limit * SHARES[priority]
+
+    def _waiting(self) -> int:
+        return sum(1 for q in self._waiters.values() for f in q if not f.done())
+
+    def _has_waiters_ahead(self, priority: str) -> bool:
+        for p in _WAKE_ORDER:
+            if any(not f.done() for f in self._waiters[p]):
+                return True
+            if p == priority:
+                return False
+        return False
+
+    async def acquire(self, priority: str = NORMAL) -> bool:
+        if priority == CRITICAL or (self._fits(priority) and not self._has_waiters_ahead(priority)):
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if self.max_wait <= 0 or self._waiting() >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(fut)
+        self.queued += 1
+        try:
+            # The releasing request hands its slot over (in_flight already incremented)
+            await asyncio.wait_for(fut, self.max_wait)
+        except asyncio.CancelledError:
+            self._return_handed_slot(fut)
+            raise
+        except asyncio.TimeoutError:
+            self._return_handed_slot(fut)
+            self.rejected += 1
+            return False
+        self.admitted += 1
+        return True
+
+    def _return_handed_slot(self, fut: asyncio.Future):
+        # The slot may have been handed over just before the wait was cancelled or timed out
+        if fut.done() and not fut.cancelled() and fut.result():
+            self.in_flight -= 1
+            self._wake()
+
+    def release(self, latency: Optional[float], ok: bool = True, route: str = ""):
+        """Give the slot back; ``latency`` None leaves the limit alone (critical requests)."""
+        self.in_flight -= 1
+        if latency is not None:
+            self._observe(latency, ok, route)
+        self._wake()
+
+    def _observe(self, latency: float, ok: bool, route: str):
+        baseline = self.baselines.get(route)
+        if baseline is None or latency < baseline:
+            baseline = latency
+        else:
+            # Let the baseline drift up slowly so it follows a permanently slower backend
+            baseline += (latency - baseline) * 0.01
+        self.baselines[route] = baseline
+
+        now = time.monotonic()
+        if not ok or latency > baseline * self.tolerance:
+            if now - self._last_decrease >= latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif self.in_flight + 1 >= self.limit / 2:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _wake(self):
+        for priority in _WAKE_ORDER:
+            waiters = self._waiters[priority]
+            while waiters and (priority == CRITICAL or self._fits(priority)):
+                fut = waiters.popleft()
+                if fut.done():
+                    continue
+                self.in_flight += 1
+                fut.set_result(True)
+            if waiters:
+                return
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(max(self.baselines.values(), default=0) * self.tolerance))
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": self._waiting(),
+            "baseline_ms": {route: round(b * 1000, 2) for route, b in sorted(self.baselines.items())},
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
+
+
+def route_priority(path: str, priorities: Dict[str, str] = None) -> str:
+    priorities = settings.LIMITER_ROUTE_PRIORITIES if priorities is None else priorities
+    return longest_prefix(path, priorities, NORMAL)
+
+
+class ConcurrencyLimitMiddleware:
+    """Pure ASGI so long-lived streaming responses are not buffered."""
+
+    def __init__(self, app, limiter: AdaptiveLimiter = None):
+        self.app = app
+        self.limiter = limiter or AdaptiveLimiter()
+        metrics.register("concurrency_limiter", self.limiter.stats)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = route_priority(scope["path"])
+        if priority == EXEMPT:
+            await self.app(scope, receive, send)
+            return
+        if not await self.limiter.acquire(priority):
+            await self._reject(send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Critical requests are admitted regardless of the limit, so they do not steer it;
+            # the matched route template keys the baseline (unmatched paths share one)
+            latency = None if priority == CRITICAL else time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", "")
+            self.limiter.release(latency, ok=status_code < 500, route=route)
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": "Server is overloaded, retry later"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.limiter.retry_after()).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
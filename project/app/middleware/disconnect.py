@@ -0,0 +1,61 @@
+import asyncio
+
+from starlette.concurrency import run_in_threadpool
+
+from app.services.deadlines import cancel_sessions, request_sessions
+
+
+class DisconnectCancelMiddleware:
+    """
+    Cancels the request's running database statements when the client goes away.
+
+    A pump task owns the ASGI receive channel and forwards messages to the app through a
+    queue, so it notices ``http.disconnect`` even while a sync handler is blocked in the
+    threadpool. The cancelled handler fails fast and its session returns the connection.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        response_complete = False
+        disconnected = False
+
+        async def pump():
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected = True
+                queue.put_nowait(message)
+                if disconnected:
+                    if not response_complete:
+                        await run_in_threadpool(cancel_sessions, request_sessions(scope))
+                    return
+
+        async def receive_wrapper():
+            if disconnected and queue.empty():
+                return {"type": "http.disconnect"}
+            return await queue.get()
+
+        async def send_wrapper(message):
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        pump_task = asyncio.ensure_future(pump())
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            response_complete = True
+            if disconnected:
+                # Let an in-progress cancel finish rather than abandoning it half-way
+                await pump_task
+            else:
+                pump_task.cancel()
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.services import journal, threadpool
+from app.services.logs import request_id
+from app.services.tracing import RequestTrace, current_trace
+
+logger = logging.getLogger(__name__)
+
+
+class SlowRequestMiddleware:
+    """
+    Records requests slower than SLOW_REQUEST_MS into the slow-request journal.
+
+    SQL timings and pool wait are collected for every request through the trace context
+    variable. Once a request crosses the threshold, a timer on the event loop takes one
+    stack sample of the threadpool thread running the endpoint, while it is still stuck.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        threshold = settings.SLOW_REQUEST_MS / 1000
+        if scope["type"] != "http" or threshold <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = current_trace.set(trace)
+        stack = None
+        status_code = 500
+        duration = None
+        loop_thread = threading.get_ident()
+
+        def take_sample():
+            nonlocal stack
+            thread_id = trace.thread_id
+            if thread_id is not None and thread_id != loop_thread:
+                stack = journal.sample_stack(thread_id)
+
+        async def send_wrapper(message):
+            nonlocal status_code, duration
+            if message["type"] == "http.response.start":
+                # Time to headers: a long-lived stream is not slow just for staying open
+                status_code = message["status"]
+                duration = time.perf_counter() - start
+                timer.cancel()
+            await send(message)
+
+        start = time.perf_counter()
+        timer = asyncio.get_running_loop().call_later(threshold, take_sample)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            timer.cancel()
+            current_trace.reset(token)
+            if duration is None:
+                duration = time.perf_counter() - start
+            if duration >= threshold:
+                seq = await run_in_threadpool(
+                    journal.slow_journal.append,
+                    _entry(scope, trace, status_code, duration, stack),
+                )
+                logger.warning(
+                    "slow request journaled",
+                    extra={"journal_seq": seq, "duration_ms": round(duration * 1000, 3)},
+                )
+
+
+def _entry(scope, trace: RequestTrace, status_code: int, duration: float, stack) -> dict:
+    route = scope.get("route")
+    return {
+        "at": datetime.now(timezone.utc).isoformat(),
+        "request_id": request_id.get(),
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": getattr(route, "path", scope["path"]),
+        "path_params": scope.get("path_params", {}),
+        "query": parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True),
+        "status": status_code,
+        "duration_ms": round(duration * 1000, 3),
+        "pool_wait_ms": round(trace.pool_wait * 1000, 3),
+        "threadpool_wait_ms": round(threadpool.current_wait() * 1000, 3),
+        "sql": trace.sql,
+        "sql_dropped": trace.sql_dropped,
+        "stack": stack,
+    }
@@ -0,0 +1,12 @@
+from typing import Dict, TypeVar
+
+T = TypeVar("T")
+
+
+def longest_prefix(path: str, mapping: Dict[str, T], default: T) -> T:
+    """Value of the longest key in ``mapping`` that ``path`` starts with."""
+    best, best_len = default, -1
+    for prefix, value in mapping.items():
+        if path.startswith(prefix) and len(prefix) > best_len:
+            best, best_len = value, len(prefix)
+    return best
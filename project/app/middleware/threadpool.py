@@ -0,0 +1,34 @@
+import time
+
+from app.services import threadpool
+
+
+class ThreadpoolWaitMiddleware:
+    """Times each request's wait for a worker thread and flags requests dominated by it."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # threadpool.measure_wait fills in the wait once a worker thread picks the request up
+        wait = threadpool.RequestWait()
+        token = threadpool.request_wait.set(wait)
+        duration = None
+
+        async def send_wrapper(message):
+            nonlocal duration
+            if message["type"] == "http.response.start":
+                duration = time.perf_counter() - wait.entered
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            threadpool.request_wait.reset(token)
+            if duration is None:
+                duration = time.perf_counter() - wait.entered
+            threadpool.note_request(wait.seconds or 0.0, duration)
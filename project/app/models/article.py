@@ -1,7 +1,10 @@
 from datetime import datetime, timezone
+from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Integer, Index, Sequence, String, Text, ForeignKey, DateTime
+from sqlalchemy import event, func, select, text, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import backref, object_session, relationship
 
 from app.database import Base
 
@@ -10,14 +13,94 @@ def _now():
     return datetime.now(timezone.utc)
 
 
+# Shared by articles and tombstones; only PostgreSQL creates it
+article_change_seq = Sequence("article_change_seq", metadata=Base.metadata)
+
+
 class Article(Base):
     __tablename__ = "articles"
 
+    # On PostgreSQL the table key is (id, created_at) and id alone is not enforced unique;
+    # look articles up with a query on id, not Session.get
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, index=True)
     content = Column(Text, nullable=False)
-    author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), default=_now, nullable=False)
     updated_at = Column(DateTime(timezone=True), default=_now, onupdate=_now, nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Set on every insert/update by next_change_seq; readers stop at change_horizon
+    change_seq = Column(BigInteger, nullable=False, index=True)
+
+    # Deleting a user leaves their articles to the database's ON DELETE CASCADE
+    author = relationship("User", backref=backref("articles", passive_deletes=True))
+
+    # UPDATE/DELETE add "AND version = :expected" and bump it; zero rows raises StaleDataError
+    __mapper_args__ = {"version_id_col": version}
+    # Prefix LIKE can only use a btree that compares bytes, whatever the database collation
+    __table_args__ = (Index("idx_articles_title_pattern", "title", postgresql_ops={"title": "text_pattern_ops"}),)
+
+
+class ArticleTombstone(Base):
+    """A deleted article, kept so incremental sync clients learn about the delete."""
+
+    __tablename__ = "article_tombstones"
+
+    article_id = Column(Integer, primary_key=True)
+    author_id = Column(Integer, nullable=False)
+    change_seq = Column(BigInteger, nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True), default=_now, nullable=False)
+
+
+# PostgreSQL change keys: the writer's transaction id in the high bits, a sequence value
+# below it. Keys of one transaction stay together, ordered by transaction id.
+_XID_SHIFT = 24
+_XID_KEY = f"(pg_current_xact_id()::text::bigint << {_XID_SHIFT})"
+CHANGE_KEY_SQL = f"{_XID_KEY} | (nextval('article_change_seq') & {(1 << _XID_SHIFT) - 1})"
+# Every transaction that could still commit has an id at or above the snapshot's xmin
+CHANGE_HORIZON_SQL = f"(pg_snapshot_xmin(pg_current_snapshot())::text::bigint << {_XID_SHIFT})"
+_LAST_SEQ_KEY = "article_change_seq"
+
+
+def next_change_seq(connection: Connection) -> int:
+    """
+    Hand out the next article change key.
+
+    Keys alone are not a safe sync cursor: two writers can take 5 and 6 and commit 6
+    first, and a client that has read 6 never sees 5. On PostgreSQL no lock is taken;
+    instead the key carries the writer's transaction id and ``change_horizon`` tells
+    readers below which key every writer has finished. SQLite allows a single writer
+    at a time already.
+    """
+    if connection.dialect.name == "postgresql":
+        return connection.execute(text(f"SELECT {CHANGE_KEY_SQL}")).scalar_one()
+    highest = union_all(
+        select(func.max(Article.change_seq).label("seq")),
+        select(func.max(ArticleTombstone.change_seq).label("seq")),
+    ).subquery()
+    seq = (connection.execute(select(func.max(highest.c.seq))).scalar() or 0) + 1
+    # Rows of one batched flush get their numbers before any of them is inserted
+    transaction, handed_out = connection.info.get(_LAST_SEQ_KEY, (None, 0))
+    if transaction is connection.get_transaction():
+        seq = max(seq, handed_out + 1)
+    connection.info[_LAST_SEQ_KEY] = (connection.get_transaction(), seq)
+    return seq
+
+
+def change_horizon(connection: Connection) -> Optional[int]:
+    """Keys below this belong to finished transactions (None: every visible key does)."""
+    if connection.dialect.name == "postgresql":
+        return connection.execute(text(f"SELECT {CHANGE_HORIZON_SQL}")).scalar_one()
+    return None
+
+
+@event.listens_for(Article, "before_insert")
+def _stamp_insert(mapper, connection, target: Article):
+    target.change_seq = next_change_seq(connection)
+
 
-    author = relationship("User", backref="articles")
+@event.listens_for(Article, "before_update")
+def _stamp_update(mapper, connection, target: Article):
+    # before_update also fires for objects that were touched without a net change
+    if object_session(target).is_modified(target, include_collections=False):
+        target.change_seq = next_change_seq(connection)
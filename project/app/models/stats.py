@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey
+
+from app.database import Base
+
+
+class AuthorArticleStats(Base):
+    __tablename__ = "author_article_stats"
+
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    article_count = Column(Integer, nullable=False, default=0, index=True)
+
+
+class DailyArticleStats(Base):
+    __tablename__ = "daily_article_stats"
+
+    day = Column(Date, primary_key=True)
+    article_count = Column(Integer, nullable=False, default=0)
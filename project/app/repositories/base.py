@@ -0,0 +1,79 @@
+from datetime import datetime
+from typing import List, Optional, Protocol, Tuple
+
+from app.models.article import Article
+from app.models.user import User
+
+
+class UserRepository(Protocol):
+    """
+    Storage for users, as the routes and the auth dependency see it.
+
+    Returned objects are read-only snapshots: change them through ``update``. Writes
+    are committed before they return.
+    """
+
+    def get(self, user_id: int) -> Optional[User]: ...
+
+    def get_by_username(self, username: str) -> Optional[User]: ...
+
+    def get_many(self, ids: List[int]) -> Tuple[List[User], List[int]]:
+        """Users in request order, plus the ids that were not found."""
+        ...
+
+    def list(self, offset: int, limit: int) -> List[User]: ...
+
+    def search(self, q: str, offset: int, limit: int) -> List[User]:
+        """Case-insensitive substring match on username or email."""
+        ...
+
+    def create(self, data: dict) -> Optional[User]:
+        """Hash ``data["password"]`` and insert; None if the username or email is taken."""
+        ...
+
+    def create_many(self, users: List[dict]) -> Tuple[int, List[str]]:
+        """Insert a batch, skipping conflicts; returns (created count, skipped usernames)."""
+        ...
+
+    def update(self, user: User, changes: dict) -> User: ...
+
+    def delete(self, user: User) -> None: ...
+
+
+class ArticleRepository(Protocol):
+    """
+    Storage for articles. Writes also publish the change event and keep the rollups;
+    a write against a ``version`` that is no longer current raises StaleDataError.
+    """
+
+    def get(self, article_id: int) -> Optional[Article]: ...
+
+    def get_many(self, ids: List[int]) -> Tuple[List[Article], List[int]]:
+        """Articles in request order, plus the ids that were not found."""
+        ...
+
+    def list(
+        self,
+        offset: int,
+        limit: int,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        author_id: Optional[int] = None,
+    ) -> List[Article]: ...
+
+    def search(
+        self,
+        q: str,
+        offset: int,
+        limit: int,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> List[Article]:
+        """Case-insensitive substring match on title or content."""
+        ...
+
+    def create(self, data: dict, author_id: int) -> Article: ...
+
+    def update(self, article: Article, changes: dict) -> Article: ...
+
+    def delete(self, article: Article) -> None: ...
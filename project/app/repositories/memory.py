@@ -0,0 +1,278 @@
+import itertools
+import threading
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.models.article import Article
+from app.models.user import User, UserRole
+from app.repositories.base import ArticleRepository, UserRepository
+from app.repositories.sql import get_article_repository, get_user_repository
+from app.services.events import Broker, get_broker
+from app.services.passwords import hash_password
+from app.services.users import hash_passwords
+
+_USER_FIELDS = [attr.key for attr in inspect(User).column_attrs]
+_ARTICLE_FIELDS = [attr.key for attr in inspect(Article).column_attrs]
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _replace(obj, fields: List[str], changes: dict):
+    # Stored objects are never mutated, so readers can hand them out without copying
+    values = {key: getattr(obj, key) for key in fields}
+    values.update(changes)
+    return type(obj)(**values)
+
+
+def _aware(moment: datetime) -> datetime:
+    return moment if moment.tzinfo is not None else moment.replace(tzinfo=timezone.utc)
+
+
+def _created_between(article: Article, created_from: Optional[datetime], created_to: Optional[datetime]) -> bool:
+    if created_from is not None and article.created_at < _aware(created_from):
+        return False
+    if created_to is not None and article.created_at >= _aware(created_to):
+        return False
+    return True
+
+
+class MemoryStore:
+    """
+    Users and articles in dicts, for tests and benchmarks that should not pay for a database.
+
+    ``articles`` keeps insertion order, which is id order, so pages are slices; lookups by
+    id, username, email and author are dict hits. Everything is lost with the process.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.users: Dict[int, User] = {}
+        self.user_ids_by_username: Dict[str, int] = {}
+        self.user_ids_by_email: Dict[str, int] = {}
+        self.articles: Dict[int, Article] = {}
+        # author id -> that author's article ids, in id order (a dict as an ordered set)
+        self.article_ids_by_author: Dict[int, Dict[int, None]] = {}
+        self._user_ids = itertools.count(1)
+        self._article_ids = itertools.count(1)
+
+    def next_user_id(self) -> int:
+        return next(self._user_ids)
+
+    def next_article_id(self) -> int:
+        return next(self._article_ids)
+
+
+def _get_many(rows: Dict[int, object], ids: List[int]) -> Tuple[list, List[int]]:
+    found = [rows[i] for i in ids if i in rows]
+    missing = [i for i in ids if i not in rows]
+    return found, missing
+
+
+class MemoryUserRepository:
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def get(self, user_id: int) -> Optional[User]:
+        return self.store.users.get(user_id)
+
+    def get_by_username(self, username: str) -> Optional[User]:
+        user_id = self.store.user_ids_by_username.get(username)
+        return self.store.users.get(user_id) if user_id is not None else None
+
+    def get_many(self, ids: List[int]) -> Tuple[List[User], List[int]]:
+        return _get_many(self.store.users, ids)
+
+    def list(self, offset: int, limit: int) -> List[User]:
+        with self.store.lock:
+            return list(islice(self.store.users.values(), offset, offset + limit))
+
+    def search(self, q: str, offset: int, limit: int) -> List[User]:
+        needle = q.casefold()
+        with self.store.lock:
+            found = (
+                user
+                for user in self.store.users.values()
+                if needle in user.username.casefold() or needle in user.email.casefold()
+            )
+            return list(islice(found, offset, offset + limit))
+
+    def _insert(self, row: dict) -> Optional[User]:
+        store = self.store
+        with store.lock:
+            if row["username"] in store.user_ids_by_username or row["email"] in store.user_ids_by_email:
+                return None
+            defaults = {"role": UserRole.user, "is_active": True}
+            user = User(**{**defaults, **row}, id=store.next_user_id(), created_at=_now())
+            store.users[user.id] = user
+            store.user_ids_by_username[user.username] = user.id
+            store.user_ids_by_email[user.email] = user.id
+            return user
+
+    @staticmethod
+    def _row(data: dict, hashed_password: str) -> dict:
+        row = {k: v for k, v in data.items() if k != "password"}
+        row["hashed_password"] = hashed_password
+        return row
+
+    def create(self, data: dict) -> Optional[User]:
+        return self._insert(self._row(data, hash_password(data["password"])))
+
+    def create_many(self, users: Iterable[dict]) -> Tuple[int, List[str]]:
+        users = list(users)
+        hashes = hash_passwords([u["password"] for u in users])
+        created = 0
+        skipped: List[str] = []
+        for data, hashed in zip(users, hashes):
+            if self._insert(self._row(data, hashed)) is None:
+                skipped.append(data["username"])
+            else:
+                created += 1
+        return created, skipped
+
+    def update(self, user: User, changes: dict) -> User:
+        store = self.store
+        with store.lock:
+            current = store.users.get(user.id)
+            if current is None:
+                raise StaleDataError(f"user {user.id} no longer exists")
+            updated = _replace(current, _USER_FIELDS, changes)
+            # The same unique constraints the users table has
+            for taken, value in (
+                (store.user_ids_by_username, updated.username),
+                (store.user_ids_by_email, updated.email),
+            ):
+                if taken.get(value, updated.id) != updated.id:
+                    raise IntegrityError("UPDATE users", changes, ValueError(f"{value!r} is already taken"))
+            del store.user_ids_by_username[current.username], store.user_ids_by_email[current.email]
+            store.users[updated.id] = updated
+            store.user_ids_by_username[updated.username] = updated.id
+            store.user_ids_by_email[updated.email] = updated.id
+            return updated
+
+    def delete(self, user: User) -> None:
+        store = self.store
+        with store.lock:
+            current = store.users.pop(user.id, None)
+            if current is not None:
+                del store.user_ids_by_username[current.username], store.user_ids_by_email[current.email]
+                # Like ON DELETE CASCADE: the user's articles go with them
+                for article_id in store.article_ids_by_author.pop(current.id, {}):
+                    del store.articles[article_id]
+
+
+class MemoryArticleRepository:
+    """Articles in a MemoryStore; events go straight to the broker, there is no commit to wait for."""
+
+    def __init__(self, store: MemoryStore, broker: Broker):
+        self.store = store
+        self.broker = broker
+
+    def get(self, article_id: int) -> Optional[Article]:
+        return self.store.articles.get(article_id)
+
+    def get_many(self, ids: List[int]) -> Tuple[List[Article], List[int]]:
+        return _get_many(self.store.articles, ids)
+
+    def list(
+        self,
+        offset: int,
+        limit: int,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        author_id: Optional[int] = None,
+    ) -> List[Article]:
+        store = self.store
+        with store.lock:
+            if author_id is None:
+                candidates = store.articles.values()
+            else:
+                candidates = (store.articles[i] for i in store.article_ids_by_author.get(author_id, ()))
+            found = (a for a in candidates if _created_between(a, created_from, created_to))
+            return list(islice(found, offset, offset + limit))
+
+    def search(
+        self,
+        q: str,
+        offset: int,
+        limit: int,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> List[Article]:
+        needle = q.casefold()
+        with self.store.lock:
+            found = (
+                article
+                for article in self.store.articles.values()
+                if (needle in article.title.casefold() or needle in article.content.casefold())
+                and _created_between(article, created_from, created_to)
+            )
+            return list(islice(found, offset, offset + limit))
+
+    def _current(self, article: Article) -> Article:
+        current = self.store.articles.get(article.id)
+        if current is None or current.version != article.version:
+            raise StaleDataError(f"article {article.id} was changed since version {article.version} was read")
+        return current
+
+    def create(self, data: dict, author_id: int) -> Article:
+        store = self.store
+        now = _now()
+        with store.lock:
+            article = Article(
+                **data,
+                id=store.next_article_id(),
+                author_id=author_id,
+                created_at=now,
+                updated_at=now,
+                version=1,
+            )
+            store.articles[article.id] = article
+            store.article_ids_by_author.setdefault(author_id, {})[article.id] = None
+        self.broker.publish_now("created", article)
+        return article
+
+    def update(self, article: Article, changes: dict) -> Article:
+        store = self.store
+        with store.lock:
+            current = self._current(article)
+            changes = {**changes, "version": current.version + 1, "updated_at": _now()}
+            updated = _replace(current, _ARTICLE_FIELDS, changes)
+            store.articles[updated.id] = updated
+        self.broker.publish_now("updated", updated)
+        return updated
+
+    def delete(self, article: Article) -> None:
+        store = self.store
+        with store.lock:
+            current = self._current(article)
+            del store.articles[current.id]
+            store.article_ids_by_author[current.author_id].pop(current.id, None)
+        self.broker.publish_now("deleted", current)
+
+
+def use_memory_repositories(app: FastAPI, store: MemoryStore = None) -> MemoryStore:
+    """
+    Serve users and articles from ``store`` (a new one by default) instead of the database.
+
+    Only the repository-backed routes move; stats, suggestions, the change feed and the
+    search indexes still read the database.
+    """
+    store = store or MemoryStore()
+
+    def users() -> UserRepository:
+        return MemoryUserRepository(store)
+
+    def articles(broker: Broker = Depends(get_broker)) -> ArticleRepository:
+        return MemoryArticleRepository(store, broker)
+
+    app.dependency_overrides[get_user_repository] = users
+    app.dependency_overrides[get_article_repository] = articles
+    return store
@@ -0,0 +1,175 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import Depends
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.article import Article
+from app.models.user import User
+from app.repositories.base import ArticleRepository, UserRepository
+from app.services import sharding
+from app.services.batch import fetch_by_ids
+from app.services.changes import record_tombstone
+from app.services.events import Broker, get_broker
+from app.services.stats import record_article_created, record_article_deleted
+from app.services.users import bulk_create_users, create_user
+
+
+class SqlUserRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, user_id: int) -> Optional[User]:
+        stmt = lambda_stmt(lambda: select(User).where(User.id == user_id))
+        return self.db.execute(stmt).scalar_one_or_none()
+
+    def get_by_username(self, username: str) -> Optional[User]:
+        # Lambda statements are built and cache-keyed once; later calls only rebind `username`
+        stmt = lambda_stmt(lambda: select(User).where(User.username == username))
+        return self.db.execute(stmt).scalar_one_or_none()
+
+    def get_many(self, ids: List[int]) -> Tuple[List[User], List[int]]:
+        return fetch_by_ids(self.db, User, ids)
+
+    def list(self, offset: int, limit: int) -> List[User]:
+        return self.db.query(User).offset(offset).limit(limit).all()
+
+    def search(self, q: str, offset: int, limit: int) -> List[User]:
+        pattern = f"%{q}%"
+        return (
+            self.db.query(User)
+            .filter(User.username.ilike(pattern) | User.email.ilike(pattern))
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+
+    def create(self, data: dict) -> Optional[User]:
+        user = create_user(self.db, data)
+        if user is not None:
+            self.db.commit()
+        return user
+
+    def create_many(self, users: List[dict]) -> Tuple[int, List[str]]:
+        # Hashing takes a while: end the transaction the auth lookup opened, so its
+        # connection goes back to the pool meanwhile
+        self.db.commit()
+        created, skipped = bulk_create_users(self.db, users)
+        self.db.commit()
+        return created, skipped
+
+    def update(self, user: User, changes: dict) -> User:
+        for key, val in changes.items():
+            setattr(user, key, val)
+        self.db.commit()
+        self.db.refresh(user)
+        return user
+
+    def delete(self, user: User) -> None:
+        self.db.delete(user)
+        self.db.commit()
+
+
+def _created_between(query, created_from: Optional[datetime], created_to: Optional[datetime]):
+    # Bounds on the partition key let Postgres prune monthly partitions
+    if created_from is not None:
+        query = query.filter(Article.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(Article.created_at < created_to)
+    return query
+
+
+class SqlArticleRepository:
+    def __init__(self, db: Session, broker: Optional[Broker] = None):
+        self.db = db
+        self._broker = broker
+
+    @property
+    def broker(self) -> Broker:
+        # Read-only callers (warm-up) never need one
+        return self._broker or get_broker()
+
+    def get(self, article_id: int) -> Optional[Article]:
+        stmt = lambda_stmt(lambda: select(Article).where(Article.id == article_id))
+        return self.db.execute(stmt).scalar_one_or_none()
+
+    def get_many(self, ids: List[int]) -> Tuple[List[Article], List[int]]:
+        return fetch_by_ids(self.db, Article, ids)
+
+    def list(
+        self,
+        offset: int,
+        limit: int,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        author_id: Optional[int] = None,
+    ) -> List[Article]:
+        def articles(session: Session):
+            query = _created_between(session.query(Article), created_from, created_to)
+            if author_id is not None:
+                query = query.filter(Article.author_id == author_id)
+            return query
+
+        if author_id is None and sharding.sharded_database(self.db):
+            return sharding.merge_pages(self.db, articles, offset, limit)
+        # One author lives on one shard, so this reads a single database either way
+        return articles(self.db).offset(offset).limit(limit).all()
+
+    def search(
+        self,
+        q: str,
+        offset: int,
+        limit: int,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> List[Article]:
+        pattern = f"%{q}%"
+
+        def matches(session: Session):
+            return _created_between(session.query(Article), created_from, created_to).filter(
+                Article.title.ilike(pattern) | Article.content.ilike(pattern)
+            )
+
+        if sharding.sharded_database(self.db):
+            return sharding.merge_pages(self.db, matches, offset, limit)
+        return matches(self.db).offset(offset).limit(limit).all()
+
+    def create(self, data: dict, author_id: int) -> Article:
+        article = Article(**data, author_id=author_id)
+        self.db.add(article)
+        self.db.flush()
+        record_article_created(self.db, article)
+        self.broker.publish(self.db, "created", article)
+        self.db.commit()
+        self.db.refresh(article)
+        return article
+
+    def update(self, article: Article, changes: dict) -> Article:
+        for key, val in changes.items():
+            setattr(article, key, val)
+        # No row lock: the flush is UPDATE ... WHERE id = :id AND version = :read_version,
+        # and a concurrent writer makes it match nothing (StaleDataError -> 412)
+        self.broker.publish(self.db, "updated", article)
+        self.db.commit()
+        self.db.refresh(article)
+        return article
+
+    def delete(self, article: Article) -> None:
+        record_article_deleted(self.db, article)
+        record_tombstone(self.db, article)
+        self.broker.publish(self.db, "deleted", article)
+        self.db.delete(article)
+        self.db.commit()
+
+
+def get_user_repository(db: Session = Depends(get_db)) -> UserRepository:
+    return SqlUserRepository(db)
+
+
+def get_article_repository(
+    db: Session = Depends(get_db),
+    broker: Broker = Depends(get_broker),
+) -> ArticleRepository:
+    return SqlArticleRepository(db, broker)
@@ -1,32 +1,141 @@
-﻿from typing import List
+﻿import asyncio
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.article import Article
 from app.models.user import User, UserRole
-from app.schemas.article import ArticleCreate, ArticleUpdate, ArticleOut
+from app.repositories.base import ArticleRepository
+from app.repositories.sql import get_article_repository
+from app.schemas.article import (
+    ArticleBatch,
+    ArticleChanges,
+    ArticleCreate,
+    ArticleOut,
+    ArticleRelated,
+    ArticleSearchHit,
+    ArticleSuggestion,
+    ArticleUpdate,
+)
+from app.config import settings
 from app.services.auth import get_current_user
+from app.services.batch import parse_ids
+from app.services.changes import changes_since
+from app.services import deadlines, metrics, related, sharding
+from app.services.archive import article_archive
+from app.services.events import Broker, Subscription, get_broker
+from app.services.semantic import semantic_search
+from app.services.singleflight import SingleFlight
+from app.services.suggest import title_index
+from app.services.profiling import request_profiler
+from app.services.tracing import TracedRoute
 
-router = APIRouter(prefix="/articles", tags=["articles"])
+router = APIRouter(
+    prefix="/articles",
+    tags=["articles"],
+    route_class=TracedRoute,
+    dependencies=[Depends(request_profiler)],
+)
 
+article_reads = SingleFlight()
+metrics.register("article_reads", article_reads.stats)
 
-def _get_article_or_404(article_id: int, db: Session) -> Article:
-    article = db.query(Article).filter(Article.id == article_id).first()
-    if not article:
+
+def _get_article_or_404(article_id: int, articles: ArticleRepository, include_archived: bool = False) -> Article:
+    article = articles.get(article_id)
+    if article:
+        return article
+    archived = article_archive.get(article_id)
+    if archived is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Article not found")
-    return article
+    if not include_archived:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Article is archived and read-only")
+    return archived
+
+
+def _etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def _check_if_match(if_match: Optional[str], article: Article):
+    """412 unless If-Match is absent, "*" or lists the article's current ETag."""
+    if if_match is None:
+        return
+    tags = {tag.strip() for tag in if_match.split(",")}
+    if "*" in tags or _etag(article.version) in tags:
+        return
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Article has been modified; reload it and retry",
+        headers={"ETag": _etag(article.version)},
+    )
+
+
+def _warm_related_index() -> related.MinHashLSH:
+    index = related.related_index
+    if index is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Related articles are disabled")
+    if not index.warm:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Related-articles index is warming up",
+            headers={"Retry-After": "5"},
+        )
+    return index
+
+
+def _shareable_error(exc: BaseException) -> bool:
+    return not (isinstance(exc, DBAPIError) and deadlines.is_query_cancelled(exc))
+
+
+def _read_article_or_404(article_id: int, articles: ArticleRepository, wait_ms: int = 0) -> ArticleOut:
+    """
+    Read-only lookup; concurrent reads of the same id share one query and its snapshot.
+    A request waits for the shared query at most ``wait_ms``, then runs its own. If the
+    shared query was cancelled (its client went away, or its deadline passed) the waiters
+    query again on their own sessions instead of inheriting that request's 504.
+    """
+
+    def load():
+        try:
+            return ArticleOut.model_validate(_get_article_or_404(article_id, articles, include_archived=True))
+        except HTTPException:
+            return None
+
+    snapshot = article_reads.do(
+        article_id, load, timeout=wait_ms / 1000 if wait_ms else None, share_error=_shareable_error
+    )
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Article not found")
+    return snapshot
+
+
+@router.get("/batch", response_model=ArticleBatch)
+def get_articles_by_ids(
+    ids: List[int] = Depends(parse_ids),
+    articles: ArticleRepository = Depends(get_article_repository),
+    _: User = Depends(get_current_user),
+):
+    items, missing = articles.get_many(ids)
+    return ArticleBatch(items=items, missing=missing)
 
 
 @router.get("/", response_model=List[ArticleOut])
 def list_articles(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    author_id: Optional[int] = Query(None),
+    articles: ArticleRepository = Depends(get_article_repository),
     _: User = Depends(get_current_user),
 ):
-    return db.query(Article).offset(offset).limit(limit).all()
+    return articles.list(offset, limit, created_from=created_from, created_to=created_to, author_id=author_id)
 
 
 @router.get("/search", response_model=List[ArticleOut])
@@ -34,38 +143,156 @@ def search_articles(
     q: str = Query(..., min_length=1),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    articles: ArticleRepository = Depends(get_article_repository),
+    _: User = Depends(get_current_user),
+):
+    return articles.search(q, offset, limit, created_from=created_from, created_to=created_to)
+
+
+@router.get("/changes", response_model=ArticleChanges)
+def get_article_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(settings.ARTICLE_CHANGES_DEFAULT_LIMIT, ge=1, le=settings.ARTICLE_CHANGES_MAX_LIMIT),
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_user),
+):
+    if sharding.sharded_database(db):
+        # Each shard has its own change sequence, so one integer cursor cannot cover them
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Incremental sync is not available while articles are sharded",
+        )
+    return changes_since(db, since, limit)
+
+
+@router.get("/semantic-search", response_model=List[ArticleSearchHit])
+def semantic_search_articles(
+    q: str = Query(..., min_length=1, max_length=2000),
+    limit: int = Query(10, ge=1, le=100),
+    articles: ArticleRepository = Depends(get_article_repository),
+    _: User = Depends(get_current_user),
+):
+    if not semantic_search.enabled:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Semantic search is disabled")
+    hits = semantic_search.search(q, limit)
+    if hits is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Semantic index is warming up",
+            headers={"Retry-After": "5"},
+        )
+    scores = dict(hits)
+    # One query, best match first; archived ids come back missing and are skipped
+    found, _ = articles.get_many(list(scores))
+    return [
+        ArticleSearchHit(**ArticleOut.model_validate(article).model_dump(), score=round(scores[article.id], 6))
+        for article in found
+    ]
+
+
+@router.get("/suggest", response_model=List[ArticleSuggestion])
+def suggest_titles(
+    prefix: str = Query(..., min_length=1, max_length=255),
+    limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
-    pattern = f"%{q}%"
+    found = title_index.search(prefix, limit)
+    if found is not None:
+        return found
+    # Index not warm yet: LIKE 'prefix%' on idx_articles_title_pattern (case-sensitive)
     return (
-        db.query(Article)
-        .filter(Article.title.ilike(pattern) | Article.content.ilike(pattern))
-        .offset(offset)
+        db.query(Article.id, Article.title)
+        .filter(Article.title.startswith(prefix, autoescape=True))
+        .order_by(Article.title)
         .limit(limit)
         .all()
     )
 
 
+async def _event_stream(request: Request, subscription: Subscription):
+    try:
+        while not await request.is_disconnected():
+            try:
+                evt = await asyncio.wait_for(
+                    subscription.get(), timeout=settings.ARTICLE_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {evt.seq}\nevent: {evt.op}\ndata: {evt.model_dump_json()}\n\n"
+    finally:
+        subscription.close()
+
+
+@router.get("/stream")
+async def stream_article_changes(
+    request: Request,
+    broker: Broker = Depends(get_broker),
+    _: User = Depends(get_current_user),
+):
+    return StreamingResponse(
+        _event_stream(request, broker.subscribe()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{article_id}", response_model=ArticleOut)
 def get_article(
     article_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    articles: ArticleRepository = Depends(get_article_repository),
     _: User = Depends(get_current_user),
 ):
-    return _get_article_or_404(article_id, db)
+    # Bounded by the route's statement deadline: past it the shared query is failing anyway
+    wait_ms = deadlines.statement_timeout_for(request.url.path) or settings.SINGLE_FLIGHT_MAX_WAIT_MS
+    article = _read_article_or_404(article_id, articles, wait_ms)
+    response.headers["ETag"] = _etag(article.version)
+    return article
+
+
+@router.get("/{article_id}/related", response_model=List[ArticleRelated])
+def get_related_articles(
+    article_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    articles: ArticleRepository = Depends(get_article_repository),
+    _: User = Depends(get_current_user),
+):
+    index = _warm_related_index()
+    article = _get_article_or_404(article_id, articles, include_archived=True)
+    hits = index.query(article.content, limit, exclude=article_id, threshold=settings.RELATED_MIN_SIMILARITY)
+    similarity = dict(hits)
+    found, _ = articles.get_many(list(similarity))
+    return [ArticleRelated(id=a.id, title=a.title, similarity=round(similarity[a.id], 4)) for a in found]
 
 
 @router.post("/", response_model=ArticleOut, status_code=status.HTTP_201_CREATED)
 def create_article(
     payload: ArticleCreate,
-    db: Session = Depends(get_db),
+    response: Response,
+    check_duplicates: bool = Query(False),
+    articles: ArticleRepository = Depends(get_article_repository),
     current_user: User = Depends(get_current_user),
 ):
-    article = Article(**payload.model_dump(), author_id=current_user.id)
-    db.add(article)
-    db.commit()
-    db.refresh(article)
+    if check_duplicates:
+        # Best effort: two identical creates racing each other can both pass
+        duplicates = _warm_related_index().query(
+            payload.content, 5, threshold=settings.RELATED_DUPLICATE_THRESHOLD
+        )
+        if duplicates:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={
+                    "message": "Content is a near-duplicate of existing articles",
+                    "duplicates": [{"id": i, "similarity": round(s, 4)} for i, s in duplicates],
+                },
+            )
+    article = articles.create(payload.model_dump(), current_user.id)
+    response.headers["ETag"] = _etag(article.version)
     return article
 
 
@@ -73,32 +300,34 @@ def create_article(
 def update_article(
     article_id: int,
     payload: ArticleUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    articles: ArticleRepository = Depends(get_article_repository),
     current_user: User = Depends(get_current_user),
 ):
-    article = _get_article_or_404(article_id, db)
+    article = _get_article_or_404(article_id, articles)
 
     if current_user.role == UserRole.user and article.author_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not your article",
         )
+    _check_if_match(if_match, article)
 
-    for key, val in payload.model_dump(exclude_unset=True).items():
-        setattr(article, key, val)
-
-    db.commit()
-    db.refresh(article)
+    # A concurrent writer since the read makes this raise StaleDataError (412)
+    article = articles.update(article, payload.model_dump(exclude_unset=True))
+    response.headers["ETag"] = _etag(article.version)
     return article
 
 
 @router.delete("/{article_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_article(
     article_id: int,
-    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(None),
+    articles: ArticleRepository = Depends(get_article_repository),
     current_user: User = Depends(get_current_user),
 ):
-    article = _get_article_or_404(article_id, db)
+    article = _get_article_or_404(article_id, articles)
 
     if current_user.role == UserRole.editor:
         raise HTTPException(
@@ -110,6 +339,6 @@ def delete_article(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not your article",
         )
+    _check_if_match(if_match, article)
 
-    db.delete(article)
-    db.commit()
+    articles.delete(article)
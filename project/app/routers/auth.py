@@ -1,26 +1,55 @@
-﻿from fastapi import APIRouter, Depends, HTTPException, status
+﻿import time
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models.user import User
+from app.config import settings
+from app.repositories.base import UserRepository
+from app.repositories.sql import get_user_repository
 from app.schemas.auth import Token
 from app.services.auth import verify_password, create_access_token
+from app.services import threadpool
+from app.services.login_throttle import LoginThrottle, get_login_throttle, retry_after_header
+from app.services.tracing import TracedRoute
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(
+    prefix="/auth",
+    tags=["auth"],
+    route_class=TracedRoute,
+    dependencies=[Depends(threadpool.measure_wait)],
+)
 
 
 @router.post("/login", response_model=Token)
 def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    users: UserRepository = Depends(get_user_repository),
+    throttle: LoginThrottle = Depends(get_login_throttle),
 ):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    ip = request.client.host if request.client else None
+    if settings.LOGIN_THROTTLE_ENABLED:
+        wait = throttle.retry_after(form_data.username, ip)
+        if wait > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many failed login attempts, retry later",
+                headers={"Retry-After": retry_after_header(wait)},
+            )
+
+    user = users.get_by_username(form_data.username)
+    verified = False
+    if user:
+        started = time.perf_counter()
+        verified = verify_password(form_data.password, user.hashed_password)
+        throttle.record_verification(time.perf_counter() - started)
+    if not verified:
+        throttle.record_failure(form_data.username, ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
         )
+    throttle.record_success(form_data.username, ip)
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
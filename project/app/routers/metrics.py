@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+
+from app.models.user import User
+from app.services import metrics
+from app.services.permissions import get_admin
+from app.services.profiling import request_profiler
+from app.services.tracing import TracedRoute
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    route_class=TracedRoute,
+    dependencies=[Depends(request_profiler)],
+)
+
+
+@router.get("/")
+def get_metrics(_: User = Depends(get_admin)):
+    return metrics.snapshot()
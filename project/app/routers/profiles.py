@@ -0,0 +1,35 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.models.user import User
+from app.services.permissions import get_admin
+from app.services.profiling import profile_store
+
+router = APIRouter(prefix="/profiles", tags=["profiles"])
+
+
+def _not_found():
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+
+@router.get("/")
+def list_profiles(_: User = Depends(get_admin)) -> List[dict]:
+    return [{k: v for k, v in p.items() if k != "sql"} for p in profile_store.list()]
+
+
+@router.get("/{profile_id}")
+def get_profile(profile_id: str, _: User = Depends(get_admin)) -> dict:
+    try:
+        return profile_store.get(profile_id)
+    except FileNotFoundError:
+        raise _not_found()
+
+
+@router.get("/{profile_id}/flamegraph", response_class=PlainTextResponse)
+def get_flamegraph(profile_id: str, _: User = Depends(get_admin)):
+    try:
+        return profile_store.folded(profile_id)
+    except FileNotFoundError:
+        raise _not_found()
@@ -0,0 +1,30 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.models.user import User
+from app.services.journal import slow_journal
+from app.services.permissions import get_admin
+
+router = APIRouter(prefix="/slow-requests", tags=["slow-requests"])
+
+_SUMMARY_FIELDS = ("seq", "at", "request_id", "method", "path", "route", "status", "duration_ms", "pool_wait_ms")
+
+
+@router.get("/")
+def list_slow_requests(
+    limit: int = Query(50, ge=1, le=1000),
+    _: User = Depends(get_admin),
+) -> List[dict]:
+    return [
+        {**{k: e.get(k) for k in _SUMMARY_FIELDS}, "statements": len(e.get("sql") or [])}
+        for e in slow_journal.list(limit)
+    ]
+
+
+@router.get("/{seq}")
+def get_slow_request(seq: int, _: User = Depends(get_admin)) -> dict:
+    entry = slow_journal.get(seq)
+    if entry is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Journal entry not found")
+    return entry
@@ -0,0 +1,76 @@
+from collections import Counter
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.stats import AuthorArticleStats, DailyArticleStats
+from app.models.user import User
+from app.schemas.stats import ArticleStats, AuthorArticleCount, DailyArticleCount
+from app.services.permissions import get_editor_or_admin
+from app.services.sharding import fan_out
+from app.services.profiling import request_profiler
+from app.services.tracing import TracedRoute
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["stats"],
+    route_class=TracedRoute,
+    dependencies=[Depends(request_profiler)],
+)
+
+
+def _total_articles(session: Session) -> int:
+    return session.query(func.coalesce(func.sum(AuthorArticleStats.article_count), 0)).scalar()
+
+
+@router.get("/articles", response_model=ArticleStats)
+def article_stats(
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    db: Session = Depends(get_db),
+    _: User = Depends(get_editor_or_admin),
+):
+    def daily(session: Session):
+        query = session.query(DailyArticleStats).filter(DailyArticleStats.article_count > 0)
+        if start is not None:
+            query = query.filter(DailyArticleStats.day >= start)
+        if end is not None:
+            query = query.filter(DailyArticleStats.day <= end)
+        return query.all()
+
+    # One rollup per shard when articles are sharded; a single database gives one list
+    counts = Counter()
+    for days in fan_out(db, daily):
+        for d in days:
+            counts[d.day] += d.article_count
+    days = [DailyArticleCount(day=day, article_count=count) for day, count in sorted(counts.items())]
+    if start is None and end is None:
+        total = sum(fan_out(db, _total_articles))
+    else:
+        total = sum(counts.values())
+    return ArticleStats(total=total, days=days)
+
+
+@router.get("/authors/top", response_model=List[AuthorArticleCount])
+def top_authors(
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    _: User = Depends(get_editor_or_admin),
+):
+    def top(session: Session):
+        return (
+            session.query(AuthorArticleStats)
+            .filter(AuthorArticleStats.article_count > 0)
+            .order_by(AuthorArticleStats.article_count.desc(), AuthorArticleStats.author_id)
+            .limit(limit)
+            .all()
+        )
+
+    # An author's rollup lives on exactly one shard, so the per-shard top lists just merge
+    authors = [row for rows in fan_out(db, top) for row in rows]
+    authors.sort(key=lambda row: (-row.article_count, row.author_id))
+    return authors[:limit]
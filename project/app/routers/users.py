@@ -1,25 +1,51 @@
 ﻿from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
 
-from app.database import get_db
 from app.models.user import User
-from app.schemas.user import UserOut, UserCreate, UserUpdate
+from app.config import settings
+from app.repositories.base import UserRepository
+from app.repositories.sql import get_user_repository
+from app.schemas.user import UserOut, UserCreate, UserUpdate, UserBatch, UserBulkResult
 from app.services.auth import get_current_user, hash_password
+from app.services.batch import parse_ids
 from app.services.permissions import get_admin
+from app.services.profiling import request_profiler
+from app.services.tracing import TracedRoute
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(
+    prefix="/users",
+    tags=["users"],
+    route_class=TracedRoute,
+    dependencies=[Depends(request_profiler)],
+)
+
+
+def _get_user_or_404(user_id: int, users: UserRepository) -> User:
+    user = users.get(user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
+
+
+@router.get("/batch", response_model=UserBatch)
+def get_users_by_ids(
+    ids: List[int] = Depends(parse_ids),
+    users: UserRepository = Depends(get_user_repository),
+    _: User = Depends(get_admin),
+):
+    items, missing = users.get_many(ids)
+    return UserBatch(items=items, missing=missing)
 
 
 @router.get("/", response_model=List[UserOut])
 def list_users(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    users: UserRepository = Depends(get_user_repository),
     _: User = Depends(get_admin),
 ):
-    return db.query(User).offset(offset).limit(limit).all()
+    return users.list(offset, limit)
 
 
 @router.get("/search", response_model=List[UserOut])
@@ -27,17 +53,10 @@ def search_users(
     q: str = Query(..., min_length=1),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    users: UserRepository = Depends(get_user_repository),
     _: User = Depends(get_admin),
 ):
-    pattern = f"%{q}%"
-    return (
-        db.query(User)
-        .filter(User.username.ilike(pattern) | User.email.ilike(pattern))
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+    return users.search(q, offset, limit)
 
 
 @router.get("/me", response_model=UserOut)
@@ -48,73 +67,63 @@ def get_me(current_user: User = Depends(get_current_user)):
 @router.get("/{user_id}", response_model=UserOut)
 def get_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    users: UserRepository = Depends(get_user_repository),
     _: User = Depends(get_admin),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return user
+    return _get_user_or_404(user_id, users)
 
 
 @router.post("/", response_model=UserOut, status_code=status.HTTP_201_CREATED)
 def create_user(
     payload: UserCreate,
-    db: Session = Depends(get_db),
+    users: UserRepository = Depends(get_user_repository),
     _: User = Depends(get_admin),
 ):
-    existing = db.query(User).filter(
-        (User.username == payload.username) | (User.email == payload.email)
-    ).first()
-    if existing:
+    user = users.create(payload.model_dump())
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="User with this username or email already exists",
         )
-    user = User(
-        username=payload.username,
-        email=payload.email,
-        hashed_password=hash_password(payload.password),
-        role=payload.role,
-        is_active=payload.is_active,
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
     return user
 
 
+@router.post("/bulk", response_model=UserBulkResult)
+def create_users_bulk(
+    payload: List[UserCreate],
+    users: UserRepository = Depends(get_user_repository),
+    _: User = Depends(get_admin),
+):
+    if len(payload) > settings.USER_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.USER_BULK_MAX_ROWS} users per request",
+        )
+    created, skipped = users.create_many([u.model_dump() for u in payload])
+    return UserBulkResult(created=created, skipped=skipped)
+
+
 @router.put("/{user_id}", response_model=UserOut)
 def update_user(
     user_id: int,
     payload: UserUpdate,
-    db: Session = Depends(get_db),
+    users: UserRepository = Depends(get_user_repository),
     _: User = Depends(get_admin),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    user = _get_user_or_404(user_id, users)
 
     update_data = payload.model_dump(exclude_unset=True)
     if "password" in update_data:
         update_data["hashed_password"] = hash_password(update_data.pop("password"))
 
-    for key, val in update_data.items():
-        setattr(user, key, val)
-
-    db.commit()
-    db.refresh(user)
-    return user
+    return users.update(user, update_data)
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    users: UserRepository = Depends(get_user_repository),
     _: User = Depends(get_admin),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    db.delete(user)
-    db.commit()
+    user = _get_user_or_404(user_id, users)
+    users.delete(user)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -25,3 +25,45 @@ class ArticleOut(ArticleBase):
     author_id: int
     created_at: datetime
     updated_at: datetime
+    version: int
+
+
+class ArticleBatch(BaseModel):
+    items: List[ArticleOut]
+    missing: List[int]
+
+
+class ArticleChanges(BaseModel):
+    """Apply ``articles`` (upserts), then ``deleted``; resume with ``since=cursor``."""
+
+    articles: List[ArticleOut]
+    deleted: List[int]
+    cursor: int
+    has_more: bool
+
+
+class ArticleSearchHit(ArticleOut):
+    score: float
+
+
+class ArticleRelated(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    similarity: float
+
+
+class ArticleSuggestion(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+
+
+class ArticleEvent(BaseModel):
+    op: Literal["created", "updated", "deleted"]
+    id: int
+    author_id: int
+    at: datetime
+    seq: Optional[int] = None
@@ -0,0 +1,23 @@
+from datetime import date
+from typing import List
+
+from pydantic import BaseModel, ConfigDict
+
+
+class DailyArticleCount(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    day: date
+    article_count: int
+
+
+class ArticleStats(BaseModel):
+    total: int
+    days: List[DailyArticleCount]
+
+
+class AuthorArticleCount(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    author_id: int
+    article_count: int
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, EmailStr, ConfigDict
 
@@ -30,3 +30,13 @@ class UserOut(UserBase):
 
     id: int
     created_at: datetime
+
+
+class UserBatch(BaseModel):
+    items: List[UserOut]
+    missing: List[int]
+
+
+class UserBulkResult(BaseModel):
+    created: int
+    skipped: List[str]
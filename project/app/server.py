@@ -0,0 +1,122 @@
+"""
+Production entry point.
+
+Usage:
+    python -m app.server
+
+Runs the API under gunicorn with uvicorn workers and a preloaded app. When gunicorn
+is not installed it falls back to uvicorn's own process manager. Seeding and
+--reload stay in entrypoint.sh and are only used in development.
+"""
+import importlib.util
+import os
+
+from app.config import settings
+
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    return available_cpus()
+
+
+def event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def gunicorn_options() -> dict:
+    return {
+        "bind": settings.BIND,
+        "workers": worker_count(),
+        "worker_class": "app.server.Worker",
+        "preload_app": True,
+        "keepalive": settings.KEEPALIVE_TIMEOUT,
+        "graceful_timeout": settings.GRACEFUL_TIMEOUT,
+        "timeout": settings.WORKER_TIMEOUT,
+        "max_requests": settings.MAX_REQUESTS,
+        "max_requests_jitter": settings.MAX_REQUESTS_JITTER,
+        "post_fork": _post_fork,
+        # Access lines come from AccessLogMiddleware through the log queue
+        "accesslog": None,
+        "errorlog": "-",
+    }
+
+
+def _post_fork(server, worker):
+    # Connections opened while preloading in the master must not be shared with workers
+    from app.database import engine
+
+    engine.dispose(close=False)
+
+
+try:
+    from gunicorn.app.base import BaseApplication
+    from uvicorn.workers import UvicornWorker
+except ImportError:  # pragma: no cover - gunicorn is optional
+    BaseApplication = None
+else:
+    class Worker(UvicornWorker):
+        CONFIG_KWARGS = {
+            "loop": event_loop(),
+            "http": http_protocol(),
+            # Logging is configured by the app (app/services/logs.py) in each worker
+            "log_config": None,
+            "access_log": False,
+        }
+
+    class Application(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+
+def run_uvicorn():
+    import uvicorn
+
+    host, _, port = settings.BIND.rpartition(":")
+    uvicorn.run(
+        "app.main:app",
+        host=host or "0.0.0.0",
+        port=int(port),
+        workers=worker_count(),
+        loop=event_loop(),
+        http=http_protocol(),
+        timeout_keep_alive=settings.KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT,
+        limit_max_requests=settings.MAX_REQUESTS,
+        proxy_headers=True,
+        log_config=None,
+        access_log=False,
+    )
+
+
+def main():
+    if BaseApplication is None:
+        run_uvicorn()
+    else:
+        Application(gunicorn_options()).run()
+
+
+if __name__ == "__main__":
+    main()
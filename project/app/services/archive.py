@@ -0,0 +1,233 @@
+import bisect
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.article import Article
+from app.services.changes import record_tombstone
+from app.services.stats import record_article_deleted
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - archival is optional
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+_COLUMNS = ("id", "title", "content", "author_id", "created_at", "updated_at", "version")
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _month_bounds(value: datetime):
+    start = _utc(value).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+class _ArchivedFile:
+    __slots__ = ("path", "min_id", "max_id", "firsts", "lasts", "_handle", "_lock")
+
+    def __init__(self, path: str, entry: dict):
+        self.path = path
+        self.min_id = entry["min_id"]
+        self.max_id = entry["max_id"]
+        self.firsts = [rg[0] for rg in entry["row_groups"]]
+        self.lasts = [rg[1] for rg in entry["row_groups"]]
+        self._handle = None
+        self._lock = threading.Lock()
+
+    def read_row_group(self, row_group: int):
+        # Archive files never change, so the footer is parsed once and the handle kept
+        with self._lock:
+            if self._handle is None:
+                self._handle = pq.ParquetFile(self.path)
+            return self._handle.read_row_group(row_group)
+
+    def row_group_for(self, article_id: int) -> Optional[int]:
+        i = bisect.bisect_right(self.firsts, article_id) - 1
+        if i >= 0 and article_id <= self.lasts[i]:
+            return i
+        return None
+
+
+class ArticleArchive:
+    """
+    Month-grouped Parquet files of archived articles plus a manifest.
+
+    The in-memory index only keeps the id range of every row group (rows are written in
+    id order), so it stays tiny and a lookup reads exactly one row group.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.ARCHIVE_DIR
+        self._lock = threading.Lock()
+        self._files: List[_ArchivedFile] = []
+        self._manifest_mtime: Optional[tuple] = None
+
+    @property
+    def enabled(self) -> bool:
+        return pq is not None
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.root, MANIFEST)
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self._manifest_path(), encoding="utf-8") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return {"files": []}
+
+    def _write_manifest(self, manifest: dict):
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=1)
+        os.replace(tmp, self._manifest_path())
+
+    def _refresh_index(self):
+        # The archive job runs in another process; reload when its manifest changes
+        try:
+            stat = os.stat(self._manifest_path())
+            mtime = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._manifest_mtime:
+            return
+        with self._lock:
+            manifest = self._read_manifest()
+            # Keep the open handles of files that were already listed
+            known = {archived.path: archived for archived in self._files}
+            paths = [os.path.join(self.root, entry["path"]) for entry in manifest["files"]]
+            self._files = [
+                known.get(path) or _ArchivedFile(path, entry) for path, entry in zip(paths, manifest["files"])
+            ]
+            self._manifest_mtime = mtime
+
+    def warm(self) -> int:
+        """Load the manifest index ahead of the first archived read; returns the file count."""
+        if self.enabled:
+            self._refresh_index()
+        return len(self._files)
+
+    def get(self, article_id: int) -> Optional[Article]:
+        """Return a transient (session-less) Article from the archive, or None."""
+        if not self.enabled:
+            return None
+        self._refresh_index()
+        for archived in self._files:
+            if not archived.min_id <= article_id <= archived.max_id:
+                continue
+            row_group = archived.row_group_for(article_id)
+            if row_group is None:
+                continue
+            table = archived.read_row_group(row_group)
+            ids = table.column("id").to_pylist()
+            try:
+                row = ids.index(article_id)
+            except ValueError:
+                continue
+            values = {name: table.column(name)[row].as_py() for name in _COLUMNS if name in table.column_names}
+            # Files written before articles had a version column
+            values.setdefault("version", 1)
+            return Article(**values)
+        return None
+
+    def archive_older_than(self, db: Session, cutoff: datetime) -> int:
+        """
+        Move articles created before ``cutoff`` into Parquet, one month per transaction.
+
+        Every row is removed like a normal delete (tombstone, stats rollups), so sync
+        clients and the other workers' indexes drop it too. The month's file is written
+        under a pending name and only renamed and listed in the manifest after the commit.
+        """
+        if not self.enabled:
+            raise RuntimeError("pyarrow is required for article archival")
+        os.makedirs(self.root, exist_ok=True)
+        moved = 0
+        while True:
+            oldest = db.query(func.min(Article.created_at)).filter(Article.created_at < cutoff).scalar()
+            if oldest is None:
+                return moved
+            start, end = _month_bounds(oldest)
+            end = min(end, _utc(cutoff))
+            # Lower bound is the oldest row itself, so every pass makes progress
+            articles = (
+                db.query(Article)
+                .filter(Article.created_at >= oldest, Article.created_at < end)
+                .order_by(Article.id)
+                .all()
+            )
+            month = start.strftime("%Y-%m")
+            pending, rel_path, entry = self._write_month(month, articles)
+            try:
+                for article in articles:
+                    record_article_deleted(db, article)
+                    record_tombstone(db, article)
+                    db.delete(article)
+                db.commit()
+            except Exception:
+                os.remove(pending)
+                raise
+            self._publish(pending, rel_path, entry)
+            moved += len(articles)
+            logger.info("archived %d article(s) for %s", len(articles), start.strftime("%Y-%m"))
+
+    def _write_month(self, month: str, articles: List[Article]) -> Tuple[str, str, dict]:
+        """Write the month under a pending name; returns (pending path, final path, manifest entry)."""
+        table = pa.table(
+            {
+                "id": pa.array([a.id for a in articles], pa.int64()),
+                "title": pa.array([a.title for a in articles], pa.string()),
+                "content": pa.array([a.content for a in articles], pa.string()),
+                "author_id": pa.array([a.author_id for a in articles], pa.int64()),
+                "created_at": pa.array([_utc(a.created_at) for a in articles], pa.timestamp("us", tz="UTC")),
+                "updated_at": pa.array([_utc(a.updated_at) for a in articles], pa.timestamp("us", tz="UTC")),
+                "version": pa.array([a.version for a in articles], pa.int64()),
+            }
+        )
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        rel_path = os.path.join(month, f"part-{stamp}.parquet")
+        os.makedirs(os.path.join(self.root, month), exist_ok=True)
+        pending = os.path.join(self.root, rel_path + ".pending")
+        pq.write_table(
+            table,
+            pending,
+            compression="zstd",
+            row_group_size=settings.ARCHIVE_ROW_GROUP_SIZE,
+        )
+
+        ids = table.column("id").to_pylist()
+        size = settings.ARCHIVE_ROW_GROUP_SIZE
+        entry = {
+            "path": rel_path,
+            "month": month,
+            "rows": len(ids),
+            "min_id": ids[0],
+            "max_id": ids[-1],
+            "row_groups": [[ids[i], ids[min(i + size, len(ids)) - 1]] for i in range(0, len(ids), size)],
+        }
+        return pending, rel_path, entry
+
+    def _publish(self, pending: str, rel_path: str, entry: dict):
+        # A crash between the commit and here leaves the rows in the .pending file, to rename by hand
+        os.replace(pending, os.path.join(self.root, rel_path))
+        manifest = self._read_manifest()
+        manifest["files"].append(entry)
+        self._write_manifest(manifest)
+
+
+article_archive = ArticleArchive()
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+from app.models.article import Article
+from app.services.changes import replay_changes
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "article_index_changes"
+
+
+class ArticleSnapshot(NamedTuple):
+    """The indexed fields of an article as flushed, readable after the commit expires it."""
+
+    id: int
+    title: str
+    content: str
+
+
+# apply(articles, deleted): upsert ``articles`` (ArticleSnapshot or Article), then drop ``deleted`` ids
+ApplyChanges = Callable[[Sequence, List[int]], None]
+
+
+class _Subscriber(NamedTuple):
+    name: str
+    fields: frozenset
+    apply: ApplyChanges
+
+
+_subscribers: List[_Subscriber] = []
+
+
+def on_commit(name: str, fields: Sequence[str]):
+    """
+    Register ``apply`` for committed article writes: creates, deletes, and updates that
+    changed one of ``fields``. Usable as a decorator.
+
+    Rolled-back writes never reach it. A failing ``apply`` is logged and does not fail the
+    write; the next sync from the change feed repairs the index.
+    """
+
+    def register(apply: ApplyChanges) -> ApplyChanges:
+        _subscribers.append(_Subscriber(name, frozenset(fields), apply))
+        return apply
+
+    return register
+
+
+def sync_index(index, db: Optional[Session], batch: int, apply: ApplyChanges) -> int:
+    """
+    Catch ``index`` up with the article change feed from ``index.cursors`` and mark it
+    warm; returns changes applied.
+    """
+    if db is None:
+        with SessionLocal() as db:
+            return sync_index(index, db, batch, apply)
+    applied = replay_changes(db, index.cursors, batch, lambda page: apply(page.articles, page.deleted))
+    index.warm = True
+    return applied
+
+
+async def keep_fresh(name: str, sync: Callable[[], int], refresh_seconds: float, build_first: bool = True):
+    """Run ``sync`` every ``refresh_seconds`` to pick up other workers' writes."""
+    if not build_first:
+        await asyncio.sleep(refresh_seconds)
+    while True:
+        try:
+            await run_in_threadpool(sync)
+        except Exception:
+            logger.exception("could not sync the %s index", name)
+        await asyncio.sleep(refresh_seconds)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_article_changes(session: Session, flush_context):
+    # (snapshot, changed fields or None for a new article), or (None, deleted id)
+    changes: List[Tuple[Optional[ArticleSnapshot], object]] = []
+    for obj in session.new:
+        if isinstance(obj, Article):
+            changes.append((ArticleSnapshot(obj.id, obj.title, obj.content), None))
+    for obj in session.dirty:
+        if isinstance(obj, Article):
+            attrs = inspect(obj).attrs
+            changed = {field for field in ArticleSnapshot._fields if attrs[field].history.has_changes()}
+            if changed:
+                changes.append((ArticleSnapshot(obj.id, obj.title, obj.content), changed))
+    for obj in session.deleted:
+        if isinstance(obj, Article):
+            changes.append((None, obj.id))
+    if changes:
+        session.info.setdefault(_PENDING_KEY, []).extend(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_article_changes(session: Session):
+    changes = session.info.pop(_PENDING_KEY, [])
+    if not changes:
+        return
+    deleted = [article_id for snapshot, article_id in changes if snapshot is None]
+    gone = set(deleted)
+    for subscriber in _subscribers:
+        articles: Dict[int, ArticleSnapshot] = {}
+        for snapshot, changed in changes:
+            if snapshot is not None and snapshot.id not in gone and (changed is None or changed & subscriber.fields):
+                # A later flush in the same transaction wins
+                articles[snapshot.id] = snapshot
+        if not articles and not deleted:
+            continue
+        try:
+            subscriber.apply(list(articles.values()), deleted)
+        except Exception:
+            logger.exception("could not update the %s index", subscriber.name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_article_changes(session: Session):
+    session.info.pop(_PENDING_KEY, None)
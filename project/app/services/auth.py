@@ -2,27 +2,28 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import get_db
 from app.models.user import User
+from app.repositories.base import UserRepository
+from app.repositories.sql import get_user_repository
+# Re-exported: callers have always imported the password helpers from here
+from app.services.passwords import hash_password, pwd_context, verify_password
+
+__all__ = [
+    "oauth2_scheme",
+    "create_access_token",
+    "get_current_user",
+    "hash_password",
+    "pwd_context",
+    "verify_password",
+]
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
-
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
@@ -34,7 +35,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    users: UserRepository = Depends(get_user_repository),
 ) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,7 +50,7 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.username == username).first()
+    user = users.get_by_username(username)
     if user is None or not user.is_active:
         raise credentials_exception
     return user
@@ -0,0 +1,44 @@
+from typing import List, Tuple, Type
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Integer, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+
+def parse_ids(ids: str = Query(..., description="Comma-separated ids, e.g. ids=3,1,2")) -> List[int]:
+    """Parse ?ids=... into a de-duplicated list that keeps the requested order."""
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="ids must be a comma-separated list of integers",
+        )
+    parsed = list(dict.fromkeys(parsed))
+    if not parsed:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="At least one id is required",
+        )
+    if len(parsed) > settings.MULTI_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.MULTI_GET_MAX_IDS} ids per request",
+        )
+    return parsed
+
+
+def fetch_by_ids(db: Session, model: Type, ids: List[int]) -> Tuple[list, List[int]]:
+    """Load rows in one query; returns them in request order plus the ids that were not found."""
+    if db.get_bind().dialect.name == "postgresql":
+        # One statement shape for any number of ids: WHERE id = ANY(:ids)
+        condition = model.id == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+    else:
+        condition = model.id.in_(ids)
+    by_id = {row.id: row for row in db.query(model).filter(condition)}
+    found = [by_id[i] for i in ids if i in by_id]
+    missing = [i for i in ids if i not in by_id]
+    return found, missing
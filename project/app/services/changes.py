@@ -0,0 +1,76 @@
+import heapq
+from itertools import islice
+from typing import Callable, Dict
+
+from sqlalchemy.orm import Session
+
+from app.models.article import Article, ArticleTombstone, change_horizon, next_change_seq
+from app.schemas.article import ArticleChanges
+from app.services.sharding import bind_arguments_for_author, shard_sessions
+
+
+def record_tombstone(db: Session, article: Article):
+    """Remember a delete for GET /articles/changes; call in the deleting transaction."""
+    db.add(
+        ArticleTombstone(
+            article_id=article.id,
+            author_id=article.author_id,
+            change_seq=next_change_seq(db.connection(bind_arguments_for_author(db, article.author_id))),
+        )
+    )
+
+
+def changes_since(db: Session, since: int, limit: int) -> ArticleChanges:
+    """
+    Articles written and deleted after ``since``, at most ``limit`` changes in sequence order.
+
+    Both lookups are range scans on a change_seq index, so catching up costs O(changes)
+    rather than a full refetch. Changes at or above the horizon wait for the next call:
+    a transaction still in flight may yet commit a lower key.
+    """
+    horizon = change_horizon(db.connection())
+    live = db.query(Article).filter(Article.change_seq > since)
+    gone = db.query(ArticleTombstone.change_seq, ArticleTombstone.article_id).filter(
+        ArticleTombstone.change_seq > since
+    )
+    if horizon is not None:
+        live = live.filter(Article.change_seq < horizon)
+        gone = gone.filter(ArticleTombstone.change_seq < horizon)
+    live = live.order_by(Article.change_seq).limit(limit + 1).all()
+    gone = gone.order_by(ArticleTombstone.change_seq).limit(limit + 1).all()
+    merged = heapq.merge(
+        ((article.change_seq, article, None) for article in live),
+        ((seq, None, article_id) for seq, article_id in gone),
+        key=lambda change: change[0],
+    )
+    page = list(islice(merged, limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+    return ArticleChanges(
+        articles=[article for _, article, _ in page if article is not None],
+        deleted=[article_id for _, _, article_id in page if article_id is not None],
+        cursor=page[-1][0] if page else since,
+        has_more=has_more,
+    )
+
+
+def replay_changes(db: Session, cursors: Dict[str, int], batch: int, apply: Callable[[ArticleChanges], None]) -> int:
+    """
+    Feed every change after ``cursors`` to ``apply`` a page at a time, advancing the
+    cursors in place; returns the number of changes.
+
+    Each database holding articles has its own sequence and cursor: ``"main"``, or one per
+    shard.
+    """
+    applied = 0
+    with shard_sessions(db) as sessions:
+        for name, shard_db in sessions:
+            while True:
+                page = changes_since(shard_db, cursors.get(name, 0), batch)
+                apply(page)
+                applied += len(page.articles) + len(page.deleted)
+                cursors[name] = page.cursor
+                if not page.has_more:
+                    break
+            shard_db.rollback()
+    return applied
@@ -0,0 +1,99 @@
+import logging
+import threading
+from typing import Iterable
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.middleware.paths import longest_prefix
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+_TIMEOUT_KEY = "statement_timeout_ms"
+# Every dbapi connection the session has open: one, or one per database for a sharded session
+_CONNECTIONS_KEY = "dbapi_connections"
+_SESSIONS_STATE = "db_sessions"
+# Guards the dbapi connection handle so a cancel can't hit a connection already back in the pool
+_lock = threading.Lock()
+
+counters = {"disconnects": 0, "cancelled": 0, "deadline_exceeded": 0}
+metrics.register("query_cancellation", lambda: dict(counters))
+
+
+def statement_timeout_for(path: str) -> int:
+    return longest_prefix(path, settings.STATEMENT_TIMEOUTS_MS, settings.DEFAULT_STATEMENT_TIMEOUT_MS)
+
+
+def attach(db: Session, request: Request):
+    """Apply the route's statement deadline to ``db`` and make it cancellable on disconnect."""
+    db.info[_TIMEOUT_KEY] = statement_timeout_for(request.url.path)
+    sessions = getattr(request.state, _SESSIONS_STATE, None)
+    if sessions is None:
+        sessions = []
+        setattr(request.state, _SESSIONS_STATE, sessions)
+    sessions.append(db)
+    db.info[_SESSIONS_STATE] = sessions
+
+
+def attach_to(db: Session, parent: Session):
+    """Give ``db``, opened on behalf of ``parent``'s request, the same deadline and cancellation."""
+    if _TIMEOUT_KEY in parent.info:
+        db.info[_TIMEOUT_KEY] = parent.info[_TIMEOUT_KEY]
+    sessions = parent.info.get(_SESSIONS_STATE)
+    if sessions is not None:
+        sessions.append(db)
+        db.info[_SESSIONS_STATE] = sessions
+
+
+def request_sessions(scope) -> list:
+    return scope.get("state", {}).get(_SESSIONS_STATE, [])
+
+
+@event.listens_for(Session, "after_begin")
+def _on_begin(session: Session, transaction, connection):
+    with _lock:
+        session.info.setdefault(_CONNECTIONS_KEY, []).append(connection.connection.driver_connection)
+    timeout_ms = session.info.get(_TIMEOUT_KEY)
+    if timeout_ms and connection.dialect.name == "postgresql":
+        # SET LOCAL ends with the transaction, so pooled connections come back clean
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _on_end(session: Session, transaction):
+    if transaction.parent is None:
+        with _lock:
+            session.info.pop(_CONNECTIONS_KEY, None)
+
+
+def cancel_session(db: Session) -> bool:
+    """Abort the statements currently running on ``db``'s connections, if any."""
+    cancelled = 0
+    with _lock:
+        for conn in db.info.get(_CONNECTIONS_KEY, ()):
+            # psycopg2 sends a cancel request to the backend; sqlite3 interrupts the statement
+            cancel = getattr(conn, "cancel", None) or getattr(conn, "interrupt", None)
+            if cancel is None:
+                continue
+            try:
+                cancel()
+            except Exception:
+                logger.exception("could not cancel running statement")
+                continue
+            cancelled += 1
+    counters["cancelled"] += cancelled
+    return cancelled > 0
+
+
+def cancel_sessions(sessions: Iterable[Session]) -> int:
+    counters["disconnects"] += 1
+    return sum(cancel_session(db) for db in list(sessions))
+
+
+def is_query_cancelled(exc: DBAPIError) -> bool:
+    orig = getattr(exc, "orig", None)
+    return getattr(orig, "pgcode", None) == "57014" or "interrupted" in str(orig)
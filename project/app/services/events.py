@@ -0,0 +1,200 @@
+import asyncio
+import itertools
+import json
+import logging
+import select
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import engine, sharded_db
+from app.models.article import Article
+from app.schemas.article import ArticleEvent
+from app.services.sharding import bind_arguments_for_author
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_CHANNEL = "article_changes"
+_PENDING_KEY = "article_events"
+
+
+class Subscription:
+    def __init__(self, broker: "Broker", loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.broker = broker
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    async def get(self) -> ArticleEvent:
+        return await self.queue.get()
+
+    def offer(self, evt: ArticleEvent):
+        try:
+            self.queue.put_nowait(evt)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """In-process fan-out. Events are delivered to subscribers when the writing session commits."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    def subscribe(self, maxsize: Optional[int] = None) -> Subscription:
+        sub = Subscription(self, asyncio.get_running_loop(), maxsize or settings.ARTICLE_STREAM_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, db: Session, op: str, article: Article):
+        self._enqueue(db, self._event(op, article))
+
+    def publish_now(self, op: str, article: Article):
+        """Deliver to this worker's subscribers at once, for writers without a transaction."""
+        self.dispatch(self._event(op, article))
+
+    @staticmethod
+    def _event(op: str, article: Article) -> ArticleEvent:
+        return ArticleEvent(
+            op=op,
+            id=article.id,
+            author_id=article.author_id,
+            at=datetime.now(timezone.utc),
+        )
+
+    def _enqueue(self, db: Session, evt: ArticleEvent):
+        db.info.setdefault(_PENDING_KEY, []).append((self, evt))
+
+    def dispatch(self, evt: ArticleEvent):
+        evt.seq = next(self._ids)
+        self.published += 1
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if sub.loop.is_closed():
+                self.unsubscribe(sub)
+                continue
+            sub.loop.call_soon_threadsafe(sub.offer, evt)
+
+    def close(self):
+        pass
+
+
+class PostgresBroker(Broker):
+    """
+    Writers NOTIFY inside their transaction, so Postgres delivers on commit to every
+    worker. With sharded articles the NOTIFY goes to the author's shard, on the same
+    connection as the write, so each worker listens on the primary and on every shard.
+    Each worker holds one LISTEN connection per database and fans out to its local
+    subscribers.
+    """
+
+    def __init__(self, bind=engine, shards: Sequence = ()):
+        super().__init__()
+        self._engines = [bind, *shards]
+        self._stop = threading.Event()
+        self._threads: Dict[int, threading.Thread] = {}
+
+    def subscribe(self, maxsize: Optional[int] = None) -> Subscription:
+        self._ensure_listener()
+        return super().subscribe(maxsize)
+
+    def _enqueue(self, db: Session, evt: ArticleEvent):
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": ARTICLE_CHANNEL, "payload": evt.model_dump_json(exclude={"seq"})},
+            bind_arguments=bind_arguments_for_author(db, evt.author_id),
+        )
+
+    def _ensure_listener(self):
+        with self._lock:
+            for i, bind in enumerate(self._engines):
+                thread = self._threads.get(i)
+                if thread is None or not thread.is_alive():
+                    self._stop.clear()
+                    thread = threading.Thread(
+                        target=self._listen_forever, args=(bind,), name=f"article-listener-{i}", daemon=True
+                    )
+                    thread.start()
+                    self._threads[i] = thread
+
+    def _listen_forever(self, bind):
+        while not self._stop.is_set():
+            try:
+                self._listen(bind)
+            except Exception:
+                logger.exception("article change listener failed, reconnecting")
+                self._stop.wait(1.0)
+
+    def _listen(self, bind):
+        raw = bind.raw_connection()
+        raw.detach()
+        conn = raw.driver_connection
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {ARTICLE_CHANNEL}")
+            while not self._stop.is_set():
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    self.dispatch(ArticleEvent(**json.loads(notify.payload)))
+        finally:
+            conn.close()
+
+    def close(self):
+        self._stop.set()
+        for thread in self._threads.values():
+            thread.join(timeout=2.0)
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_pending(session: Session):
+    for broker, evt in session.info.pop(_PENDING_KEY, []):
+        broker.dispatch(evt)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+_broker: Optional[Broker] = None
+
+
+def get_broker() -> Broker:
+    global _broker
+    if _broker is None:
+        if engine.dialect.name == "postgresql":
+            _broker = PostgresBroker(engine, sharded_db.shards.values() if sharded_db else ())
+        else:
+            _broker = Broker()
+    return _broker
+
+
+def shutdown_broker():
+    global _broker
+    if _broker is not None:
+        _broker.close()
+        _broker = None
@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+from contextlib import contextmanager
+from typing import List, Optional
+
+from app.config import settings
+from app.services.profiling import _fold
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: single-process locking only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SLOWJRN1"
+# magic, slot count, slot size, next sequence number
+_HEADER = struct.Struct("<8sIIQ")
+# sequence number (0 = empty), payload length
+_SLOT_HEADER = struct.Struct("<QI")
+
+
+def sample_stack(thread_id: int) -> Optional[str]:
+    """Folded stack of another thread, or None if it is no longer running."""
+    frame = sys._current_frames().get(thread_id)
+    return _fold(frame) if frame is not None else None
+
+
+def _fit(entry: dict, limit: int) -> bytes:
+    """Encode ``entry``, dropping the tail of its SQL and stack until it fits in a slot."""
+    data = json.dumps(entry, default=str).encode()
+    while len(data) > limit and entry.get("sql"):
+        entry["sql_dropped"] = entry.get("sql_dropped", 0) + (len(entry["sql"]) + 1) // 2
+        entry["sql"] = entry["sql"][: len(entry["sql"]) // 2]
+        data = json.dumps(entry, default=str).encode()
+    if len(data) > limit and entry.get("stack"):
+        entry["stack"] = None
+        data = json.dumps(entry, default=str).encode()
+    if len(data) > limit:
+        entry = {k: entry[k] for k in ("seq", "at", "method", "route", "status", "duration_ms")}
+        entry["truncated"] = True
+        data = json.dumps(entry, default=str).encode()
+    return data
+
+
+class SlowRequestJournal:
+    """
+    Fixed-size ring buffer of slow requests in a single file.
+
+    The file holds a header plus ``slots`` slots of ``slot_bytes`` each; entry ``seq`` lives
+    in slot ``seq % slots``, so the file never grows and the oldest entries are overwritten.
+    Every worker appends to the same file under an exclusive flock.
+    """
+
+    def __init__(self, path: str = None, slots: int = None, slot_bytes: int = None):
+        self.path = path or settings.SLOW_JOURNAL_PATH
+        self.slots = slots or settings.SLOW_JOURNAL_SLOTS
+        self.slot_bytes = slot_bytes or settings.SLOW_JOURNAL_SLOT_BYTES
+        self._lock = threading.Lock()
+
+    def _slot_offset(self, seq: int) -> int:
+        return _HEADER.size + (seq % self.slots) * self.slot_bytes
+
+    @contextmanager
+    def _open(self, exclusive: bool):
+        if not exclusive and not os.path.exists(self.path):
+            yield None
+            return
+        # O_CREAT without O_TRUNC: several workers may race to create the file
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._lock, os.fdopen(fd, "r+b") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield fh
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _read_header(self, fh) -> Optional[int]:
+        fh.seek(0)
+        raw = fh.read(_HEADER.size)
+        if len(raw) < _HEADER.size:
+            return None
+        magic, slots, slot_bytes, next_seq = _HEADER.unpack(raw)
+        if magic != MAGIC or slots != self.slots or slot_bytes != self.slot_bytes:
+            return None
+        return next_seq
+
+    def _reset(self, fh):
+        logger.warning("initialising slow-request journal at %s", self.path)
+        fh.seek(0)
+        fh.truncate()
+        fh.write(_HEADER.pack(MAGIC, self.slots, self.slot_bytes, 1))
+        fh.truncate(_HEADER.size + self.slots * self.slot_bytes)
+
+    def append(self, entry: dict) -> int:
+        with self._open(exclusive=True) as fh:
+            seq = self._read_header(fh)
+            if seq is None:
+                self._reset(fh)
+                seq = 1
+            entry = {"seq": seq, **entry}
+            data = _fit(entry, self.slot_bytes - _SLOT_HEADER.size)
+            fh.seek(self._slot_offset(seq))
+            fh.write(_SLOT_HEADER.pack(seq, len(data)) + data)
+            fh.seek(0)
+            fh.write(_HEADER.pack(MAGIC, self.slots, self.slot_bytes, seq + 1))
+            fh.flush()
+        return seq
+
+    def _read_slot(self, fh, seq: int) -> Optional[dict]:
+        fh.seek(self._slot_offset(seq))
+        stored_seq, length = _SLOT_HEADER.unpack(fh.read(_SLOT_HEADER.size))
+        if stored_seq != seq:
+            return None
+        return json.loads(fh.read(length))
+
+    def get(self, seq: int) -> Optional[dict]:
+        with self._open(exclusive=False) as fh:
+            if fh is None:
+                return None
+            next_seq = self._read_header(fh)
+            if next_seq is None or not max(1, next_seq - self.slots) <= seq < next_seq:
+                return None
+            return self._read_slot(fh, seq)
+
+    def list(self, limit: int = 50) -> List[dict]:
+        """Newest entries first."""
+        with self._open(exclusive=False) as fh:
+            if fh is None:
+                return []
+            next_seq = self._read_header(fh)
+            if next_seq is None:
+                return []
+            oldest = max(1, next_seq - self.slots, next_seq - limit)
+            entries = (self._read_slot(fh, seq) for seq in range(next_seq - 1, oldest - 1, -1))
+            return [e for e in entries if e is not None]
+
+
+slow_journal = SlowRequestJournal()
@@ -0,0 +1,127 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import settings
+from app.services import metrics
+
+
+class _Failures:
+    __slots__ = ("count", "last", "blocked_until")
+
+    def __init__(self):
+        self.count = 0
+        self.last = 0.0
+        self.blocked_until = 0.0
+
+
+class LoginThrottle:
+    """
+    Per-username and per-IP failed-login tracker with exponential backoff.
+
+    After the free failures, every further failure blocks the key for
+    ``base * 2**n`` seconds (capped). Blocked attempts are rejected before the user is
+    loaded, so they cost no bcrypt. Keys live in an LRU capped at LOGIN_THROTTLE_MAX_KEYS
+    and are forgotten LOGIN_FAILURE_TTL_SECONDS after their last failure.
+    """
+
+    def __init__(self, max_keys: int = None, clock=time.monotonic):
+        self.max_keys = max_keys or settings.LOGIN_THROTTLE_MAX_KEYS
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._keys: "OrderedDict[tuple, _Failures]" = OrderedDict()
+        self.rejected = 0
+        self.evicted = 0
+        self.verifications = 0
+        self._verify_seconds = 0.0
+
+    def _get(self, key: tuple, now: float) -> Optional[_Failures]:
+        entry = self._keys.get(key)
+        if entry is not None and now - entry.last > settings.LOGIN_FAILURE_TTL_SECONDS:
+            del self._keys[key]
+            return None
+        return entry
+
+    def retry_after(self, username: str, ip: Optional[str]) -> float:
+        """Seconds until an attempt for this username/IP is allowed; counts it as rejected if > 0."""
+        now = self._clock()
+        with self._lock:
+            wait = 0.0
+            for key in (("user", username), ("ip", ip)):
+                if key[1] is None:
+                    continue
+                entry = self._get(key, now)
+                if entry is not None:
+                    wait = max(wait, entry.blocked_until - now)
+            if wait > 0:
+                self.rejected += 1
+            return wait
+
+    def record_failure(self, username: str, ip: Optional[str]):
+        now = self._clock()
+        with self._lock:
+            for key, free in (
+                (("user", username), settings.LOGIN_FREE_FAILURES),
+                (("ip", ip), settings.LOGIN_IP_FREE_FAILURES),
+            ):
+                if key[1] is None:
+                    continue
+                entry = self._get(key, now)
+                if entry is None:
+                    entry = self._keys[key] = _Failures()
+                self._keys.move_to_end(key)
+                entry.count += 1
+                entry.last = now
+                if entry.count > free:
+                    exponent = min(entry.count - free - 1, 32)
+                    delay = settings.LOGIN_BACKOFF_BASE_SECONDS * 2 ** exponent
+                    entry.blocked_until = now + min(delay, settings.LOGIN_BACKOFF_MAX_SECONDS)
+            while len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+                self.evicted += 1
+
+    def record_success(self, username: str, ip: Optional[str] = None):
+        """
+        Clear the username's streak and halve the IP's: many users can share one address,
+        but one valid account must not wipe out that address's failures.
+        """
+        now = self._clock()
+        with self._lock:
+            self._keys.pop(("user", username), None)
+            if ip is None:
+                return
+            entry = self._get(("ip", ip), now)
+            if entry is not None:
+                entry.count //= 2
+                if entry.count == 0:
+                    del self._keys[("ip", ip)]
+
+    def record_verification(self, seconds: float):
+        with self._lock:
+            self.verifications += 1
+            self._verify_seconds += seconds
+
+    def stats(self) -> dict:
+        avg = self._verify_seconds / self.verifications if self.verifications else 0.0
+        return {
+            "tracked_keys": len(self._keys),
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+            "avg_verify_ms": round(avg * 1000, 3),
+            # Rejected attempts would each have cost about one password verification
+            "bcrypt_seconds_saved": round(self.rejected * avg, 3),
+        }
+
+
+_throttle = LoginThrottle()
+metrics.register("login_throttle", lambda: get_login_throttle().stats())
+
+
+def get_login_throttle() -> LoginThrottle:
+    return _throttle
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
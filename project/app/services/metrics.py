@@ -0,0 +1,12 @@
+from typing import Callable, Dict
+
+# name -> zero-arg callable returning a JSON-serialisable dict of counters
+_sources: Dict[str, Callable[[], dict]] = {}
+
+
+def register(name: str, source: Callable[[], dict]):
+    _sources[name] = source
+
+
+def snapshot() -> dict:
+    return {name: source() for name, source in sorted(_sources.items())}
@@ -0,0 +1,34 @@
+import logging
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_article_partitions(bind=engine, months_ahead: int = None) -> int:
+    """Create any missing monthly partitions of articles; returns how many were created."""
+    if bind.dialect.name != "postgresql":
+        return 0
+    months_ahead = settings.ARTICLE_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    with bind.begin() as conn:
+        installed = conn.execute(
+            text("SELECT to_regprocedure('ensure_article_partitions(integer, date)')")
+        ).scalar()
+        if installed is None:
+            return 0
+        created = conn.execute(
+            text("SELECT ensure_article_partitions(:months)"), {"months": months_ahead}
+        ).scalar()
+    if created:
+        logger.info("created %d article partition(s)", created)
+    return created
+
+
+def ensure_article_partitions_safely():
+    try:
+        ensure_article_partitions()
+    except Exception:
+        logger.exception("could not create article partitions; relying on the default partition")
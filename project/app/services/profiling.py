@@ -0,0 +1,179 @@
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import List, Optional
+
+from fastapi import Depends, HTTPException, Request, Response
+
+from app.config import settings
+from app.models.user import User
+from app.services import sql_timing, threadpool
+from app.services.auth import get_current_user
+from app.services.permissions import get_admin
+
+PROFILE_HEADER = "X-Profile"
+_MAX_DEPTH = 128
+
+current_profile: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None and len(names) < _MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class RequestProfile:
+    """Stack sampler for the threads running one request, plus the SQL it issued."""
+
+    def __init__(self, method: str, path: str, interval: float = None):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.interval = interval or settings.PROFILE_SAMPLE_INTERVAL_MS / 1000
+        self.stacks: Counter = Counter()
+        self.sql: List[dict] = []
+        self._threads: set = set()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample, name=f"profiler-{self.id}", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for tid in list(self._threads):
+                frame = frames.get(tid)
+                if frame is not None:
+                    self.stacks[_fold(frame)] += 1
+
+    @contextmanager
+    def sampling_current_thread(self):
+        tid = threading.get_ident()
+        self._threads.add(tid)
+        try:
+            yield
+        finally:
+            self._threads.discard(tid)
+
+    def folded(self) -> str:
+        """Collapsed-stack format, readable by flamegraph.pl, speedscope and inferno."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "duration_ms": round(self.duration * 1000, 3),
+            "samples": sum(self.stacks.values()),
+            "interval_ms": self.interval * 1000,
+            "sql": self.sql,
+        }
+
+
+class ProfileStore:
+    """Keeps the newest PROFILE_KEEP profiles as <id>.json + <id>.folded files."""
+
+    def __init__(self, root: str = None):
+        self.root = root or settings.PROFILE_DIR
+
+    def save(self, profile: RequestProfile):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, f"{profile.id}.folded"), "w", encoding="utf-8") as fh:
+            fh.write(profile.folded())
+        with open(os.path.join(self.root, f"{profile.id}.json"), "w", encoding="utf-8") as fh:
+            json.dump({**profile.summary(), "created_at": time.time()}, fh)
+        self._prune()
+
+    def _ids_newest_first(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        entries = [e for e in os.scandir(self.root) if e.name.endswith(".json")]
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        return [e.name[: -len(".json")] for e in entries]
+
+    def _prune(self):
+        for stale in self._ids_newest_first()[settings.PROFILE_KEEP:]:
+            for ext in (".json", ".folded"):
+                try:
+                    os.remove(os.path.join(self.root, stale + ext))
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[dict]:
+        return [self.get(pid) for pid in self._ids_newest_first()]
+
+    def _path(self, profile_id: str, ext: str) -> str:
+        if not profile_id.isalnum():
+            raise FileNotFoundError(profile_id)
+        return os.path.join(self.root, profile_id + ext)
+
+    def get(self, profile_id: str) -> dict:
+        with open(self._path(profile_id, ".json"), encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def folded(self, profile_id: str) -> str:
+        with open(self._path(profile_id, ".folded"), encoding="utf-8") as fh:
+            return fh.read()
+
+
+profile_store = ProfileStore()
+
+
+async def request_profiler(
+    request: Request,
+    response: Response,
+    # First, so it is the request's first sync dependency
+    _: None = Depends(threadpool.measure_wait),
+    current_user: User = Depends(get_current_user),
+):
+    """Router dependency: profiles the request when an admin sends ``X-Profile: 1``."""
+    if request.headers.get(PROFILE_HEADER) != "1":
+        yield
+        return
+    try:
+        get_admin(current_user)
+    except HTTPException:
+        yield
+        return
+
+    profile = RequestProfile(request.method, request.url.path)
+    token = current_profile.set(profile)
+    response.headers["X-Profile-Id"] = profile.id
+    profile.start()
+    try:
+        yield
+    finally:
+        profile.stop()
+        current_profile.reset(token)
+        profile_store.save(profile)
+
+
+@sql_timing.subscribe
+def _record_sql(statement: str, elapsed: float):
+    profile = current_profile.get()
+    if profile is not None:
+        profile.sql.append({"statement": statement, "duration_ms": round(elapsed * 1000, 3)})
@@ -0,0 +1,173 @@
+import hashlib
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services import article_indexes, metrics
+from app.services.article_indexes import keep_fresh, sync_index
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - related articles are optional
+    np = None
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+# Shingle hashes are reduced below this Mersenne prime; a * x + b then still fits in uint64
+_PRIME = (1 << 31) - 1
+_SEED = 0x5EED
+
+
+def shingles(text: str, size: int) -> Set[str]:
+    """Overlapping ``size``-word windows of the casefolded text (the whole text if shorter)."""
+    tokens = _TOKEN.findall(text.casefold())
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class MinHashLSH:
+    """
+    MinHash signatures of content shingles, bucketed by LSH banding.
+
+    Each signature is split into ``bands`` bands of ``rows`` values; articles sharing any
+    whole band are candidates. Two articles with Jaccard similarity s collide with
+    probability 1 - (1 - s^rows)^bands, so near-duplicates almost always meet and unrelated
+    articles almost never do. A lookup touches ``bands`` buckets instead of every article.
+    """
+
+    def __init__(self, num_perm: int = None, bands: int = None, shingle_words: int = None):
+        self.num_perm = num_perm or settings.RELATED_NUM_PERM
+        self.bands = bands or settings.RELATED_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError("RELATED_NUM_PERM must be a multiple of RELATED_BANDS")
+        self.rows = self.num_perm // self.bands
+        self.shingle_words = shingle_words or settings.RELATED_SHINGLE_WORDS
+        rng = np.random.default_rng(_SEED)
+        self._a = rng.integers(1, _PRIME, self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, self.num_perm, dtype=np.uint64)
+        self._lock = threading.RLock()
+        self._signatures: Dict[int, "np.ndarray"] = {}
+        self._buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(self.bands)]
+        self.cursors: dict = {}
+        self.warm = False
+        self.lookups = 0
+        self.candidates = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, article_id: int) -> bool:
+        return article_id in self._signatures
+
+    def signature(self, text: str) -> Optional["np.ndarray"]:
+        """The MinHash signature, or None for text without a single word."""
+        found = shingles(text, self.shingle_words)
+        if not found:
+            return None
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little") for s in found),
+            dtype=np.uint64,
+            count=len(found),
+        ) % np.uint64(_PRIME)
+        # One row per hash function: (a * x + b) mod p over every shingle, keep the minimum
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % np.uint64(_PRIME)
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _bands(self, signature: "np.ndarray"):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows : (band + 1) * self.rows].tobytes()
+
+    def add(self, article_id: int, text: str):
+        signature = self.signature(text)
+        with self._lock:
+            self.remove(article_id)
+            if signature is None:
+                return
+            self._signatures[article_id] = signature
+            for band, key in self._bands(signature):
+                self._buckets[band].setdefault(key, set()).add(article_id)
+
+    def remove(self, article_id: int) -> bool:
+        with self._lock:
+            signature = self._signatures.pop(article_id, None)
+            if signature is None:
+                return False
+            for band, key in self._bands(signature):
+                bucket = self._buckets[band].get(key)
+                if bucket is not None:
+                    bucket.discard(article_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+            return True
+
+    def query(
+        self, text: str, limit: int, exclude: int = None, threshold: float = 0.0
+    ) -> List[Tuple[int, float]]:
+        """Up to ``limit`` ``(id, estimated Jaccard)`` pairs at or above ``threshold``, best first."""
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        with self._lock:
+            self.lookups += 1
+            found: Set[int] = set()
+            for band, key in self._bands(signature):
+                found |= self._buckets[band].get(key, set())
+            found.discard(exclude)
+            self.candidates += len(found)
+            scored = [
+                (article_id, float(np.count_nonzero(self._signatures[article_id] == signature)) / self.num_perm)
+                for article_id in found
+            ]
+        scored = [(article_id, score) for article_id, score in scored if score >= threshold]
+        scored.sort(key=lambda pair: (-pair[1], pair[0]))
+        return scored[:limit]
+
+    def stats(self) -> dict:
+        return {
+            "warm": self.warm,
+            "articles": len(self),
+            "bands": self.bands,
+            "rows": self.rows,
+            "cursors": self.cursors,
+            "lookups": self.lookups,
+            "avg_candidates": round(self.candidates / self.lookups, 2) if self.lookups else 0.0,
+        }
+
+
+def related_enabled() -> bool:
+    return np is not None and settings.RELATED_ENABLED
+
+
+related_index: Optional[MinHashLSH] = MinHashLSH() if related_enabled() else None
+metrics.register("related_index", lambda: related_index.stats() if related_index else {"enabled": False})
+
+
+def _apply_changes(index: MinHashLSH, articles, deleted: List[int]):
+    for article in articles:
+        index.add(article.id, article.content)
+    for article_id in deleted:
+        index.remove(article_id)
+
+
+def sync_related_index(index: MinHashLSH = None, db: Session = None) -> int:
+    """Catch the index up with the article change feed from its cursors; returns changes applied."""
+    index = index or related_index
+    return sync_index(
+        index, db, settings.RELATED_SYNC_BATCH, lambda articles, deleted: _apply_changes(index, articles, deleted)
+    )
+
+
+async def keep_related_index_fresh(build_first: bool = True):
+    """Re-sync periodically to pick up other workers' writes (warm-up does the first sync)."""
+    if related_index is None:
+        return
+    await keep_fresh("related-articles", sync_related_index, settings.RELATED_REFRESH_SECONDS, build_first)
+
+
+@article_indexes.on_commit("related-articles", ("content",))
+def _apply_committed_changes(articles, deleted: List[int]):
+    if related_index is not None:
+        _apply_changes(related_index, articles, deleted)
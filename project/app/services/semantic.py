@@ -0,0 +1,310 @@
+import hashlib
+import importlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services import article_indexes, metrics
+from app.services.article_indexes import keep_fresh, sync_index
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - semantic search is optional
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+VECTORS = "vectors.npy"
+IDS = "ids.npy"
+META = "meta.json"
+
+
+class HashEmbedder:
+    """
+    Deterministic bag-of-words embedding: unigrams and bigrams feature-hashed into ``dim``
+    signed buckets, then L2-normalised.
+
+    No model to download, stable across processes (blake2b, not ``hash()``), and texts
+    sharing words land close together. It finds rewordings that keep the vocabulary,
+    not true paraphrases; plug in a real model through SEMANTIC_EMBEDDER for that.
+    """
+
+    def __init__(self, dim: int = None):
+        self.dim = dim or settings.SEMANTIC_DIM
+        self.name = f"hash-{self.dim}"
+
+    def _features(self, text: str) -> Iterable[str]:
+        tokens = _TOKEN.findall(text.casefold())
+        yield from tokens
+        for left, right in zip(tokens, tokens[1:]):
+            yield f"{left} {right}"
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                out[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+def load_embedder(spec: str = None):
+    """``'hash'`` or ``'package.module:factory'``; the factory returns an object with
+    ``name``, ``dim`` and ``embed(texts) -> float32 array (len(texts), dim)``."""
+    spec = spec or settings.SEMANTIC_EMBEDDER
+    if spec == "hash":
+        return HashEmbedder()
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr)()
+
+
+def article_text(title: str, content: str) -> str:
+    return f"{title}\n{content}"
+
+
+class VectorIndex:
+    """
+    Unit vectors in one contiguous float32 matrix, row i belonging to ``ids[i]``.
+
+    Search is a single matrix-vector product (cosine similarity, since rows are
+    normalised) plus a partial sort for the top k. Removal moves the last row into the
+    hole, so rows stay packed. A saved index is opened memory-mapped and read-only; the
+    first write copies it into memory.
+    """
+
+    def __init__(self, dim: int, name: str = ""):
+        self.dim = dim
+        self.name = name
+        self._lock = threading.RLock()
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._rows: dict = {}
+        self._count = 0
+        self.cursors: dict = {}
+        self.warm = False
+        self.mapped = False
+        self.searches = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, article_id: int) -> bool:
+        return article_id in self._rows
+
+    def _reserve(self, extra: int):
+        needed = self._count + extra
+        if needed <= len(self._vectors) and not self.mapped:
+            return
+        capacity = max(needed, 2 * len(self._vectors), 64)
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[: self._count] = self._vectors[: self._count]
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[: self._count] = self._ids[: self._count]
+        self._vectors, self._ids = vectors, ids
+        self.mapped = False
+
+    def upsert(self, ids: Sequence[int], vectors: "np.ndarray"):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"expected {len(ids)}x{self.dim} vectors, got {vectors.shape}")
+        with self._lock:
+            self._reserve(len(ids))
+            for article_id, vector in zip(ids, vectors):
+                row = self._rows.get(article_id)
+                if row is None:
+                    row = self._count
+                    self._rows[article_id] = row
+                    self._ids[row] = article_id
+                    self._count += 1
+                self._vectors[row] = vector
+
+    def remove(self, article_id: int) -> bool:
+        with self._lock:
+            row = self._rows.pop(article_id, None)
+            if row is None:
+                return False
+            if self.mapped:
+                self._reserve(0)
+            last = self._count - 1
+            if row != last:
+                moved = int(self._ids[last])
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+            self._count = last
+            return True
+
+    def search(self, query: "np.ndarray", k: int, exclude: int = None) -> List[Tuple[int, float]]:
+        """The ``k`` nearest ``(id, cosine)`` pairs, best first."""
+        with self._lock:
+            self.searches += 1
+            n = self._count
+            if n == 0:
+                return []
+            scores = self._vectors[:n] @ np.asarray(query, dtype=np.float32)
+            if exclude is not None and exclude in self._rows:
+                scores[self._rows[exclude]] = -np.inf
+            k = min(k, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(int(self._ids[i]), float(scores[i])) for i in top if scores[i] != -np.inf]
+
+    def save(self, directory: str):
+        """Write the matrix, ids and metadata; each file is replaced atomically."""
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            arrays = {VECTORS: self._vectors[: self._count], IDS: self._ids[: self._count]}
+            for filename, array in arrays.items():
+                tmp = os.path.join(directory, filename + ".tmp")
+                with open(tmp, "wb") as fh:
+                    np.save(fh, array)
+                os.replace(tmp, os.path.join(directory, filename))
+            meta = {"dim": self.dim, "name": self.name, "count": self._count, "cursors": self.cursors}
+        tmp = os.path.join(directory, META + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, os.path.join(directory, META))
+
+    @classmethod
+    def load(cls, directory: str, dim: int, name: str = "") -> Optional["VectorIndex"]:
+        """Open a saved index memory-mapped, or None if missing or built by another embedder."""
+        try:
+            with open(os.path.join(directory, META), encoding="utf-8") as fh:
+                meta = json.load(fh)
+        except FileNotFoundError:
+            return None
+        if meta["dim"] != dim or meta["name"] != name:
+            logger.warning("saved semantic index was built by %s, ignoring it", meta["name"])
+            return None
+        index = cls(dim, name)
+        vectors = np.load(os.path.join(directory, VECTORS), mmap_mode="r")
+        ids = np.load(os.path.join(directory, IDS))
+        if vectors.shape != (len(ids), dim):
+            logger.warning("saved semantic index is inconsistent, ignoring it")
+            return None
+        index._vectors, index._ids = vectors, ids
+        index._rows = {int(article_id): row for row, article_id in enumerate(ids)}
+        index._count = len(ids)
+        index.cursors = meta["cursors"]
+        index.mapped = True
+        return index
+
+    def stats(self) -> dict:
+        return {
+            "warm": self.warm,
+            "vectors": self._count,
+            "dim": self.dim,
+            "embedder": self.name,
+            "memory_mapped": self.mapped,
+            "matrix_bytes": int(self._vectors[: self._count].nbytes),
+            "cursors": self.cursors,
+            "searches": self.searches,
+        }
+
+
+class SemanticSearch:
+    """The worker's embedder and vector index; the index is swapped whole on (re)load."""
+
+    def __init__(self, embedder=None):
+        self._embedder = embedder
+        self.index: Optional[VectorIndex] = None
+
+    @property
+    def enabled(self) -> bool:
+        return np is not None and settings.SEMANTIC_ENABLED
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = load_embedder()
+        return self._embedder
+
+    def _fresh_index(self) -> VectorIndex:
+        return VectorIndex(self.embedder.dim, self.embedder.name)
+
+    def load(self, directory: str = None) -> bool:
+        """Adopt a saved index if there is one; returns whether it was found."""
+        directory = settings.SEMANTIC_INDEX_DIR if directory is None else directory
+        saved = VectorIndex.load(directory, self.embedder.dim, self.embedder.name) if directory else None
+        self.index = saved or self._fresh_index()
+        return saved is not None
+
+    def embed_articles(self, articles: Sequence[Tuple[int, str, str]]):
+        if not articles:
+            return
+        vectors = self.embedder.embed([article_text(title, content) for _, title, content in articles])
+        self.index.upsert([article_id for article_id, _, _ in articles], vectors)
+
+    def search(self, text: str, k: int, exclude: int = None) -> Optional[List[Tuple[int, float]]]:
+        """Top ``k`` ``(id, score)`` for a text, or None while the index is not warm."""
+        if self.index is None or not self.index.warm:
+            return None
+        return self.index.search(self.embedder.embed([text])[0], k, exclude)
+
+    def stats(self) -> dict:
+        if self.index is None:
+            return {"enabled": self.enabled, "warm": False}
+        return {"enabled": self.enabled, **self.index.stats()}
+
+
+semantic_search = SemanticSearch()
+metrics.register("semantic_index", lambda: semantic_search.stats())
+
+
+def _apply_changes(search: SemanticSearch, articles, deleted: List[int]):
+    search.embed_articles([(a.id, a.title, a.content) for a in articles])
+    for article_id in deleted:
+        search.index.remove(article_id)
+
+
+def sync_semantic_index(search: SemanticSearch = None, db: Session = None) -> int:
+    """
+    Catch the index up with the article change feed from its cursors; returns changes applied.
+
+    A loaded snapshot only replays what changed after it was saved, and the periodic
+    refresh picks up other workers' writes the same way.
+    """
+    search = search or semantic_search
+    if search.index is None:
+        search.load()
+    return sync_index(
+        search.index,
+        db,
+        settings.SEMANTIC_SYNC_BATCH,
+        lambda articles, deleted: _apply_changes(search, articles, deleted),
+    )
+
+
+def build_semantic_index(search: SemanticSearch = None, db: Session = None, directory: str = None) -> int:
+    """Embed every article from scratch and save the result (scripts/build_semantic_index.py)."""
+    search = search or semantic_search
+    search.index = search._fresh_index()
+    count = sync_semantic_index(search, db)
+    directory = settings.SEMANTIC_INDEX_DIR if directory is None else directory
+    if directory:
+        search.index.save(directory)
+    return count
+
+
+async def keep_semantic_index_fresh(build_first: bool = True):
+    """Re-sync periodically to pick up other workers' writes (warm-up does the first sync)."""
+    if not semantic_search.enabled:
+        return
+    await keep_fresh("semantic", sync_semantic_index, settings.SEMANTIC_REFRESH_SECONDS, build_first)
+
+
+@article_indexes.on_commit("semantic", ("title", "content"))
+def _apply_committed_changes(articles, deleted: List[int]):
+    if semantic_search.index is None or not semantic_search.enabled:
+        return
+    _apply_changes(semantic_search, articles, deleted)
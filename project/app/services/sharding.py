@@ -0,0 +1,254 @@
+import bisect
+import contextvars
+import hashlib
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, Table, event, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import Mapper, Session, sessionmaker
+from sqlalchemy.schema import CreateIndex, CreateSequence, CreateTable
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
+
+from app.models.article import Article, ArticleTombstone, article_change_seq
+from app.models.stats import AuthorArticleStats, DailyArticleStats
+from app.services import deadlines
+
+PRIMARY = "primary"
+# Rows of these live on the shards; everything else (users) stays on the primary
+SHARDED_MODELS = (Article, ArticleTombstone, AuthorArticleStats, DailyArticleStats)
+_SHARDED_TABLES = {model.__table__ for model in SHARDED_MODELS}
+_DB_KEY = "sharded_database"
+
+# Article ids must be unique across shards, so the primary hands them out in blocks:
+# row n of article_ids owns ids (n - 1) * block + 1 .. n * block
+_ids_metadata = MetaData()
+article_ids = Table("article_ids", _ids_metadata, Column("id", Integer, primary_key=True, autoincrement=True))
+
+
+def _point(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent-hash ring: every shard owns ``vnodes`` points, and a key belongs to the
+    first point at or after its own hash. Adding or removing a shard only moves the keys
+    of the points it gains or loses, about 1/N of them.
+    """
+
+    def __init__(self, shards: Iterable[str], vnodes: int = 128):
+        points = sorted((_point(f"{shard}#{i}"), shard) for shard in shards for i in range(vnodes))
+        if not points:
+            raise ValueError("a hash ring needs at least one shard")
+        self._points = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for(self, key) -> str:
+        i = bisect.bisect_left(self._points, _point(str(key)))
+        return self._shards[i % len(self._points)]
+
+
+def _author_ids(statement) -> Optional[Set[int]]:
+    """``author_id = :value`` terms ANDed at the top of the WHERE clause, if any."""
+    where = getattr(statement, "whereclause", None)
+    if where is None:
+        return None
+    terms = where.clauses if isinstance(where, BooleanClauseList) and where.operator is operators.and_ else [where]
+    found = set()
+    for term in terms:
+        if not isinstance(term, BinaryExpression) or term.operator is not operators.eq:
+            continue
+        for column, value in ((term.left, term.right), (term.right, term.left)):
+            if (
+                getattr(column, "key", None) == "author_id"
+                and getattr(column, "table", None) in _SHARDED_TABLES
+                and isinstance(value, BindParameter)
+            ):
+                found.add(value.effective_value)
+    return found or None
+
+
+class ArticleShardSession(ShardedSession):
+    def get_bind(self, mapper=None, *, shard_id=None, instance=None, clause=None, **kw):
+        # Dialect probes (db.get_bind().dialect) and plain SQL go to the primary
+        if mapper is None and shard_id is None and instance is None:
+            shard_id = PRIMARY
+        return super().get_bind(mapper, shard_id=shard_id, instance=instance, clause=clause, **kw)
+
+
+class ShardedDatabase:
+    """
+    Users on the primary database, articles (and their tombstones and rollups) spread
+    over shard databases by ``author_id`` on a consistent-hash ring.
+
+    ``session()`` returns a SQLAlchemy ShardedSession: writes go to the author's shard,
+    queries constrained to one author read one shard, other article queries read every
+    shard, and ``fan_out`` runs a query on all shards in parallel. Up to ``concurrency``
+    requests fan out at once (size it to the request threadpool) before they queue.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        shards: Dict[str, Engine],
+        vnodes: int = 128,
+        id_block_size: int = 1000,
+        concurrency: int = 1,
+    ):
+        if PRIMARY in shards:
+            raise ValueError(f"{PRIMARY!r} is reserved for the primary database")
+        self.primary = primary
+        self.shards = dict(shards)
+        self.ring = HashRing(self.shards, vnodes)
+        self.id_block_size = id_block_size
+        self._id_lock = threading.Lock()
+        self._next_id = self._id_limit = 0
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(concurrency, 1) * len(self.shards), thread_name_prefix="shard"
+        )
+        self.sessionmaker = sessionmaker(
+            class_=ArticleShardSession,
+            autoflush=False,
+            shards={PRIMARY: primary, **self.shards},
+            shard_chooser=self._shard_chooser,
+            identity_chooser=self._identity_chooser,
+            execute_chooser=self._execute_chooser,
+            info={_DB_KEY: self},
+        )
+        event.listen(self.sessionmaker, "before_flush", self._assign_article_ids)
+
+    def session(self) -> Session:
+        return self.sessionmaker()
+
+    def shard_for_author(self, author_id: int) -> str:
+        return self.ring.shard_for(author_id)
+
+    def _shard_chooser(self, mapper: Mapper, instance, clause=None):
+        if mapper.class_ in SHARDED_MODELS and getattr(instance, "author_id", None) is not None:
+            return self.shard_for_author(instance.author_id)
+        if mapper.class_ in SHARDED_MODELS:
+            raise ValueError(f"cannot choose a shard for {mapper.class_.__name__} without an author_id")
+        return PRIMARY
+
+    def _identity_chooser(self, mapper: Mapper, primary_key, **kw) -> List[str]:
+        # An id alone does not say which author it belongs to
+        return list(self.shards) if mapper.class_ in SHARDED_MODELS else [PRIMARY]
+
+    def _execute_chooser(self, orm_context) -> List[str]:
+        mapper = orm_context.bind_mapper
+        if mapper is None or mapper.class_ not in SHARDED_MODELS:
+            return [PRIMARY]
+        authors = _author_ids(orm_context.statement)
+        if authors:
+            return sorted({self.shard_for_author(author_id) for author_id in authors})
+        return list(self.shards)
+
+    def allocate_article_id(self) -> int:
+        """
+        A new article id, unique across shards. Only every ``id_block_size``-th call goes
+        to the primary; ids are unique but, across workers, not in creation order, and a
+        worker's unused ids are skipped when it exits.
+        """
+        with self._id_lock:
+            if self._next_id >= self._id_limit:
+                with self.primary.begin() as conn:
+                    block = conn.execute(insert(article_ids).returning(article_ids.c.id)).scalar_one()
+                self._next_id = (block - 1) * self.id_block_size + 1
+                self._id_limit = block * self.id_block_size + 1
+            article_id = self._next_id
+            self._next_id += 1
+            return article_id
+
+    def _assign_article_ids(self, session: Session, flush_context, instances):
+        for obj in session.new:
+            if isinstance(obj, Article) and obj.id is None:
+                obj.id = self.allocate_article_id()
+
+    def shard_session(self, name: str, parent: Optional[Session] = None) -> Session:
+        """A plain Session on one shard, under ``parent``'s request deadline and cancellation."""
+        shard_db = Session(bind=self.shards[name], autoflush=False)
+        if parent is not None:
+            deadlines.attach_to(shard_db, parent)
+        return shard_db
+
+    def fan_out(self, fn: Callable[[Session], object], parent: Optional[Session] = None) -> list:
+        """``fn(session)`` on every shard at once, one plain Session each; results in shard order."""
+
+        def run(name: str):
+            with self.shard_session(name, parent) as shard_db:
+                return fn(shard_db)
+
+        # copy_context: keep the request's trace and deadline context in the worker threads
+        futures = [
+            self._pool.submit(contextvars.copy_context().run, run, name) for name in self.shards
+        ]
+        return [future.result() for future in futures]
+
+    def create_schema(self):
+        """Create the id allocator on the primary and the sharded tables on every shard."""
+        _ids_metadata.create_all(self.primary)
+        tables = [model.__table__ for model in SHARDED_MODELS]
+        for engine in self.shards.values():
+            with engine.begin() as conn:
+                if conn.dialect.name == "postgresql":
+                    conn.execute(CreateSequence(article_change_seq, if_not_exists=True))
+                for table in tables:
+                    # users live on the primary, so no foreign keys can point at them
+                    conn.execute(CreateTable(table, include_foreign_key_constraints=[], if_not_exists=True))
+                    for index in table.indexes:
+                        conn.execute(CreateIndex(index, if_not_exists=True))
+
+    def dispose(self):
+        self._pool.shutdown(wait=False)
+        for engine in self.shards.values():
+            engine.dispose()
+
+
+def sharded_database(db: Session) -> Optional[ShardedDatabase]:
+    return db.info.get(_DB_KEY)
+
+
+def bind_arguments_for_author(db: Session, author_id: int) -> dict:
+    """``bind_arguments`` that send a Core statement about ``author_id`` to its shard."""
+    sharded = sharded_database(db)
+    return {"shard_id": sharded.shard_for_author(author_id)} if sharded else {}
+
+
+def fan_out(db: Session, fn: Callable[[Session], object]) -> list:
+    """``[fn(db)]`` on a single database, one result per shard when sharded."""
+    sharded = sharded_database(db)
+    return sharded.fan_out(fn, parent=db) if sharded else [fn(db)]
+
+
+def merge_pages(db: Session, query_fn: Callable[[Session], object], offset: int, limit: int) -> list:
+    """
+    ``query_fn(session).offset(offset).limit(limit)`` across shards, ordered by id.
+
+    Every shard returns its first offset + limit rows and the pages are merged, so deep
+    offsets cost shards x offset rows.
+    """
+    pages = fan_out(db, lambda shard_db: query_fn(shard_db).order_by(Article.id).limit(offset + limit).all())
+    return list(islice(heapq.merge(*pages, key=attrgetter("id")), offset, offset + limit))
+
+
+@contextmanager
+def shard_sessions(db: Session) -> Iterator[List[Tuple[str, Session]]]:
+    """``(name, session)`` for each database holding articles: ``[("main", db)]`` unsharded."""
+    sharded = sharded_database(db)
+    if sharded is None:
+        yield [("main", db)]
+        return
+    sessions = [(name, sharded.shard_session(name, parent=db)) for name in sharded.shards]
+    try:
+        yield sessions
+    finally:
+        for _, shard_db in sessions:
+            shard_db.close()
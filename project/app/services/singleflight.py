@@ -0,0 +1,76 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller runs ``fn``; callers arriving while it is in flight wait and get the
+    same result (or exception). Nothing is cached once the call completes. A caller that
+    has waited ``timeout`` seconds stops waiting and runs its own ``fn``, so a stalled
+    first call cannot hold every waiter's thread. Errors for which ``share_error`` is false
+    (say, the first caller's own cancellation) are not handed on: waiters run their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.coalesced = 0
+        self.gave_up = 0
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        timeout: Optional[float] = None,
+        share_error: Optional[Callable[[BaseException], bool]] = None,
+    ) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if not call.done.wait(timeout):
+                with self._lock:
+                    self.gave_up += 1
+                return fn()
+            if call.error is not None:
+                if share_error is not None and not share_error(call.error):
+                    return fn()
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "gave_up": self.gave_up,
+            "in_flight": len(self._calls),
+        }
@@ -0,0 +1,38 @@
+import time
+from typing import Callable, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Called as fn(statement, seconds) after every statement that completed
+_subscribers: List[Callable[[str, float], None]] = []
+_STARTED_KEY = "sql_started"
+
+
+def subscribe(fn: Callable[[str, float], None]) -> Callable[[str, float], None]:
+    """Time statements for ``fn``; one pair of engine listeners serves every subscriber."""
+    _subscribers.append(fn)
+    return fn
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _sql_started(conn, cursor, statement, parameters, context, executemany):
+    if _subscribers:
+        conn.info[_STARTED_KEY] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop(_STARTED_KEY, None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    for fn in _subscribers:
+        fn(statement, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _sql_failed(exception_context):
+    # A statement that raises never reaches after_cursor_execute
+    if exception_context.connection is not None:
+        exception_context.connection.info.pop(_STARTED_KEY, None)
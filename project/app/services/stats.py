@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.article import Article
+from app.models.stats import AuthorArticleStats, DailyArticleStats
+from app.services.sharding import bind_arguments_for_author
+
+_UPSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def _article_day(article: Article):
+    created = article.created_at or datetime.now(timezone.utc)
+    if created.tzinfo is not None:
+        created = created.astimezone(timezone.utc)
+    return created.date()
+
+
+def _increment(db: Session, model, key: dict, delta: int, bind_arguments: dict):
+    table = model.__table__
+    insert = _UPSERTS.get(db.get_bind(**bind_arguments).dialect.name)
+    if insert is None:
+        updated = (
+            db.query(model)
+            .filter_by(**key)
+            .update({model.article_count: model.article_count + delta}, synchronize_session=False)
+        )
+        if not updated:
+            db.add(model(**key, article_count=delta))
+        return
+    stmt = insert(table).values(**key, article_count=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={"article_count": table.c.article_count + delta},
+    )
+    db.execute(stmt, bind_arguments=bind_arguments)
+
+
+def record_article_created(db: Session, article: Article):
+    """Bump the rollups in the writer's transaction; call after the article is flushed."""
+    # When sharded, both rollups live on the article's shard
+    shard = bind_arguments_for_author(db, article.author_id)
+    _increment(db, AuthorArticleStats, {"author_id": article.author_id}, 1, shard)
+    _increment(db, DailyArticleStats, {"day": _article_day(article)}, 1, shard)
+
+
+def record_article_deleted(db: Session, article: Article):
+    shard = bind_arguments_for_author(db, article.author_id)
+    _increment(db, AuthorArticleStats, {"author_id": article.author_id}, -1, shard)
+    _increment(db, DailyArticleStats, {"day": _article_day(article)}, -1, shard)
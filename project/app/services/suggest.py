@@ -0,0 +1,218 @@
+import array
+import bisect
+import heapq
+import logging
+import math
+import threading
+from itertools import chain, islice, takewhile
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services import article_indexes, metrics
+from app.services.article_indexes import keep_fresh, sync_index
+
+logger = logging.getLogger(__name__)
+
+
+class _Title(NamedTuple):
+    id: int
+    title: str
+
+
+class TitleIndex:
+    """
+    Case-insensitive title prefix index, one entry per article id.
+
+    Keys are the casefolded first SUGGEST_KEY_CHARS characters of the title, so a prefix
+    lookup is one bisect plus a scan of the matches. Entries live in a sorted base (three
+    parallel arrays, rebuilt in bulk) and a small sorted delta of recent writes that is
+    folded into the base once it outgrows about sqrt(n), so a write never shifts the whole
+    base. Past SUGGEST_MAX_ENTRIES titles the index goes cold and callers fall back to the
+    database.
+    """
+
+    def __init__(self, max_entries: int = None, key_chars: int = None):
+        self.max_entries = max_entries or settings.SUGGEST_MAX_ENTRIES
+        self.key_chars = key_chars or settings.SUGGEST_KEY_CHARS
+        self._lock = threading.RLock()
+        self._keys: List[str] = []
+        self._titles: List[str] = []
+        self._ids = array.array("q")
+        # Ids whose base entry is still current; overwritten and removed ones drop out
+        self._base_live: Set[int] = set()
+        self._delta: List[Tuple[str, int, str]] = []
+        self._entries: Dict[int, Tuple[str, str]] = {}
+        # Writes seen while load() reads the table, replayed onto the new contents
+        self._replay: Optional[List[Tuple[int, Optional[str]]]] = None
+        self.cursors: dict = {}
+        self._synced = False
+        # Over capacity: stays empty and cold until the next load()
+        self.full = False
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def warm(self) -> bool:
+        return self._synced and not self.full
+
+    @warm.setter
+    def warm(self, synced: bool):
+        self._synced = synced
+
+    def _key(self, title: str) -> str:
+        return title[: self.key_chars].casefold()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _set_base(self, entries: List[Tuple[str, int, str]]):
+        self._keys = [e[0] for e in entries]
+        self._ids = array.array("q", (e[1] for e in entries))
+        self._titles = [e[2] for e in entries]
+        self._base_live = set(self._ids)
+        self._delta = []
+        self._entries = {article_id: (key, title) for key, article_id, title in entries}
+
+    def _overflow(self):
+        logger.warning("more than %d titles, suggestions served by the database", self.max_entries)
+        self._set_base([])
+        self.full = True
+
+    def load(self, rows) -> bool:
+        """Replace the contents with ``(id, title)`` rows; returns whether the index is warm."""
+        with self._lock:
+            self._replay = []
+        entries: Dict[int, Tuple[str, int, str]] = {}
+        try:
+            for article_id, title in rows:
+                if len(entries) >= self.max_entries:
+                    with self._lock:
+                        self._replay = None
+                        self._overflow()
+                    return False
+                entries[article_id] = (self._key(title), article_id, title)
+        except BaseException:
+            with self._lock:
+                self._replay = None
+            raise
+        with self._lock:
+            replay, self._replay = self._replay or [], None
+            self.full = False
+            self._set_base(sorted(entries.values()))
+            self.warm = True
+            for article_id, title in replay:
+                if title is None:
+                    self.remove(article_id)
+                else:
+                    self.add(article_id, title)
+            return self.warm
+
+    def apply(self, articles: Sequence, deleted: List[int]):
+        """Index ``articles`` (anything with ``id`` and ``title``) and drop the ``deleted`` ids."""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.extend((article_id, None) for article_id in deleted)
+                self._replay.extend((article.id, article.title) for article in articles)
+            if self.full:
+                return
+            for article_id in chain(deleted, (article.id for article in articles)):
+                self._discard(article_id)
+            if len(self._entries) + len(articles) > self.max_entries:
+                self._overflow()
+                return
+            for article in articles:
+                key = self._key(article.title)
+                self._entries[article.id] = (key, article.title)
+                self._delta.append((key, article.id, article.title))
+            # Sorted once per batch rather than an insort per title
+            self._delta.sort()
+            if len(self._delta) > max(64, math.isqrt(len(self._keys))):
+                self._compact()
+
+    def add(self, article_id: int, title: str):
+        """Index ``title`` for the article, replacing its previous title if any."""
+        self.apply([_Title(article_id, title)], [])
+
+    def remove(self, article_id: int):
+        self.apply([], [article_id])
+
+    def _discard(self, article_id: int):
+        entry = self._entries.pop(article_id, None)
+        if entry is None:
+            return
+        if article_id in self._base_live:
+            self._base_live.discard(article_id)
+            return
+        key, title = entry
+        i = bisect.bisect_left(self._delta, (key, article_id, title))
+        del self._delta[i]
+
+    def _compact(self):
+        base = (
+            (self._keys[i], self._ids[i], self._titles[i])
+            for i in range(len(self._keys))
+            if self._ids[i] in self._base_live
+        )
+        entries = list(heapq.merge(base, self._delta))
+        self._set_base(entries)
+
+    def _matches(self, key: str):
+        """Live ``(key, id, title)`` entries whose key starts with ``key``, in key order."""
+        i = bisect.bisect_left(self._keys, key)
+        base = (
+            (self._keys[j], self._ids[j], self._titles[j])
+            for j in range(i, len(self._keys))
+            if self._ids[j] in self._base_live
+        )
+        delta = islice(self._delta, bisect.bisect_left(self._delta, (key,)), None)
+        return takewhile(lambda e: e[0].startswith(key), heapq.merge(base, delta))
+
+    def search(self, prefix: str, limit: int) -> Optional[List[dict]]:
+        """Matching ``{"id", "title"}`` rows, or None while the index is cold."""
+        needle = prefix.casefold()
+        with self._lock:
+            if not self.warm:
+                self.misses += 1
+                return None
+            self.hits += 1
+            found = []
+            for _, article_id, title in self._matches(needle[: self.key_chars]):
+                if len(found) >= limit:
+                    break
+                # Keys are truncated, so long prefixes are confirmed against the full title
+                if len(needle) <= self.key_chars or title.casefold().startswith(needle):
+                    found.append({"id": article_id, "title": title})
+            return found
+
+    def stats(self) -> dict:
+        return {
+            "warm": self.warm,
+            "entries": len(self),
+            "cursors": self.cursors,
+            "pending_merge": len(self._delta),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+title_index = TitleIndex()
+metrics.register("title_index", title_index.stats)
+
+
+def sync_title_index(index: TitleIndex = None, db: Session = None) -> int:
+    """Catch the index up with the article change feed from its cursors; returns changes applied."""
+    # Not ``index or title_index``: an empty index is falsy
+    index = title_index if index is None else index
+    return sync_index(index, db, settings.SUGGEST_SYNC_BATCH, index.apply)
+
+
+async def keep_title_index_fresh(build_first: bool = True):
+    """Re-sync periodically to pick up other workers' writes (warm-up does the first sync)."""
+    await keep_fresh("title", sync_title_index, settings.SUGGEST_REFRESH_SECONDS, build_first)
+
+
+@article_indexes.on_commit("title", ("title",))
+def _apply_committed_changes(articles, deleted: List[int]):
+    title_index.apply(articles, deleted)
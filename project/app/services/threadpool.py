@@ -0,0 +1,143 @@
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Optional
+
+from anyio import to_thread
+
+from app.config import settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+
+class RequestWait:
+    """When the current request came in, and how long it then waited for a worker thread."""
+
+    def __init__(self):
+        self.entered = time.perf_counter()
+        self.seconds: Optional[float] = None
+
+
+# Set per request by ThreadpoolWaitMiddleware
+request_wait: contextvars.ContextVar[Optional[RequestWait]] = contextvars.ContextVar(
+    "threadpool_request_wait", default=None
+)
+
+
+class ThreadpoolMonitor:
+    """
+    Saturation of AnyIO's default thread limiter, read through its public API.
+
+    Sync route handlers and dependencies run in AnyIO's worker threads, and the limiter's
+    size is the real cap on how many of them run at once. AnyIO has no hook on token
+    acquisition, so for the metrics gauge queue wait is sampled with a probe: a no-op run
+    in the threadpool every THREADPOOL_PROBE_SECONDS waits in line like any handler.
+    Each request's own wait is measured by ``measure_wait``.
+    """
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.probes = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+        self.wait_dominated = 0
+
+    async def probe(self) -> float:
+        start = time.perf_counter()
+        started = await to_thread.run_sync(time.perf_counter)
+        wait = started - start
+        self._observe(wait)
+        return wait
+
+    def _observe(self, wait: float):
+        self.probes += 1
+        if wait > 0.0005:
+            self.waited += 1
+        self.wait_seconds += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.last_wait = wait
+
+    def stats(self) -> dict:
+        stats = self.limiter.statistics()
+        return {
+            "size": stats.total_tokens,
+            "active": stats.borrowed_tokens,
+            "waiting": stats.tasks_waiting,
+            "probes": self.probes,
+            "waited": self.waited,
+            "avg_wait_ms": round(self.wait_seconds / self.probes * 1000, 3) if self.probes else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "last_wait_ms": round(self.last_wait * 1000, 3),
+            "wait_dominated_requests": self.wait_dominated,
+        }
+
+
+_monitor: Optional[ThreadpoolMonitor] = None
+
+
+def install(size: int = None) -> ThreadpoolMonitor:
+    """Resize the default threadpool limiter and start reporting on it; call from the running event loop."""
+    global _monitor
+    size = size or settings.THREADPOOL_SIZE
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = size
+    if _monitor is None or _monitor.limiter is not limiter:
+        _monitor = ThreadpoolMonitor(limiter)
+    return _monitor
+
+
+def measure_wait():
+    """
+    Router dependency, declared ahead of the others: a sync no-op, so it starts once the
+    request holds a worker thread, and the time since the request came in is its wait.
+    """
+    current = request_wait.get()
+    if current is not None and current.seconds is None:
+        current.seconds = time.perf_counter() - current.entered
+
+
+def current_wait() -> float:
+    """Seconds the current request waited for a worker thread; 0 if it has not used one."""
+    current = request_wait.get()
+    if current is None or current.seconds is None:
+        return 0.0
+    return current.seconds
+
+
+async def keep_probing():
+    while True:
+        if _monitor is not None:
+            try:
+                await _monitor.probe()
+            except Exception:
+                logger.exception("threadpool probe failed")
+        await asyncio.sleep(settings.THREADPOOL_PROBE_SECONDS)
+
+
+def stats() -> dict:
+    if _monitor is None:
+        return {"size": settings.THREADPOOL_SIZE, "instrumented": False}
+    return _monitor.stats()
+
+
+metrics.register("threadpool", stats)
+
+
+def note_request(wait: float, duration: float) -> bool:
+    """Flag a request whose latency was mostly spent waiting for a worker thread."""
+    if duration * 1000 < settings.THREADPOOL_DIAGNOSE_MIN_MS:
+        return False
+    if wait < duration * settings.THREADPOOL_WAIT_DOMINANT_RATIO:
+        return False
+    if _monitor is not None:
+        _monitor.wait_dominated += 1
+    logger.warning(
+        "request latency dominated by threadpool wait; consider raising THREADPOOL_SIZE",
+        extra={"threadpool_wait_ms": round(wait * 1000, 3), "duration_ms": round(duration * 1000, 3)},
+    )
+    return True
@@ -0,0 +1,100 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from typing import Callable, List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services import sql_timing
+from app.services.profiling import current_profile
+
+_MAX_STATEMENT_CHARS = 2000
+
+current_trace: contextvars.ContextVar[Optional["RequestTrace"]] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+
+
+class RequestTrace:
+    """Cheap per-request record of SQL timings, pool wait and the thread running the endpoint."""
+
+    def __init__(self, max_statements: int = None):
+        self.max_statements = max_statements or settings.SLOW_JOURNAL_MAX_STATEMENTS
+        self.sql: List[dict] = []
+        self.sql_dropped = 0
+        self.pool_wait = 0.0
+        self.thread_id: Optional[int] = None
+
+    def record_sql(self, statement: str, elapsed: float):
+        if len(self.sql) >= self.max_statements:
+            self.sql_dropped += 1
+            return
+        self.sql.append(
+            {"statement": statement[:_MAX_STATEMENT_CHARS], "duration_ms": round(elapsed * 1000, 3)}
+        )
+
+
+def _traced(endpoint: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            profile = current_profile.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            with profile.sampling_current_thread():
+                return await endpoint(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        # Sync endpoints run in the threadpool; remember which thread so it can be sampled
+        trace = current_trace.get()
+        if trace is not None:
+            trace.thread_id = threading.get_ident()
+        profile = current_profile.get()
+        try:
+            if profile is None:
+                return endpoint(*args, **kwargs)
+            with profile.sampling_current_thread():
+                return endpoint(*args, **kwargs)
+        finally:
+            if trace is not None:
+                trace.thread_id = None
+
+    return wrapper
+
+
+class TracedRoute(APIRoute):
+    """Route class that exposes the endpoint's thread to the profiler and the slow-request journal."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _traced(endpoint), **kwargs)
+
+
+@sql_timing.subscribe
+def _record_sql(statement: str, elapsed: float):
+    trace = current_trace.get()
+    if trace is not None:
+        trace.record_sql(statement, elapsed)
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _transaction_created(session: Session, transaction):
+    if transaction.parent is None and current_trace.get() is not None:
+        session.info["trace_checkout_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_begin")
+def _transaction_began(session: Session, transaction, connection):
+    # Autobegin creates the transaction right before asking the pool for a connection,
+    # so the gap up to after_begin is dominated by the pool checkout.
+    started = session.info.pop("trace_checkout_started", None)
+    trace = current_trace.get()
+    if started is not None and trace is not None:
+        trace.pool_wait += time.perf_counter() - started
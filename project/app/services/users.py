@@ -0,0 +1,121 @@
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User
+from app.server import available_cpus, worker_count
+from app.services.passwords import hash_password, pwd_context
+
+_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _init_hasher(policy: str):
+    # Children hash with the parent's exact policy (scheme, bcrypt rounds)
+    pwd_context.load(policy)
+
+
+def _hash_workers() -> int:
+    # Each server worker starts its own pool; between them they get one process per CPU
+    return settings.PASSWORD_HASH_WORKERS or max(1, available_cpus() // worker_count())
+
+
+def _hash_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: forking a threaded server can copy held locks into the child
+            _pool = ProcessPoolExecutor(
+                max_workers=_hash_workers(),
+                mp_context=get_context("spawn"),
+                initializer=_init_hasher,
+                initargs=(pwd_context.to_string(),),
+            )
+        return _pool
+
+
+def shutdown_hash_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """bcrypt is CPU-bound; large batches are spread over a process pool, small ones hashed inline."""
+    if len(passwords) < settings.PASSWORD_HASH_PARALLEL_MIN:
+        return [hash_password(p) for p in passwords]
+    chunksize = max(1, len(passwords) // (_hash_workers() * 4))
+    return list(_hash_pool().map(hash_password, passwords, chunksize=chunksize))
+
+
+def _user_row(data: dict, hashed_password: str) -> dict:
+    row = {k: v for k, v in data.items() if k != "password"}
+    row["hashed_password"] = hashed_password
+    return row
+
+
+def _insert_skipping_conflicts(db: Session, rows: List[dict]) -> List[User]:
+    insert = _INSERTS.get(db.get_bind().dialect.name)
+    if insert is not None:
+        # Unique violations on username or email skip the row instead of aborting the statement
+        stmt = insert(User).on_conflict_do_nothing().returning(User)
+        return list(db.scalars(stmt, rows))
+    created = []
+    for row in rows:
+        try:
+            with db.begin_nested():
+                user = User(**row)
+                db.add(user)
+        except IntegrityError:
+            continue
+        created.append(user)
+    return created
+
+
+def create_user(db: Session, data: dict) -> Optional[User]:
+    """Insert one user in a single statement; returns None if the username or email is taken."""
+    created = _insert_skipping_conflicts(db, [_user_row(data, hash_password(data["password"]))])
+    return created[0] if created else None
+
+
+def bulk_create_users(
+    db: Session,
+    users: Iterable[dict],
+    batch_size: int = None,
+    commit: bool = False,
+) -> Tuple[int, List[str]]:
+    """
+    Hash and insert ``users`` in batches; returns (created count, skipped usernames).
+
+    With ``commit`` every batch is committed on its own, so a long import keeps its progress.
+    """
+    batch_size = batch_size or settings.USER_BULK_BATCH_SIZE
+    users = list(users)
+    hashes = hash_passwords([u["password"] for u in users])
+    created = 0
+    skipped: List[str] = []
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+        rows = [_user_row(u, h) for u, h in zip(batch, hashes[start:start + batch_size])]
+        inserted = Counter(user.username for user in _insert_skipping_conflicts(db, rows))
+        created += sum(inserted.values())
+        for row in rows:
+            if inserted[row["username"]]:
+                inserted[row["username"]] -= 1
+            else:
+                skipped.append(row["username"])
+        if commit:
+            db.commit()
+    return created, skipped
@@ -0,0 +1,107 @@
+import logging
+import time
+from contextlib import ExitStack
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models.article import Article
+from app.models.user import User
+from app.repositories.sql import SqlArticleRepository, SqlUserRepository
+from app.schemas.article import ArticleOut, ArticleSuggestion
+from app.schemas.user import UserOut
+from app.services.archive import article_archive
+from app.services.batch import fetch_by_ids
+from app.services.related import related_enabled, sync_related_index
+from app.services.semantic import semantic_search, sync_semantic_index
+from app.services.suggest import sync_title_index
+
+logger = logging.getLogger(__name__)
+
+# Read by /health/ready; a worker only reports ready once warm-up has finished
+state = {"ready": False, "duration_ms": None, "steps": {}}
+
+
+def open_pool_connections(bind: Engine, count: int) -> int:
+    """Check out ``count`` connections at once so the pool really opens them, then return them."""
+    with ExitStack() as stack:
+        for _ in range(count):
+            conn = stack.enter_context(bind.connect())
+            conn.execute(text("SELECT 1"))
+        return count
+
+
+def run_hot_queries(db: Session) -> int:
+    """Execute the statements behind the hottest routes once, for recently active rows."""
+    # Imported here: the routers import services, not the other way round
+    from app.routers.articles import _get_article_or_404
+    from app.routers.users import _get_user_or_404
+
+    recent = settings.WARMUP_RECENT_ROWS
+    articles: List[Article] = db.query(Article).order_by(Article.created_at.desc()).limit(recent).all()
+    author_ids = list(dict.fromkeys(a.author_id for a in articles))
+    users, _ = fetch_by_ids(db, User, author_ids) if author_ids else ([], [])
+    users += db.query(User).order_by(User.id.desc()).limit(recent).all()
+
+    article_repo, user_repo = SqlArticleRepository(db), SqlUserRepository(db)
+    for article in articles:
+        _get_article_or_404(article.id, article_repo)
+    for user in users:
+        # The principal lookup every authenticated request makes
+        user_repo.get_by_username(user.username)
+        _get_user_or_404(user.id, user_repo)
+    if articles:
+        fetch_by_ids(db, Article, [a.id for a in articles])
+
+    TypeAdapter(List[ArticleOut]).dump_json([ArticleOut.model_validate(a) for a in articles])
+    TypeAdapter(List[UserOut]).dump_json([UserOut.model_validate(u) for u in users])
+    TypeAdapter(List[ArticleSuggestion]).dump_json([])
+    db.rollback()
+    return len(articles) + len(users)
+
+
+def _step(name: str, fn: Callable, db: Session = None):
+    started = time.perf_counter()
+    try:
+        result = fn()
+    except Exception as exc:
+        logger.exception("warm-up step %s failed", name)
+        state["steps"][name] = {"error": str(exc)}
+        if db is not None:
+            # A failed statement leaves the shared session unusable until it is rolled back
+            db.rollback()
+        return
+    state["steps"][name] = {"ms": round((time.perf_counter() - started) * 1000, 3), "result": result}
+
+
+def warm_up(bind: Engine = engine, session_factory: Callable[[], Session] = SessionLocal) -> dict:
+    """
+    Open pool connections, run the hot queries, build the search and archive indexes.
+
+    Every step is best-effort: a failure is logged and recorded, and the worker still
+    becomes ready, just colder.
+    """
+    started = time.perf_counter()
+    state["steps"] = {}
+    if isinstance(bind, Engine):
+        _step("pool", lambda: open_pool_connections(bind, settings.WARMUP_POOL_CONNECTIONS))
+
+    with session_factory() as db:
+        _step("queries", lambda: run_hot_queries(db), db)
+        _step("title_index", lambda: sync_title_index(db=db), db)
+        if semantic_search.enabled:
+            # Maps the saved matrix, then embeds only what changed since it was built
+            _step("semantic_index", lambda: sync_semantic_index(db=db), db)
+        if related_enabled():
+            _step("related_index", lambda: sync_related_index(db=db), db)
+    _step("archive_index", lambda: article_archive.warm())
+
+    state["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    state["ready"] = True
+    logger.info("warm-up finished", extra={"duration_ms": state["duration_ms"]})
+    return state
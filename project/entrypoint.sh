@@ -4,8 +4,15 @@ set -e
 echo '=== Stamping Alembic (schema created by init.sql) ==='
 alembic stamp head
 
-echo '=== Seeding database ==='
-python scripts/seed.py
+if [ "${SEED_ON_START:-0}" = "1" ]; then
+    echo '=== Seeding database ==='
+    python scripts/seed.py
+fi
+
+if [ "${APP_ENV:-production}" = "development" ]; then
+    echo '=== Starting API server (development, --reload) ==='
+    exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+fi
 
 echo '=== Starting API server ==='
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+exec python -m app.server
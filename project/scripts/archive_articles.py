@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Moves articles older than a cutoff into month-grouped Parquet files (ARCHIVE_DIR).
+Archived articles stay readable through GET /articles/{id}.
+
+Usage:
+    python scripts/archive_articles.py --older-than-days 365
+    docker compose exec api python scripts/archive_articles.py
+"""
+import argparse
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services.archive import ArticleArchive
+
+
+def archive(older_than_days: int, root: str):
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    db = SessionLocal()
+    try:
+        moved = ArticleArchive(root).archive_older_than(db, cutoff)
+        print(f"[OK] Archived {moved} article(s) created before {cutoff:%Y-%m-%d} into {root}")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive old articles to Parquet")
+    parser.add_argument("--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--archive-dir", default=settings.ARCHIVE_DIR)
+    args = parser.parse_args()
+    archive(args.older_than_days, args.archive_dir)
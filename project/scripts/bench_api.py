@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full request cost (routing, auth, validation, serialization) of the hot
+article routes against in-memory SQLite vs. the in-memory repositories. The difference
+is what the database layer costs; the memory column is the framework floor.
+
+Usage:
+    python scripts/bench_api.py --requests 2000
+"""
+import argparse
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, get_db
+from app.main import app
+from app.models.user import UserRole
+from app.repositories.memory import MemoryUserRepository, use_memory_repositories
+from app.repositories.sql import SqlUserRepository
+from app.services.auth import create_access_token, pwd_context
+from app.services.events import Broker, get_broker
+
+pwd_context.update(bcrypt__rounds=4)
+USER = {"username": "bench", "email": "bench@example.com", "password": "x", "role": UserRole.user}
+
+
+def use_sqlite():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+
+    def _get_db():
+        with Session(engine, autoflush=False) as db:
+            yield db
+
+    app.dependency_overrides = {get_db: _get_db, get_broker: Broker}
+    with Session(engine) as db:
+        SqlUserRepository(db).create(USER)
+
+
+def use_memory():
+    app.dependency_overrides = {get_broker: Broker}
+    store = use_memory_repositories(app)
+    MemoryUserRepository(store).create(USER)
+
+
+def run(client: TestClient, requests: int) -> dict:
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench', 'role': 'user'})}"}
+    article_id = client.post("/articles/", json={"title": "bench", "content": "bench"}, headers=headers).json()["id"]
+    for i in range(20):
+        client.post("/articles/", json={"title": f"bench {i}", "content": "bench"}, headers=headers)
+    cases = {
+        "GET /articles/{id}": lambda: client.get(f"/articles/{article_id}", headers=headers),
+        "GET /articles/": lambda: client.get("/articles/?limit=20", headers=headers),
+        "POST /articles/": lambda: client.post("/articles/", json={"title": "t", "content": "c"}, headers=headers),
+    }
+    timings = {}
+    for name, call in cases.items():
+        call()
+        started = time.perf_counter()
+        for _ in range(requests):
+            call()
+        timings[name] = (time.perf_counter() - started) / requests * 1e6
+    return timings
+
+
+def main(requests: int):
+    client = TestClient(app)
+    use_sqlite()
+    sql = run(client, requests)
+    use_memory()
+    memory = run(client, requests)
+    app.dependency_overrides = {}
+    print(f"{'route':<22}{'sqlite (us)':>14}{'memory (us)':>14}{'db share':>10}")
+    for name in sql:
+        print(f"{name:<22}{sql[name]:>14.1f}{memory[name]:>14.1f}{1 - memory[name] / sql[name]:>10.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark request overhead with and without a database")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.requests)
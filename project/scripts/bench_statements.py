@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-lookup Python overhead of the hot statements, rebuilt with
+db.query(...) on every call (before) vs. cached lambda statements (after).
+Runs against in-memory SQLite so the numbers are dominated by SQLAlchemy, not the database.
+
+Usage:
+    python scripts/bench_statements.py --iterations 20000
+"""
+import argparse
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, lambda_stmt, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.user import User, UserRole
+from app.models.article import Article
+
+
+def setup() -> Session:
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    user = User(username="bench", email="bench@example.com", hashed_password="x", role=UserRole.user)
+    db.add(user)
+    db.flush()
+    db.add(Article(title="bench", content="bench", author_id=user.id))
+    db.commit()
+    return db
+
+
+def cases(db: Session):
+    username, user_id, article_id = "bench", 1, 1
+    return {
+        "User.username == ?": (
+            lambda: db.query(User).filter(User.username == username).first(),
+            lambda: db.execute(lambda_stmt(lambda: select(User).where(User.username == username))).scalar_one_or_none(),
+        ),
+        "User.id == ?": (
+            lambda: db.query(User).filter(User.id == user_id).first(),
+            lambda: db.execute(lambda_stmt(lambda: select(User).where(User.id == user_id))).scalar_one_or_none(),
+        ),
+        "Article.id == ?": (
+            lambda: db.query(Article).filter(Article.id == article_id).first(),
+            lambda: db.execute(lambda_stmt(lambda: select(Article).where(Article.id == article_id))).scalar_one_or_none(),
+        ),
+    }
+
+
+def main(iterations: int):
+    db = setup()
+    print(f"{'statement':<22}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for name, (before, after) in cases(db).items():
+        before(), after()  # warm the compiled cache
+        t_before = min(timeit.repeat(before, number=iterations, repeat=3)) / iterations * 1e6
+        t_after = min(timeit.repeat(after, number=iterations, repeat=3)) / iterations * 1e6
+        print(f"{name:<22}{t_before:>14.1f}{t_after:>14.1f}{t_before / t_after:>9.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark hot-path statement overhead")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Embeds every article and saves the semantic search matrix to SEMANTIC_INDEX_DIR.
+Workers memory-map the saved matrix at startup and only embed what changed since.
+
+Usage:
+    python scripts/build_semantic_index.py
+    docker compose exec api python scripts/build_semantic_index.py
+"""
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services.semantic import SemanticSearch, build_semantic_index
+
+
+def build(directory: str):
+    search = SemanticSearch()
+    with SessionLocal() as db:
+        count = build_semantic_index(search, db, directory)
+    print(f"[OK] Embedded {count} article change(s) with {search.embedder.name} into {directory}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and save the semantic search index")
+    parser.add_argument("--index-dir", default=settings.SEMANTIC_INDEX_DIR)
+    args = parser.parse_args()
+    build(args.index_dir)
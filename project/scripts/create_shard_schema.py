@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Creates the article tables on every database in ARTICLE_SHARDS and the article id
+allocator on DATABASE_URL. Safe to re-run; existing tables are left alone.
+
+Usage:
+    ARTICLE_SHARDS='{"a": "postgresql://...", "b": "postgresql://..."}' python scripts/create_shard_schema.py
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database import sharded_db
+
+
+if __name__ == "__main__":
+    if sharded_db is None:
+        sys.exit("ARTICLE_SHARDS is not set")
+    sharded_db.create_schema()
+    print(f"[OK] Article tables ready on {len(sharded_db.shards)} shard(s): {', '.join(sharded_db.shards)}")
@@ -7,47 +7,77 @@ Usage (locally):
 
 Usage (via Docker):
     docker compose exec api python scripts/create_user.py --username john --email john@example.com --password secret123 --role admin
+
+Bulk import from a CSV with a header row: username,email,password[,role]
+    python scripts/create_user.py --from-csv users.csv
 """
 import argparse
+import csv
 import sys
 import os
+import time
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from app.database import SessionLocal
-from app.models.user import User, UserRole
-from app.services.auth import hash_password
+from app.models.user import UserRole
+from app.services import users
 
 
 def create_user(username: str, email: str, password: str, role: str):
     db = SessionLocal()
     try:
-        existing = db.query(User).filter(
-            (User.username == username) | (User.email == email)
-        ).first()
-        if existing:
+        user = users.create_user(
+            db, {"username": username, "email": email, "password": password, "role": UserRole(role)}
+        )
+        if user is None:
             print(f"[ERROR] User '{username}' or email '{email}' already exists.")
             sys.exit(1)
-
-        user = User(
-            username=username,
-            email=email,
-            hashed_password=hash_password(password),
-            role=UserRole(role),
-        )
-        db.add(user)
         db.commit()
-        db.refresh(user)
         print(f"[OK] Created user '{username}' with role '{role}' (id={user.id})")
     finally:
         db.close()
 
 
+def read_csv(path: str) -> list:
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        return [
+            {
+                "username": row["username"],
+                "email": row["email"],
+                "password": row["password"],
+                "role": UserRole(row.get("role") or "user"),
+            }
+            for row in csv.DictReader(fh)
+        ]
+
+
+def import_csv(path: str, batch_size: int):
+    rows = read_csv(path)
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        created, skipped = users.bulk_create_users(db, rows, batch_size=batch_size, commit=True)
+    finally:
+        db.close()
+        users.shutdown_hash_pool()
+    print(f"[OK] Imported {created} user(s) in {time.perf_counter() - started:.1f}s")
+    if skipped:
+        print(f"[SKIP] {len(skipped)} username/email conflict(s): {', '.join(skipped[:20])}")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Create a new user")
-    parser.add_argument("--username", required=True)
-    parser.add_argument("--email", required=True)
-    parser.add_argument("--password", required=True)
-    parser.add_argument("--role", required=True, choices=["user", "editor", "admin"])
+    parser.add_argument("--username")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    parser.add_argument("--role", choices=["user", "editor", "admin"])
+    parser.add_argument("--from-csv", metavar="PATH", help="Import users from a CSV file instead")
+    parser.add_argument("--batch-size", type=int, default=None)
     args = parser.parse_args()
-    create_user(args.username, args.email, args.password, args.role)
+    if args.from_csv:
+        import_csv(args.from_csv, args.batch_size)
+    elif not all((args.username, args.email, args.password, args.role)):
+        parser.error("--username, --email, --password and --role are required without --from-csv")
+    else:
+        create_user(args.username, args.email, args.password, args.role)
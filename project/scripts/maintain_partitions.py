@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Creates the upcoming monthly partitions of the articles table.
+The API also does this on startup; run it from cron for long-lived deployments.
+
+Usage:
+    python scripts/maintain_partitions.py --months-ahead 3
+    docker compose exec api python scripts/maintain_partitions.py
+"""
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.config import settings
+from app.services.partitions import ensure_article_partitions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create future article partitions")
+    parser.add_argument("--months-ahead", type=int, default=settings.ARTICLE_PARTITION_MONTHS_AHEAD)
+    args = parser.parse_args()
+    created = ensure_article_partitions(months_ahead=args.months_ahead)
+    print(f"[OK] Created {created} partition(s)")
@@ -16,18 +16,102 @@ CREATE TABLE IF NOT EXISTS users (
     created_at TIMESTAMP DEFAULT NOW()
 );
 
--- Articles table
+-- Articles table, range-partitioned by month on created_at
+CREATE SEQUENCE IF NOT EXISTS articles_id_seq;
+CREATE SEQUENCE IF NOT EXISTS article_change_seq;
+
 CREATE TABLE IF NOT EXISTS articles (
-    id SERIAL PRIMARY KEY,
+    id INTEGER NOT NULL DEFAULT nextval('articles_id_seq'),
     title VARCHAR(255) NOT NULL,
     content TEXT NOT NULL,
     author_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-    created_at TIMESTAMP DEFAULT NOW(),
-    updated_at TIMESTAMP DEFAULT NOW()
-);
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    version INTEGER NOT NULL DEFAULT 1,
+    change_seq BIGINT NOT NULL DEFAULT ((pg_current_xact_id()::text::bigint << 24) | (nextval('article_change_seq') & 16777215)),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+ALTER SEQUENCE articles_id_seq OWNED BY articles.id;
+
+CREATE TABLE IF NOT EXISTS articles_default PARTITION OF articles DEFAULT;
+
+-- Creates monthly partitions from from_month up to months_ahead months past now()
+CREATE OR REPLACE FUNCTION ensure_article_partitions(months_ahead integer DEFAULT 3, from_month date DEFAULT NULL)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    month_start date := date_trunc('month', COALESCE(from_month, now()::date))::date;
+    last_month date := (date_trunc('month', now()) + make_interval(months => months_ahead))::date;
+    month_end date;
+    part_name text;
+    stranded boolean;
+    created integer := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_article_partitions'));
+    WHILE month_start <= last_month LOOP
+        part_name := format('articles_p%s', to_char(month_start, 'YYYYMM'));
+        month_end := (month_start + interval '1 month')::date;
+        IF to_regclass(part_name) IS NULL THEN
+            -- PARTITION OF fails while the default partition holds rows of that month:
+            -- detach the default, create the month, move the rows over, attach it again
+            stranded := EXISTS (
+                SELECT 1 FROM articles_default WHERE created_at >= month_start AND created_at < month_end
+            );
+            IF stranded THEN
+                ALTER TABLE articles DETACH PARTITION articles_default;
+            END IF;
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF articles FOR VALUES FROM (%L) TO (%L)',
+                part_name, month_start, month_end
+            );
+            IF stranded THEN
+                WITH moved AS (
+                    DELETE FROM articles_default
+                    WHERE created_at >= month_start AND created_at < month_end
+                    RETURNING *
+                )
+                INSERT INTO articles SELECT * FROM moved;
+                ALTER TABLE articles ATTACH PARTITION articles_default DEFAULT;
+            END IF;
+            created := created + 1;
+        END IF;
+        month_start := month_end;
+    END LOOP;
+    RETURN created;
+END $$;
+
+SELECT ensure_article_partitions(3);
 
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_articles_title ON articles(title);
+CREATE INDEX IF NOT EXISTS idx_articles_title_pattern ON articles(title text_pattern_ops);
 CREATE INDEX IF NOT EXISTS idx_articles_author ON articles(author_id);
+CREATE INDEX IF NOT EXISTS idx_articles_created_at ON articles(created_at);
+CREATE INDEX IF NOT EXISTS idx_articles_change_seq ON articles(change_seq);
+
+
+-- Article statistics rollups (kept up to date by the article write routes)
+CREATE TABLE IF NOT EXISTS author_article_stats (
+    author_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    article_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS daily_article_stats (
+    day DATE PRIMARY KEY,
+    article_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_author_article_stats_count ON author_article_stats(article_count);
+
+
+-- Deleted articles, for incremental sync (GET /articles/changes)
+CREATE TABLE IF NOT EXISTS article_tombstones (
+    article_id INTEGER PRIMARY KEY,
+    author_id INTEGER NOT NULL,
+    change_seq BIGINT NOT NULL,
+    deleted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_article_tombstones_change_seq ON article_tombstones(change_seq);
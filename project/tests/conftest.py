@@ -1,53 +1,153 @@
+import os
+
 import pytest
+from fastapi import Request
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
 
 from app.database import Base, get_db
 from app.main import app
+import app.routers.articles as articles_router
 from app.models.user import User, UserRole
 from app.models.article import Article
-from app.services.auth import hash_password, create_access_token
+from app.services.auth import hash_password, create_access_token, pwd_context
+from app.services import deadlines, related, semantic, suggest
+from app.services.events import Broker, get_broker
+from app.services.login_throttle import LoginThrottle, get_login_throttle
+from app.services.suggest import TitleIndex
+
+# Cheapest bcrypt cost: keeps hash/verify semantics but costs ~1ms instead of ~250ms
+pwd_context.update(bcrypt__rounds=4)
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "sqlite://")
+WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+
+def worker_database_url(url: str, worker_id: str) -> str:
+    """Give every pytest-xdist worker its own database (in-memory SQLite is already per-process)."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        if not parsed.database or parsed.database == ":memory:":
+            return url
+        root, ext = os.path.splitext(parsed.database)
+        return parsed.set(database=f"{root}_{worker_id}{ext}").render_as_string(hide_password=False)
+    return parsed.set(database=f"{parsed.database}_{worker_id}").render_as_string(hide_password=False)
+
+
+def _recreate_server_database(url: str):
+    parsed = make_url(url)
+    admin = create_engine(parsed.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{parsed.database}"'))
+        conn.execute(text(f'CREATE DATABASE "{parsed.database}"'))
+    admin.dispose()
+
 
-engine = create_engine(
-    "sqlite://",
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
+def _make_engine(url: str):
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        _recreate_server_database(url)
+        return create_engine(url)
 
+    kwargs = {"connect_args": {"check_same_thread": False}}
+    if not parsed.database or parsed.database == ":memory:":
+        kwargs["poolclass"] = StaticPool
+    else:
+        if os.path.exists(parsed.database):
+            os.remove(parsed.database)
+    sqlite_engine = create_engine(url, **kwargs)
 
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_conn, _):
-    cursor = dbapi_conn.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
-    cursor.close()
+    @event.listens_for(sqlite_engine, "connect")
+    def set_sqlite_pragma(dbapi_conn, _):
+        # pysqlite's implicit BEGIN breaks SAVEPOINT; let SQLAlchemy emit BEGIN itself
+        dbapi_conn.isolation_level = None
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
 
+    @event.listens_for(sqlite_engine, "begin")
+    def do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return sqlite_engine
+
+
+engine = _make_engine(worker_database_url(TEST_DATABASE_URL, WORKER_ID))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
 
 
-def override_get_db():
-    db = TestingSessionLocal()
+@pytest.fixture
+def connection(schema):
+    """One outer transaction per test, rolled back at teardown."""
+    conn = engine.connect()
+    trans = conn.begin()
     try:
-        yield db
+        yield conn
     finally:
-        db.close()
+        trans.rollback()
+        conn.close()
 
 
-app.dependency_overrides[get_db] = override_get_db
+def _savepoint_session(connection) -> Session:
+    # commit() inside the app and the tests only releases a SAVEPOINT
+    return Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
 
 
 @pytest.fixture(autouse=True)
-def setup_db():
-    Base.metadata.create_all(bind=engine)
+def override_get_db(connection):
+    def _get_db(request: Request):
+        db = _savepoint_session(connection)
+        deadlines.attach(db, request)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
     yield
-    Base.metadata.drop_all(bind=engine)
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture(autouse=True)
+def broker():
+    broker = Broker()
+    app.dependency_overrides[get_broker] = lambda: broker
+    yield broker
+    app.dependency_overrides.pop(get_broker, None)
+
+
+@pytest.fixture(autouse=True)
+def login_throttle():
+    throttle = LoginThrottle()
+    app.dependency_overrides[get_login_throttle] = lambda: throttle
+    yield throttle
+    app.dependency_overrides.pop(get_login_throttle, None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes(monkeypatch):
+    # A test's commit() only releases a SAVEPOINT but still fires after_commit: without this,
+    # rows rolled back at the end of the test would stay in the process-wide indexes
+    monkeypatch.setattr(semantic.semantic_search, "index", None)
+    monkeypatch.setattr(related, "related_index", related.MinHashLSH() if related.related_enabled() else None)
+    index = TitleIndex()
+    monkeypatch.setattr(suggest, "title_index", index)
+    monkeypatch.setattr(articles_router, "title_index", index)
 
 
 @pytest.fixture
-def db():
-    db = TestingSessionLocal()
+def db(connection):
+    db = _savepoint_session(connection)
     try:
         yield db
     finally:
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import settings
+from app.models.article import Article
+from app.models.stats import AuthorArticleStats
+from app.routers import articles as articles_router
+from app.services.archive import ArticleArchive
+from app.services.changes import changes_since
+from app.services.stats import record_article_created
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    archive = ArticleArchive(str(tmp_path))
+    monkeypatch.setattr(articles_router, "article_archive", archive)
+    monkeypatch.setattr(settings, "ARCHIVE_ROW_GROUP_SIZE", 2)
+    return archive
+
+
+def _article(db, user, title, created_at):
+    article = Article(title=title, content=f"{title} body", author_id=user.id, created_at=created_at)
+    db.add(article)
+    return article
+
+
+def test_archive_moves_old_articles_by_month(db, archive, regular_user, tmp_path):
+    old = datetime(2020, 1, 10, tzinfo=timezone.utc)
+    for i in range(3):
+        _article(db, regular_user, f"jan{i}", old + timedelta(days=i))
+    _article(db, regular_user, "feb", datetime(2020, 2, 5, tzinfo=timezone.utc))
+    _article(db, regular_user, "fresh", datetime.now(timezone.utc))
+    db.commit()
+
+    moved = archive.archive_older_than(db, datetime(2021, 1, 1, tzinfo=timezone.utc))
+
+    assert moved == 4
+    assert [a.title for a in db.query(Article).all()] == ["fresh"]
+    manifest = archive._read_manifest()
+    assert [(f["month"], f["rows"], len(f["row_groups"])) for f in manifest["files"]] == [
+        ("2020-01", 3, 2),
+        ("2020-02", 1, 1),
+    ]
+    assert (tmp_path / manifest["files"][0]["path"]).exists()
+
+
+def test_archived_article_is_readable(client, db, archive, regular_user):
+    article = _article(db, regular_user, "ancient", datetime(2019, 5, 1, tzinfo=timezone.utc))
+    db.commit()
+    article_id = article.id
+    archive.archive_older_than(db, datetime(2020, 1, 1, tzinfo=timezone.utc))
+
+    resp = client.get(f"/articles/{article_id}", headers=auth_headers(regular_user))
+    assert resp.status_code == 200
+    assert resp.json()["title"] == "ancient"
+    assert resp.json()["created_at"].startswith("2019-05-01")
+
+
+def test_archived_article_is_read_only(client, db, archive, regular_user):
+    article = _article(db, regular_user, "ancient", datetime(2019, 5, 1, tzinfo=timezone.utc))
+    db.commit()
+    article_id = article.id
+    archive.archive_older_than(db, datetime(2020, 1, 1, tzinfo=timezone.utc))
+
+    resp = client.put(f"/articles/{article_id}", json={"title": "x"}, headers=auth_headers(regular_user))
+    assert resp.status_code == 409
+
+
+def test_archive_miss_is_404(client, archive, regular_user):
+    assert archive.get(12345) is None
+    assert client.get("/articles/12345", headers=auth_headers(regular_user)).status_code == 404
+
+
+def test_archive_reports_deletes_and_updates_rollups(db, archive, regular_user):
+    article = _article(db, regular_user, "ancient", datetime(2019, 5, 1, tzinfo=timezone.utc))
+    db.flush()
+    record_article_created(db, article)
+    db.commit()
+    article_id = article.id
+
+    archive.archive_older_than(db, datetime(2020, 1, 1, tzinfo=timezone.utc))
+
+    assert changes_since(db, 0, 10).deleted == [article_id]
+    assert db.query(AuthorArticleStats.article_count).filter_by(author_id=regular_user.id).scalar() == 0
+
+
+def test_failed_commit_publishes_nothing(db, archive, regular_user, tmp_path, monkeypatch):
+    _article(db, regular_user, "ancient", datetime(2019, 5, 1, tzinfo=timezone.utc))
+    db.commit()
+
+    def broken_commit():
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(db, "commit", broken_commit)
+    with pytest.raises(RuntimeError):
+        archive.archive_older_than(db, datetime(2020, 1, 1, tzinfo=timezone.utc))
+
+    assert archive._read_manifest() == {"files": []}
+    assert [p for p in tmp_path.rglob("*") if p.is_file()] == []
+
+
+def test_archived_reads_reuse_the_file_handle(db, archive, regular_user):
+    first = _article(db, regular_user, "one", datetime(2019, 5, 1, tzinfo=timezone.utc))
+    second = _article(db, regular_user, "two", datetime(2019, 5, 2, tzinfo=timezone.utc))
+    db.commit()
+    ids = [first.id, second.id]
+    archive.archive_older_than(db, datetime(2020, 1, 1, tzinfo=timezone.utc))
+
+    assert [archive.get(i).title for i in ids] == ["one", "two"]
+    handle = archive._files[0]._handle
+    assert handle is not None
+    archive.get(ids[0])
+    assert archive._files[0]._handle is handle
@@ -0,0 +1,58 @@
+import pytest
+
+from app.models.article import Article
+from app.services import article_indexes
+
+
+@pytest.fixture
+def received(monkeypatch):
+    calls = []
+    monkeypatch.setattr(article_indexes, "_subscribers", [])
+    article_indexes.on_commit("titles", ("title",))(lambda articles, deleted: calls.append((articles, deleted)))
+    return calls
+
+
+def test_subscriber_sees_creates_deletes_and_its_own_fields(db, received, regular_user):
+    article = Article(title="First", content="c", author_id=regular_user.id)
+    db.add(article)
+    db.commit()
+    assert [(a.id, a.title) for a in received[-1][0]] == [(article.id, "First")]
+
+    article.content = "only the body"
+    db.commit()
+    assert len(received) == 1
+
+    article.title = "Renamed"
+    db.commit()
+    assert [a.title for a in received[-1][0]] == ["Renamed"]
+
+    db.delete(article)
+    db.commit()
+    assert received[-1] == ([], [article.id])
+
+
+def test_created_and_deleted_in_one_transaction_is_only_deleted(db, received, regular_user):
+    article = Article(title="Brief", content="c", author_id=regular_user.id)
+    db.add(article)
+    db.flush()
+    db.delete(article)
+    db.commit()
+    assert received == [([], [article.id])]
+
+
+def test_rolled_back_writes_are_not_delivered(db, received, regular_user):
+    db.add(Article(title="Ghost", content="c", author_id=regular_user.id))
+    db.flush()
+    db.rollback()
+    assert received == []
+
+
+def test_failing_subscriber_does_not_fail_the_write(db, received, regular_user):
+    def broken(articles, deleted):
+        raise RuntimeError("index unavailable")
+
+    article_indexes.on_commit("broken", ("title",))(broken)
+    db.add(Article(title="Still saved", content="c", author_id=regular_user.id))
+    db.commit()
+    assert db.query(Article).filter(Article.title == "Still saved").count() == 1
+    assert len(received) == 1
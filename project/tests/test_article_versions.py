@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.models.article import Article
+from tests.conftest import _savepoint_session, auth_headers
+
+
+def test_get_returns_version_as_etag(client, regular_user, sample_article):
+    resp = client.get(f"/articles/{sample_article.id}", headers=auth_headers(regular_user))
+    assert resp.json()["version"] == 1
+    assert resp.headers["ETag"] == '"1"'
+
+
+def test_update_bumps_version(client, regular_user, sample_article):
+    resp = client.put(
+        f"/articles/{sample_article.id}",
+        json={"title": "Edited"},
+        headers={**auth_headers(regular_user), "If-Match": '"1"'},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["version"] == 2
+    assert resp.headers["ETag"] == '"2"'
+
+
+def test_stale_if_match_is_rejected(client, regular_user, sample_article):
+    headers = auth_headers(regular_user)
+    client.put(f"/articles/{sample_article.id}", json={"title": "First"}, headers=headers)
+
+    resp = client.put(
+        f"/articles/{sample_article.id}",
+        json={"title": "Second"},
+        headers={**headers, "If-Match": '"1"'},
+    )
+    assert resp.status_code == 412
+    assert resp.headers["ETag"] == '"2"'
+    assert client.get(f"/articles/{sample_article.id}", headers=headers).json()["title"] == "First"
+
+    resp = client.delete(f"/articles/{sample_article.id}", headers={**headers, "If-Match": '"1"'})
+    assert resp.status_code == 412
+
+
+def test_if_match_accepts_any_listed_tag_or_wildcard(client, regular_user, sample_article):
+    headers = auth_headers(regular_user)
+    resp = client.put(
+        f"/articles/{sample_article.id}",
+        json={"title": "A"},
+        headers={**headers, "If-Match": '"7", "1"'},
+    )
+    assert resp.status_code == 200
+    resp = client.put(f"/articles/{sample_article.id}", json={"title": "B"}, headers={**headers, "If-Match": "*"})
+    assert resp.status_code == 200
+    assert resp.json()["version"] == 3
+
+
+def test_concurrent_write_between_read_and_update_is_rejected(client, regular_user, sample_article, broker, monkeypatch):
+    def bump_then_publish(db, event, article):
+        # Another writer commits after this request read the row
+        db.execute(text("UPDATE articles SET version = version + 1 WHERE id = :id"), {"id": article.id})
+
+    monkeypatch.setattr(broker, "publish", bump_then_publish)
+    resp = client.put(
+        f"/articles/{sample_article.id}",
+        json={"title": "Lost update"},
+        headers=auth_headers(regular_user),
+    )
+    assert resp.status_code == 412
+
+
+def test_versioned_update_matches_no_row_after_concurrent_change(connection, sample_article):
+    first = _savepoint_session(connection)
+    second = _savepoint_session(connection)
+    try:
+        mine = first.query(Article).filter(Article.id == sample_article.id).one()
+        theirs = second.query(Article).filter(Article.id == sample_article.id).one()
+        theirs.title = "Theirs"
+        second.commit()
+
+        mine.title = "Mine"
+        with pytest.raises(StaleDataError):
+            first.flush()
+    finally:
+        first.close()
+        second.close()
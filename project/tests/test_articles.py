@@ -146,3 +146,48 @@ def test_articles_pagination_offset(client, regular_user, db):
     ids1 = {a["id"] for a in resp1.json()}
     ids2 = {a["id"] for a in resp2.json()}
     assert ids1.isdisjoint(ids2)
+
+
+def test_get_articles_by_ids_preserves_order(client, regular_user, db):
+    articles = [Article(title=f"A{i}", content="c", author_id=regular_user.id) for i in range(3)]
+    db.add_all(articles)
+    db.commit()
+    ids = [articles[2].id, 99999, articles[0].id]
+    resp = client.get(f"/articles/batch?ids={','.join(map(str, ids))}", headers=auth_headers(regular_user))
+    assert resp.status_code == 200
+    assert [a["id"] for a in resp.json()["items"]] == [articles[2].id, articles[0].id]
+    assert resp.json()["missing"] == [99999]
+
+
+def test_get_articles_by_ids_invalid(client, regular_user):
+    resp = client.get("/articles/batch?ids=1,abc", headers=auth_headers(regular_user))
+    assert resp.status_code == 422
+
+
+def test_get_articles_by_ids_too_many(client, regular_user):
+    ids = ",".join(str(i) for i in range(1, 200))
+    resp = client.get(f"/articles/batch?ids={ids}", headers=auth_headers(regular_user))
+    assert resp.status_code == 422
+
+
+def test_list_articles_created_range(client, regular_user, db):
+    from datetime import datetime, timezone
+
+    db.add(Article(title="Old", content="c", author_id=regular_user.id,
+                   created_at=datetime(2020, 1, 15, tzinfo=timezone.utc)))
+    db.add(Article(title="New", content="c", author_id=regular_user.id,
+                   created_at=datetime(2024, 6, 15, tzinfo=timezone.utc)))
+    db.commit()
+    resp = client.get(
+        "/articles/?created_from=2024-06-01T00:00:00Z&created_to=2024-07-01T00:00:00Z",
+        headers=auth_headers(regular_user),
+    )
+    assert [a["title"] for a in resp.json()] == ["New"]
+    resp = client.get("/articles/search?q=Old&created_to=2021-01-01T00:00:00Z", headers=auth_headers(regular_user))
+    assert [a["title"] for a in resp.json()] == ["Old"]
+
+
+def test_list_without_trailing_slash_still_lists(client, regular_user, sample_article):
+    resp = client.get("/articles", headers=auth_headers(regular_user))
+    assert resp.status_code == 200
+    assert [a["id"] for a in resp.json()] == [sample_article.id]
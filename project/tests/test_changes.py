@@ -0,0 +1,79 @@
+from app.models.article import Article, ArticleTombstone
+from tests.conftest import auth_headers
+
+
+def _changes(client, user, since=0, **params):
+    resp = client.get("/articles/changes", params={"since": since, **params}, headers=auth_headers(user))
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def test_full_sync_then_catch_up(client, regular_user, db):
+    first = Article(title="One", content="x", author_id=regular_user.id)
+    second = Article(title="Two", content="x", author_id=regular_user.id)
+    db.add_all([first, second])
+    db.commit()
+
+    page = _changes(client, regular_user)
+    assert [a["title"] for a in page["articles"]] == ["One", "Two"]
+    assert page["deleted"] == [] and page["has_more"] is False
+    cursor = page["cursor"]
+
+    assert _changes(client, regular_user, cursor) == {
+        "articles": [], "deleted": [], "cursor": cursor, "has_more": False,
+    }
+
+    headers = auth_headers(regular_user)
+    client.put(f"/articles/{first.id}", json={"title": "One, edited"}, headers=headers)
+    client.delete(f"/articles/{second.id}", headers=headers)
+
+    page = _changes(client, regular_user, cursor)
+    assert [a["title"] for a in page["articles"]] == ["One, edited"]
+    assert page["deleted"] == [second.id]
+    assert page["cursor"] > cursor
+
+
+def test_every_write_takes_a_higher_sequence(client, regular_user, sample_article, db):
+    before = sample_article.change_seq
+    client.put(f"/articles/{sample_article.id}", json={"content": "new"}, headers=auth_headers(regular_user))
+    db.refresh(sample_article)
+    assert sample_article.change_seq > before
+
+    client.delete(f"/articles/{sample_article.id}", headers=auth_headers(regular_user))
+    tombstone = db.get(ArticleTombstone, sample_article.id)
+    assert tombstone.author_id == regular_user.id
+    assert tombstone.change_seq > sample_article.change_seq
+
+
+def test_unchanged_flush_keeps_sequence(regular_user, sample_article, db):
+    before = sample_article.change_seq
+    sample_article.title = sample_article.title
+    db.commit()
+    db.refresh(sample_article)
+    assert sample_article.change_seq == before
+    assert sample_article.version == 1
+
+
+def test_pages_follow_sequence_order(client, regular_user, db):
+    articles = [Article(title=f"A{i}", content="x", author_id=regular_user.id) for i in range(5)]
+    db.add_all(articles)
+    db.commit()
+    headers = auth_headers(regular_user)
+    client.delete(f"/articles/{articles[1].id}", headers=headers)
+    client.put(f"/articles/{articles[0].id}", json={"title": "A0, edited"}, headers=headers)
+
+    seen, deleted, cursor = [], [], 0
+    while True:
+        page = _changes(client, regular_user, cursor, limit=2)
+        assert len(page["articles"]) + len(page["deleted"]) <= 2
+        seen += [a["title"] for a in page["articles"]]
+        deleted += page["deleted"]
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            break
+    assert seen == ["A2", "A3", "A4", "A0, edited"]
+    assert deleted == [articles[1].id]
+
+
+def test_changes_requires_auth(client):
+    assert client.get("/articles/changes").status_code == 401
@@ -0,0 +1,144 @@
+import asyncio
+
+from app.middleware.concurrency import (
+    AdaptiveLimiter,
+    ConcurrencyLimitMiddleware,
+    CRITICAL,
+    LOW,
+    NORMAL,
+    route_priority,
+)
+
+
+def _limiter(**kwargs):
+    defaults = dict(initial=4, min_limit=1, max_limit=100, tolerance=2.0, backoff=0.5, max_queue=10, max_wait=0.05)
+    defaults.update(kwargs)
+    return AdaptiveLimiter(**defaults)
+
+
+def test_route_priority_longest_prefix():
+    priorities = {"/articles": "normal", "/articles/search": "low", "/health": "critical"}
+    assert route_priority("/articles/search", priorities) == LOW
+    assert route_priority("/articles/5", priorities) == NORMAL
+    assert route_priority("/health", priorities) == CRITICAL
+    assert route_priority("/other", priorities) == NORMAL
+
+
+def test_low_priority_capped_and_critical_always_admitted():
+    async def run():
+        limiter = _limiter(max_wait=0)
+        assert await limiter.acquire(LOW)
+        assert await limiter.acquire(LOW)
+        assert not await limiter.acquire(LOW)
+        assert await limiter.acquire(NORMAL)
+        assert await limiter.acquire(NORMAL)
+        assert not await limiter.acquire(NORMAL)
+        assert await limiter.acquire(CRITICAL)
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.in_flight == 5
+    assert limiter.rejected == 2
+
+
+def test_queued_request_gets_released_slot():
+    async def run():
+        limiter = _limiter(initial=1, max_wait=1.0)
+        assert await limiter.acquire(NORMAL)
+        waiter = asyncio.ensure_future(limiter.acquire(NORMAL))
+        await asyncio.sleep(0)
+        limiter.release(0.01)
+        return await waiter, limiter
+
+    granted, limiter = asyncio.run(run())
+    assert granted
+    assert limiter.in_flight == 1
+    assert limiter.queued == 1
+
+
+def test_cancelled_waiter_gives_back_a_handed_over_slot(monkeypatch):
+    limiter = _limiter(initial=1, max_wait=1.0)
+
+    async def handed_over_then_cancelled(fut, timeout):
+        # The slot arrives just as the client disconnects (the race depends on the Python version)
+        limiter.release(0.01)
+        assert fut.result() is True
+        raise asyncio.CancelledError
+
+    async def run():
+        assert await limiter.acquire(NORMAL)
+        monkeypatch.setattr(asyncio, "wait_for", handed_over_then_cancelled)
+        try:
+            await limiter.acquire(NORMAL)
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(run())
+    assert limiter.in_flight == 0
+
+
+def test_limit_shrinks_on_slow_samples_and_grows_on_fast():
+    limiter = _limiter(initial=10)
+    limiter.in_flight = 9
+    limiter.release(0.01)
+    grown = limiter.limit
+    assert grown > 10
+    limiter.in_flight = 1
+    limiter.release(1.0)
+    assert limiter.limit == grown * 0.5
+
+
+def test_middleware_sheds_with_503_and_retry_after():
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def call(middleware, path):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await middleware({"type": "http", "path": path}, None, send)
+        return sent
+
+    async def run():
+        middleware = ConcurrencyLimitMiddleware(slow_app, _limiter(initial=1, max_wait=0.01))
+        first = asyncio.ensure_future(call(middleware, "/articles/"))
+        await asyncio.sleep(0)
+        shed = await call(middleware, "/articles/")
+        release.set()
+        await first
+        return shed, middleware.limiter
+
+    shed, limiter = asyncio.run(run())
+    assert shed[0]["status"] == 503
+    assert (b"retry-after", b"1") in shed[0]["headers"]
+    assert limiter.in_flight == 0
+
+
+def test_health_passes_through_app(client):
+    assert client.get("/health").status_code == 200
+
+
+def test_mixed_latency_healthy_traffic_does_not_shrink_the_limit():
+    limiter = _limiter(initial=64, min_limit=4, max_limit=512)
+    limiter.in_flight = 1
+    for i in range(500):
+        # Fast health checks and slower, steady article reads
+        route, latency = ("/health", 0.001) if i % 2 else ("/articles/{article_id}", 0.015 + (i % 5) * 0.001)
+        limiter.in_flight += 1
+        limiter.release(latency, route=route)
+    assert limiter.limit >= 64
+
+
+def test_critical_requests_do_not_move_the_limit():
+    limiter = _limiter(initial=10)
+    limiter.in_flight = 1
+    limiter.release(None)
+    assert limiter.limit == 10
+    assert limiter.baselines == {}
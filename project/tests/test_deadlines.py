@@ -0,0 +1,106 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.main import operational_error_handler
+from app.middleware.disconnect import DisconnectCancelMiddleware
+from app.services import deadlines
+
+SLOW_QUERY = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+)
+
+
+def test_statement_timeout_by_route(monkeypatch):
+    monkeypatch.setattr(deadlines.settings, "STATEMENT_TIMEOUTS_MS", {"/articles/search": 500})
+    monkeypatch.setattr(deadlines.settings, "DEFAULT_STATEMENT_TIMEOUT_MS", 0)
+    assert deadlines.statement_timeout_for("/articles/search") == 500
+    assert deadlines.statement_timeout_for("/articles/1") == 0
+
+
+def test_cancel_session_interrupts_running_statement():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    db = Session(engine)
+    errors = []
+
+    def run():
+        try:
+            db.execute(SLOW_QUERY)
+        except OperationalError as exc:
+            errors.append(exc)
+
+    worker = threading.Thread(target=run)
+    worker.start()
+    deadline = time.monotonic() + 5
+    while not deadlines.cancel_session(db):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    worker.join(5)
+
+    assert not worker.is_alive()
+    assert errors and deadlines.is_query_cancelled(errors[0])
+    db.close()
+    assert deadlines.cancel_session(db) is False
+
+
+def test_disconnect_cancels_request_sessions():
+    class FakeConnection:
+        cancelled = False
+
+        def cancel(self):
+            self.cancelled = True
+
+    class FakeSession:
+        def __init__(self):
+            self.info = {"dbapi_connections": [FakeConnection()]}
+
+    session = FakeSession()
+    scope = {"type": "http", "path": "/articles/search", "state": {"db_sessions": [session]}}
+    cancelled = asyncio.Event()
+
+    async def app(scope, receive, send):
+        assert (await receive())["type"] == "http.request"
+        assert (await receive())["type"] == "http.disconnect"
+        # Later polls keep reporting the disconnect instead of blocking
+        assert (await receive())["type"] == "http.disconnect"
+        cancelled.set()
+
+    messages = [{"type": "http.request", "body": b""}, {"type": "http.disconnect"}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        pass
+
+    async def run():
+        await DisconnectCancelMiddleware(app)(scope, receive, send)
+        for _ in range(100):
+            if session.info["dbapi_connections"][0].cancelled:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert cancelled.is_set()
+    assert session.info["dbapi_connections"][0].cancelled
+
+
+def test_cancelled_query_maps_to_504():
+    orig = sqlite3.OperationalError("interrupted")
+    exc = OperationalError("SELECT 1", {}, orig)
+    response = asyncio.run(operational_error_handler(None, exc))
+    assert response.status_code == 504
+
+
+def test_other_operational_errors_propagate():
+    exc = OperationalError("SELECT 1", {}, sqlite3.OperationalError("no such table: x"))
+    with pytest.raises(OperationalError):
+        asyncio.run(operational_error_handler(None, exc))
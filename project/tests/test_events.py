@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from app.models.article import Article
+from app.routers.articles import _event_stream
+from tests.conftest import auth_headers
+
+
+async def _drain(subscription, count):
+    await asyncio.sleep(0)
+    return [subscription.queue.get_nowait() for _ in range(count)]
+
+
+def _subscribe_then(broker, action, count):
+    async def run():
+        sub = broker.subscribe()
+        await asyncio.to_thread(action)
+        events = await _drain(sub, count)
+        sub.close()
+        return events, sub
+
+    return asyncio.run(run())
+
+
+def test_article_writes_publish_events(client, broker, regular_user):
+    headers = auth_headers(regular_user)
+
+    def writes():
+        article_id = client.post("/articles/", json={"title": "t", "content": "c"}, headers=headers).json()["id"]
+        client.put(f"/articles/{article_id}", json={"title": "t2"}, headers=headers)
+        client.delete(f"/articles/{article_id}", headers=headers)
+
+    events, sub = _subscribe_then(broker, writes, 3)
+    assert [e.op for e in events] == ["created", "updated", "deleted"]
+    assert len({e.id for e in events}) == 1
+    assert [e.seq for e in events] == [1, 2, 3]
+    assert broker.subscriber_count == 0
+
+
+def test_forbidden_write_publishes_nothing(client, broker, another_user, sample_article):
+    def forbidden():
+        client.put(f"/articles/{sample_article.id}", json={"title": "x"}, headers=auth_headers(another_user))
+
+    _subscribe_then(broker, forbidden, 0)
+    assert broker.published == 0
+
+
+def test_rolled_back_event_is_discarded(db, broker, regular_user):
+    article = Article(title="t", content="c", author_id=regular_user.id)
+    db.add(article)
+    db.flush()
+    broker.publish(db, "created", article)
+    db.rollback()
+    db.commit()
+    assert broker.published == 0
+
+
+def test_slow_subscriber_drops_instead_of_blocking(broker):
+    async def run():
+        sub = broker.subscribe(maxsize=1)
+        for i in range(3):
+            sub.offer(i)
+        return sub
+
+    sub = asyncio.run(run())
+    assert sub.queue.qsize() == 1
+    assert sub.dropped == 2
+
+
+def test_event_stream_formats_sse(broker, regular_user, db):
+    class FakeRequest:
+        disconnected = False
+
+        async def is_disconnected(self):
+            return self.disconnected
+
+    async def run():
+        request = FakeRequest()
+        sub = broker.subscribe()
+        article = Article(title="t", content="c", author_id=regular_user.id)
+        db.add(article)
+        db.flush()
+        broker.publish(db, "created", article)
+        db.commit()
+        stream = _event_stream(request, sub)
+        chunk = await stream.__anext__()
+        request.disconnected = True
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+        return chunk
+
+    chunk = asyncio.run(run())
+    assert chunk.startswith("id: 1\nevent: created\ndata: {")
+    assert broker.subscriber_count == 0
+
+
+def test_stream_requires_auth(client):
+    assert client.get("/articles/stream").status_code == 401
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from app.config import settings
+from app.services import journal
+from app.services.journal import SlowRequestJournal
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def slow_journal(tmp_path, monkeypatch):
+    store = SlowRequestJournal(str(tmp_path / "slow.journal"), slots=4, slot_bytes=4096)
+    monkeypatch.setattr(journal, "slow_journal", store)
+    import app.routers.slow_requests as slow_router
+
+    monkeypatch.setattr(slow_router, "slow_journal", store)
+    return store
+
+
+def test_ring_buffer_overwrites_oldest(slow_journal):
+    for i in range(6):
+        slow_journal.append({"path": f"/{i}"})
+    assert [e["seq"] for e in slow_journal.list()] == [6, 5, 4, 3]
+    assert slow_journal.get(2) is None
+    assert slow_journal.get(5)["path"] == "/4"
+    assert slow_journal.get(7) is None
+
+
+def test_oversized_entry_is_trimmed_to_slot(slow_journal):
+    sql = [{"statement": "SELECT " + "x" * 100, "duration_ms": 1.0}] * 200
+    seq = slow_journal.append({"method": "GET", "route": "/x", "sql": sql, "stack": "a;b"})
+    entry = slow_journal.get(seq)
+    assert 0 < len(entry["sql"]) < 200
+    assert entry["sql_dropped"] + len(entry["sql"]) == 200
+
+
+def test_empty_journal(slow_journal):
+    assert slow_journal.list() == []
+    assert slow_journal.get(1) is None
+
+
+def test_slow_request_is_journaled(client, slow_journal, monkeypatch, admin_user, sample_article):
+    monkeypatch.setattr(settings, "SLOW_REQUEST_MS", 0.001)
+    resp = client.get(f"/articles/{sample_article.id}?x=1", headers=auth_headers(admin_user))
+    assert resp.status_code == 200
+    monkeypatch.setattr(settings, "SLOW_REQUEST_MS", 0)
+
+    listing = client.get("/slow-requests/", headers=auth_headers(admin_user)).json()
+    assert listing[0]["route"] == "/articles/{article_id}"
+    entry = client.get(f"/slow-requests/{listing[0]['seq']}", headers=auth_headers(admin_user)).json()
+    assert entry["path_params"] == {"article_id": str(sample_article.id)}
+    assert entry["query"] == [["x", "1"]]
+    assert entry["status"] == 200
+    assert any("FROM articles" in q["statement"] for q in entry["sql"])
+
+
+def test_fast_request_is_not_journaled(client, slow_journal, admin_user):
+    client.get("/users/me", headers=auth_headers(admin_user))
+    assert slow_journal.list() == []
+
+
+def test_journal_admin_only(client, slow_journal, regular_user, admin_user):
+    assert client.get("/slow-requests/", headers=auth_headers(regular_user)).status_code == 403
+    assert client.get("/slow-requests/1", headers=auth_headers(admin_user)).status_code == 404
+
+
+def test_sample_stack_of_blocked_thread():
+    release = threading.Event()
+
+    def blocked_in_handler():
+        release.wait()
+
+    worker = threading.Thread(target=blocked_in_handler)
+    worker.start()
+    try:
+        assert "blocked_in_handler" in journal.sample_stack(worker.ident)
+    finally:
+        release.set()
+        worker.join()
+    assert journal.sample_stack(worker.ident) is None
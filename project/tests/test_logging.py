@@ -0,0 +1,77 @@
+import io
+import json
+import logging
+import queue
+
+import pytest
+
+from app.config import settings
+from app.services import logs
+from app.services.logs import DroppingQueueHandler
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def log_output(monkeypatch):
+    root = logging.getLogger()
+    saved = (root.handlers[:], root.level)
+    stream = io.StringIO()
+    logs.setup_logging(stream)
+
+    def lines():
+        logs.shutdown_logging()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield lines
+    logs.shutdown_logging()
+    root.handlers, root.level = saved
+    for name in ("uvicorn.access", "gunicorn.access"):
+        logging.getLogger(name).disabled = False
+
+
+def test_request_id_is_generated_and_echoed(client, regular_user):
+    resp = client.get("/users/me", headers=auth_headers(regular_user))
+    assert len(resp.headers["X-Request-ID"]) == 32
+
+    resp = client.get("/users/me", headers={**auth_headers(regular_user), "X-Request-ID": "abc-123"})
+    assert resp.headers["X-Request-ID"] == "abc-123"
+
+    resp = client.get("/health", headers={"X-Request-ID": "bad id\nforged"})
+    assert resp.headers["X-Request-ID"] != "bad id\nforged"
+
+
+def test_access_log_is_json_with_request_id(client, log_output, regular_user):
+    client.get("/users/me", headers={**auth_headers(regular_user), "X-Request-ID": "rid-1"})
+    access = [line for line in log_output() if line["logger"] == "app.access"]
+    assert access[-1]["request_id"] == "rid-1"
+    assert access[-1]["path"] == "/users/me"
+    assert access[-1]["status"] == 200
+    assert access[-1]["duration_ms"] >= 0
+
+
+def test_slow_sql_is_logged_with_request_id(client, log_output, monkeypatch, regular_user):
+    monkeypatch.setattr(settings, "LOG_SLOW_SQL_MS", 0.000001)
+    client.get("/users/me", headers={**auth_headers(regular_user), "X-Request-ID": "rid-sql"})
+    monkeypatch.setattr(settings, "LOG_SLOW_SQL_MS", 0)
+    sql = [line for line in log_output() if line["logger"] == "app.sql"]
+    assert sql and all(line["request_id"] == "rid-sql" for line in sql)
+    assert any("FROM users" in line["statement"] for line in sql)
+
+
+def test_exception_is_rendered_on_listener(log_output):
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("app.test").exception("failed %s", "here")
+    line = log_output()[-1]
+    assert line["message"] == "failed here"
+    assert "ValueError: boom" in line["exc"]
+    assert line["request_id"] == "-"
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(1))
+    record = logging.makeLogRecord({"msg": "x"})
+    for _ in range(3):
+        handler.handle(record)
+    assert handler.stats() == {"queued": 1, "capacity": 1, "dropped": 2}
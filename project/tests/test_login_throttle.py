@@ -0,0 +1,103 @@
+from app.config import settings
+from app.services.login_throttle import LoginThrottle
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _login(client, password, username="user1"):
+    return client.post("/auth/login", data={"username": username, "password": password})
+
+
+def test_backoff_doubles_after_free_failures(monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_FREE_FAILURES", 2)
+    clock = FakeClock()
+    throttle = LoginThrottle(clock=clock)
+    for _ in range(2):
+        throttle.record_failure("bob", "1.2.3.4")
+    assert throttle.retry_after("bob", "1.2.3.4") == 0
+
+    throttle.record_failure("bob", "1.2.3.4")
+    assert throttle.retry_after("bob", "5.6.7.8") == settings.LOGIN_BACKOFF_BASE_SECONDS
+    clock.now += settings.LOGIN_BACKOFF_BASE_SECONDS
+    throttle.record_failure("bob", "1.2.3.4")
+    assert throttle.retry_after("bob", None) == 2 * settings.LOGIN_BACKOFF_BASE_SECONDS
+    assert throttle.retry_after("alice", "5.6.7.8") == 0
+
+    throttle.record_success("bob")
+    assert throttle.retry_after("bob", None) == 0
+
+
+def test_failures_expire(monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_FREE_FAILURES", 0)
+    clock = FakeClock()
+    throttle = LoginThrottle(clock=clock)
+    throttle.record_failure("bob", None)
+    clock.now += settings.LOGIN_FAILURE_TTL_SECONDS + 1
+    throttle.record_failure("bob", None)
+    # The expired streak restarted, so this is the first backoff step again
+    assert throttle.retry_after("bob", None) == settings.LOGIN_BACKOFF_BASE_SECONDS
+
+
+def test_tracked_keys_are_bounded():
+    throttle = LoginThrottle(max_keys=3)
+    for i in range(5):
+        throttle.record_failure(f"user{i}", None)
+    assert throttle.stats()["tracked_keys"] == 3
+    assert throttle.stats()["evicted"] == 2
+
+
+def test_throttled_login_skips_password_check(client, login_throttle, regular_user, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_FREE_FAILURES", 3)
+    for _ in range(4):
+        assert _login(client, "wrong").status_code == 401
+
+    verified = login_throttle.verifications
+    resp = _login(client, "testpass")
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) >= 1
+    assert login_throttle.verifications == verified
+    stats = login_throttle.stats()
+    assert stats["rejected"] == 1
+    assert stats["bcrypt_seconds_saved"] > 0
+
+
+def test_per_ip_limit_covers_many_usernames(client, login_throttle, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_IP_FREE_FAILURES", 2)
+    for name in ("a", "b", "c"):
+        assert _login(client, "x", username=name).status_code == 401
+    assert _login(client, "x", username="d").status_code == 429
+
+
+def test_successful_login_resets_username(client, regular_user, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_FREE_FAILURES", 1)
+    assert _login(client, "wrong").status_code == 401
+    assert _login(client, "testpass").status_code == 200
+    # Without the reset this would be the second failure in a row and be throttled
+    assert _login(client, "wrong").status_code == 401
+    assert _login(client, "testpass").status_code == 200
+
+
+def test_successful_login_decays_the_ip_count(monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_IP_FREE_FAILURES", 4)
+    throttle = LoginThrottle(clock=FakeClock())
+    for name in "abcd":
+        throttle.record_failure(name, "1.2.3.4")
+    throttle.record_success("e", "1.2.3.4")
+    # Two failures left on the IP, so two more are still free
+    for name in "fg":
+        throttle.record_failure(name, "1.2.3.4")
+    assert throttle.retry_after("h", "1.2.3.4") == 0
+    throttle.record_failure("h", "1.2.3.4")
+    assert throttle.retry_after("i", "1.2.3.4") > 0
+
+    for _ in range(3):
+        throttle.record_success("e", "1.2.3.4")
+    # Only the seven usernames are left; the IP's count reached zero
+    assert throttle.stats()["tracked_keys"] == 7
+    assert throttle.retry_after("i", "1.2.3.4") == 0
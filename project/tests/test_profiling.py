@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.services import profiling, sql_timing
+from app.services.profiling import ProfileStore
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ProfileStore(str(tmp_path))
+    monkeypatch.setattr(profiling, "profile_store", store)
+    import app.routers.profiles as profiles_router
+
+    monkeypatch.setattr(profiles_router, "profile_store", store)
+    return store
+
+
+def _profiled_get(client, user, path):
+    return client.get(path, headers={**auth_headers(user), "X-Profile": "1"})
+
+
+def test_admin_request_is_profiled(client, store, admin_user, sample_article):
+    resp = _profiled_get(client, admin_user, f"/articles/{sample_article.id}")
+    assert resp.status_code == 200
+    profile_id = resp.headers["X-Profile-Id"]
+
+    profile = client.get(f"/profiles/{profile_id}", headers=auth_headers(admin_user)).json()
+    assert profile["path"] == f"/articles/{sample_article.id}"
+    assert any("FROM articles" in q["statement"] for q in profile["sql"])
+
+    listing = client.get("/profiles/", headers=auth_headers(admin_user)).json()
+    assert [p["id"] for p in listing] == [profile_id]
+
+    folded = client.get(f"/profiles/{profile_id}/flamegraph", headers=auth_headers(admin_user))
+    assert folded.status_code == 200
+    assert folded.headers["content-type"].startswith("text/plain")
+
+
+def test_non_admin_header_is_ignored(client, store, regular_user, sample_article):
+    resp = _profiled_get(client, regular_user, f"/articles/{sample_article.id}")
+    assert resp.status_code == 200
+    assert "X-Profile-Id" not in resp.headers
+    assert store.list() == []
+
+
+def test_no_header_no_profile(client, store, admin_user):
+    resp = client.get("/users/me", headers=auth_headers(admin_user))
+    assert "X-Profile-Id" not in resp.headers
+    assert store.list() == []
+
+
+def test_profiles_admin_only(client, store, regular_user):
+    assert client.get("/profiles/", headers=auth_headers(regular_user)).status_code == 403
+
+
+def test_unknown_profile_404(client, store, admin_user):
+    assert client.get("/profiles/doesnotexist", headers=auth_headers(admin_user)).status_code == 404
+    assert client.get("/profiles/..%2Fx", headers=auth_headers(admin_user)).status_code == 404
+
+
+def test_folded_output_from_samples():
+    profile = profiling.RequestProfile("GET", "/x", interval=0.001)
+    profile.stacks["a;b"] += 3
+    profile.stacks["a;c"] += 1
+    assert profile.folded() == "a;b 3\na;c 1\n"
+
+
+def test_failed_statement_leaves_no_timing_behind():
+    bind = create_engine("sqlite://")
+    with bind.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        assert sql_timing._STARTED_KEY not in conn.info
+
+        timed = []
+        sql_timing._subscribers.append(lambda statement, elapsed: timed.append(statement))
+        try:
+            conn.execute(text("SELECT 1"))
+        finally:
+            sql_timing._subscribers.pop()
+        assert timed == ["SELECT 1"]
+    bind.dispose()
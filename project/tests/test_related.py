@@ -0,0 +1,99 @@
+import pytest
+
+from app.models.article import Article
+from app.services import related
+from app.services.related import MinHashLSH, shingles, sync_related_index
+from tests.conftest import auth_headers
+
+BASE = (
+    "Postgres autovacuum reclaims dead tuples left behind by updates and deletes so that "
+    "tables and btree indexes do not bloat and sequential scans stay fast over time"
+)
+NEAR = BASE + " in busy systems"
+OTHER = "Sourdough needs a lively starter plus flour water and salt and a long cold proof overnight"
+
+
+@pytest.fixture
+def index(monkeypatch, db):
+    index = MinHashLSH(num_perm=64, bands=16, shingle_words=3)
+    monkeypatch.setattr(related, "related_index", index)
+    return index
+
+
+def _add(db, author, title, content):
+    article = Article(title=title, content=content, author_id=author.id)
+    db.add(article)
+    db.commit()
+    return article
+
+
+def test_shingles():
+    assert shingles("A b, C d", 3) == {"a b c", "b c d"}
+    assert shingles("Short one", 3) == {"short one"}
+    assert shingles("...", 3) == set()
+
+
+def test_estimate_tracks_jaccard_and_skips_unrelated():
+    index = MinHashLSH(num_perm=128, bands=32, shingle_words=3)
+    index.add(1, BASE)
+    index.add(2, OTHER)
+
+    [(article_id, estimate)] = index.query(NEAR, 10)
+    exact = len(shingles(BASE, 3) & shingles(NEAR, 3)) / len(shingles(BASE, 3) | shingles(NEAR, 3))
+    assert article_id == 1
+    assert abs(estimate - exact) < 0.15
+    assert index.query(BASE, 10, exclude=1) == []
+
+    assert index.remove(1) is True
+    assert index.query(NEAR, 10) == []
+    assert not any(1 in bucket for band in index._buckets for bucket in band.values())
+
+
+def test_related_endpoint(client, regular_user, db, index):
+    headers = auth_headers(regular_user)
+    base = _add(db, regular_user, "Vacuum", BASE)
+    assert client.get(f"/articles/{base.id}/related", headers=headers).status_code == 503
+
+    near = _add(db, regular_user, "Vacuum again", NEAR)
+    _add(db, regular_user, "Bread", OTHER)
+    assert sync_related_index(index, db) == 3
+
+    resp = client.get(f"/articles/{base.id}/related", headers=headers)
+    assert resp.status_code == 200
+    [hit] = resp.json()
+    assert hit["id"] == near.id and hit["title"] == "Vacuum again"
+    assert 0.5 < hit["similarity"] <= 1
+    assert client.get("/articles/99999/related", headers=headers).status_code == 404
+
+
+def test_duplicate_check_on_create(client, regular_user, db, index):
+    sync_related_index(index, db)
+    headers = auth_headers(regular_user)
+    first = client.post("/articles/", json={"title": "Vacuum", "content": BASE}, headers=headers).json()
+    assert first["id"] in index
+
+    resp = client.post(
+        "/articles/?check_duplicates=true", json={"title": "Copy", "content": BASE}, headers=headers
+    )
+    assert resp.status_code == 409
+    assert resp.json()["detail"]["duplicates"] == [{"id": first["id"], "similarity": 1.0}]
+
+    resp = client.post(
+        "/articles/?check_duplicates=true", json={"title": "Bread", "content": OTHER}, headers=headers
+    )
+    assert resp.status_code == 201
+    # Without the flag duplicates are allowed
+    assert client.post("/articles/", json={"title": "Copy", "content": BASE}, headers=headers).status_code == 201
+
+
+def test_edits_and_deletes_update_buckets(client, regular_user, db, index):
+    sync_related_index(index, db)
+    headers = auth_headers(regular_user)
+    article_id = client.post("/articles/", json={"title": "Vacuum", "content": BASE}, headers=headers).json()["id"]
+
+    client.put(f"/articles/{article_id}", json={"content": OTHER}, headers=headers)
+    assert index.query(BASE, 5) == []
+    assert index.query(OTHER, 5)[0][0] == article_id
+
+    client.delete(f"/articles/{article_id}", headers=headers)
+    assert article_id not in index
@@ -0,0 +1,168 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.main import app
+from app.models.user import UserRole
+from app.repositories.memory import MemoryArticleRepository, MemoryStore, MemoryUserRepository, use_memory_repositories
+from app.repositories.sql import SqlArticleRepository, SqlUserRepository, get_article_repository, get_user_repository
+from app.services.auth import verify_password
+from tests.conftest import auth_headers
+
+
+@pytest.fixture(params=["sql", "memory"])
+def repos(request, db, broker):
+    if request.param == "sql":
+        return SqlUserRepository(db), SqlArticleRepository(db, broker)
+    store = MemoryStore()
+    return MemoryUserRepository(store), MemoryArticleRepository(store, broker)
+
+
+def _user(users, name, role=UserRole.user):
+    return users.create(
+        {"username": name, "email": f"{name}@test.com", "password": "pw", "role": role, "is_active": True}
+    )
+
+
+def test_user_create_lookup_and_conflicts(repos):
+    users, _ = repos
+    alice = _user(users, "alice")
+    assert verify_password("pw", alice.hashed_password)
+    assert users.get(alice.id).username == "alice"
+    assert users.get_by_username("alice").id == alice.id
+    assert users.get_by_username("nobody") is None
+    assert _user(users, "alice") is None
+
+    created, skipped = users.create_many(
+        [
+            {"username": "bob", "email": "bob@test.com", "password": "pw", "role": UserRole.user},
+            {"username": "alice", "email": "other@test.com", "password": "pw", "role": UserRole.user},
+        ]
+    )
+    assert (created, skipped) == (1, ["alice"])
+    bob = users.get_by_username("bob")
+    assert users.get_many([bob.id, 99999, alice.id]) == ([bob, alice], [99999])
+    assert [u.username for u in users.search("BO", 0, 10)] == ["bob"]
+
+
+def test_user_update_and_delete(repos):
+    users, _ = repos
+    alice = _user(users, "alice")
+    renamed = users.update(alice, {"username": "alicia", "role": UserRole.editor})
+    assert (renamed.username, renamed.role) == ("alicia", UserRole.editor)
+    assert users.get_by_username("alicia").id == alice.id
+    assert users.get_by_username("alice") is None
+
+    users.delete(renamed)
+    assert users.get(alice.id) is None
+
+
+@pytest.mark.parametrize("field", ["username", "email"])
+def test_user_update_to_a_taken_name_is_refused(repos, field):
+    users, _ = repos
+    alice, bob = _user(users, "alice"), _user(users, "bob")
+    with pytest.raises(IntegrityError):
+        users.update(bob, {field: getattr(alice, field)})
+    if isinstance(users, SqlUserRepository):
+        users.db.rollback()
+    assert users.get_by_username("alice").id == alice.id
+    assert users.get_by_username("bob").id == bob.id
+
+
+def test_user_delete_takes_their_articles(repos):
+    users, articles = repos
+    alice, bob = _user(users, "alice"), _user(users, "bob")
+    alice_id = alice.id
+    gone = articles.create({"title": "Hers", "content": "c"}, alice_id).id
+    kept = articles.create({"title": "His", "content": "c"}, bob.id).id
+
+    users.delete(alice)
+    assert articles.get(gone) is None
+    assert articles.list(0, 10, author_id=alice_id) == []
+    assert [a.id for a in articles.list(0, 10)] == [kept]
+
+
+def test_article_crud_bumps_version_and_publishes(repos, broker):
+    users, articles = repos
+    author = _user(users, "author")
+    article = articles.create({"title": "Hello", "content": "First body"}, author.id)
+    assert (article.version, article.author_id) == (1, author.id)
+    assert articles.get(article.id).title == "Hello"
+
+    updated = articles.update(article, {"title": "Hello again"})
+    assert (updated.title, updated.version) == ("Hello again", 2)
+
+    articles.delete(updated)
+    assert articles.get(article.id) is None
+    assert broker.published == 3
+
+
+def test_article_list_and_search_filters(repos):
+    users, articles = repos
+    first, second = _user(users, "first"), _user(users, "second")
+    a = articles.create({"title": "Python tips", "content": "generators"}, first.id)
+    b = articles.create({"title": "Rust", "content": "borrowing in PYTHON terms"}, second.id)
+    c = articles.create({"title": "Go", "content": "channels"}, first.id)
+
+    assert [x.id for x in articles.list(0, 10)] == [a.id, b.id, c.id]
+    assert [x.id for x in articles.list(1, 1)] == [b.id]
+    assert [x.id for x in articles.list(0, 10, author_id=first.id)] == [a.id, c.id]
+    assert articles.list(0, 10, created_to=datetime(2000, 1, 1, tzinfo=timezone.utc)) == []
+    assert [x.id for x in articles.search("python", 0, 10)] == [a.id, b.id]
+    assert articles.get_many([c.id, 99999]) == ([c], [99999])
+
+
+def test_memory_write_against_old_version_is_stale(broker):
+    # The SQL repository gets the same from version_id_col (tests/test_article_versions.py)
+    store = MemoryStore()
+    articles = MemoryArticleRepository(store, broker)
+    article = articles.create({"title": "A", "content": "x"}, author_id=1)
+    articles.update(article, {"title": "B"})
+
+    with pytest.raises(StaleDataError):
+        articles.update(article, {"title": "C"})
+    with pytest.raises(StaleDataError):
+        articles.delete(article)
+    assert articles.get(article.id).title == "B"
+    assert article.title == "A"
+
+
+@pytest.fixture
+def memory_store():
+    store = use_memory_repositories(app)
+    yield store
+    app.dependency_overrides.pop(get_user_repository, None)
+    app.dependency_overrides.pop(get_article_repository, None)
+
+
+def test_api_runs_against_the_memory_backend(client, memory_store, broker):
+    users = MemoryUserRepository(memory_store)
+    admin = _user(users, "root", UserRole.admin)
+    writer = _user(users, "writer")
+
+    resp = client.post("/auth/login", data={"username": "writer", "password": "pw"})
+    assert resp.status_code == 200
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    resp = client.post("/articles/", json={"title": "In memory", "content": "no database"}, headers=headers)
+    assert resp.status_code == 201
+    article_id = resp.json()["id"]
+    assert memory_store.articles[article_id].author_id == writer.id
+
+    resp = client.put(
+        f"/articles/{article_id}", json={"title": "Edited"}, headers={**headers, "If-Match": '"1"'}
+    )
+    assert (resp.status_code, resp.headers["ETag"]) == (200, '"2"')
+    resp = client.put(f"/articles/{article_id}", json={"title": "Late"}, headers={**headers, "If-Match": '"1"'})
+    assert resp.status_code == 412
+
+    assert [a["title"] for a in client.get("/articles/", headers=headers).json()] == ["Edited"]
+    assert client.get(f"/articles/batch?ids={article_id},404", headers=headers).json()["missing"] == [404]
+    assert client.get("/users/me", headers=headers).json()["username"] == "writer"
+    assert client.get(f"/users/{writer.id}", headers=auth_headers(admin)).json()["email"] == "writer@test.com"
+
+    assert client.delete(f"/articles/{article_id}", headers=headers).status_code == 204
+    assert client.get(f"/articles/{article_id}", headers=headers).status_code == 404
+    assert broker.published == 3
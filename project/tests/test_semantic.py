@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from app.models.article import Article
+from app.services import semantic
+from app.services.semantic import HashEmbedder, SemanticSearch, VectorIndex, sync_semantic_index
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def search(monkeypatch):
+    search = SemanticSearch(HashEmbedder(64))
+    monkeypatch.setattr(semantic, "semantic_search", search)
+    import app.routers.articles as articles_router
+
+    monkeypatch.setattr(articles_router, "semantic_search", search)
+    return search
+
+
+def _add(db, author, title, content):
+    article = Article(title=title, content=content, author_id=author.id)
+    db.add(article)
+    db.commit()
+    return article
+
+
+def test_hash_embedder_is_deterministic_and_normalised():
+    embedder = HashEmbedder(64)
+    first, second, empty = embedder.embed(["Tuning Postgres", "tuning postgres!", ""])
+    assert first.dtype == np.float32
+    assert np.allclose(first, second)
+    assert np.isclose(np.linalg.norm(first), 1.0)
+    assert not empty.any()
+
+
+def test_vector_index_upsert_remove_and_top_k():
+    index = VectorIndex(dim=3)
+    index.upsert([1, 2, 3], np.eye(3, dtype=np.float32))
+    assert index.search([0.1, 0.9, 0.0], 2) == [(2, pytest.approx(0.9)), (1, pytest.approx(0.1))]
+
+    index.upsert([2], np.array([[1.0, 0.0, 0.0]], dtype=np.float32))
+    assert len(index) == 3
+    assert index.search([1.0, 0.0, 0.0], 1, exclude=1) == [(2, pytest.approx(1.0))]
+
+    assert index.remove(1) is True
+    assert index.remove(1) is False
+    # The last row moved into the hole and is still found by id
+    assert index.search([0.0, 0.0, 1.0], 1) == [(3, pytest.approx(1.0))]
+    assert sorted(int(i) for i in index._ids[: len(index)]) == [2, 3]
+
+
+def test_saved_index_is_memory_mapped_until_written(tmp_path):
+    index = VectorIndex(dim=2, name="test")
+    index.upsert([10, 20], np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32))
+    index.cursors = {"main": 7}
+    index.save(str(tmp_path))
+
+    assert VectorIndex.load(str(tmp_path), dim=2, name="other") is None
+    loaded = VectorIndex.load(str(tmp_path), dim=2, name="test")
+    assert loaded.mapped and isinstance(loaded._vectors, np.memmap)
+    assert loaded.cursors == {"main": 7}
+    assert loaded.search([0.0, 1.0], 1) == [(20, pytest.approx(1.0))]
+
+    loaded.upsert([30], np.array([[0.6, 0.8]], dtype=np.float32))
+    assert not loaded.mapped
+    assert [i for i, _ in loaded.search([0.6, 0.8], 3)] == [30, 20, 10]
+
+
+def test_search_endpoint_ranks_by_similarity(client, regular_user, db, search):
+    pg = _add(db, regular_user, "Postgres index tuning", "vacuum autovacuum btree index bloat")
+    _add(db, regular_user, "Baking bread", "flour water salt yeast sourdough starter")
+    headers = auth_headers(regular_user)
+
+    assert client.get("/articles/semantic-search", params={"q": "x"}, headers=headers).status_code == 503
+    search.load(directory="")
+    assert sync_semantic_index(search, db) == 2
+
+    resp = client.get("/articles/semantic-search", params={"q": "btree index bloat", "limit": 1}, headers=headers)
+    assert resp.status_code == 200
+    [hit] = resp.json()
+    assert hit["id"] == pg.id and hit["title"] == "Postgres index tuning"
+    assert 0 < hit["score"] <= 1
+
+
+def test_writes_update_the_index(client, regular_user, db, search):
+    search.load(directory="")
+    sync_semantic_index(search, db)
+    headers = auth_headers(regular_user)
+
+    article_id = client.post(
+        "/articles/", json={"title": "Sourdough", "content": "starter flour water"}, headers=headers
+    ).json()["id"]
+    assert article_id in search.index
+
+    client.put(f"/articles/{article_id}", json={"content": "kubernetes pods"}, headers=headers)
+    assert search.search("kubernetes pods", 1)[0][0] == article_id
+
+    client.delete(f"/articles/{article_id}", headers=headers)
+    assert article_id not in search.index
+
+
+def test_sync_resumes_from_cursor(client, regular_user, db):
+    first = _add(db, regular_user, "One", "alpha")
+    # Not the worker's instance, so only sync_semantic_index feeds it
+    replica = SemanticSearch(HashEmbedder(64))
+    replica.load(directory="")
+    assert sync_semantic_index(replica, db) == 1
+    cursor = replica.index.cursors["main"]
+
+    second = _add(db, regular_user, "Two", "beta")
+    client.delete(f"/articles/{first.id}", headers=auth_headers(regular_user))
+    assert sync_semantic_index(replica, db) == 2
+    assert replica.index.cursors["main"] > cursor
+    assert first.id not in replica.index and second.id in replica.index
@@ -0,0 +1,20 @@
+from app import server
+from app.config import settings
+
+
+def test_worker_count_defaults_to_cpus(monkeypatch):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 0)
+    assert server.worker_count() == server.available_cpus()
+
+
+def test_worker_count_override(monkeypatch):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 3)
+    assert server.worker_count() == 3
+
+
+def test_gunicorn_options_preload_and_recycle():
+    options = server.gunicorn_options()
+    assert options["preload_app"] is True
+    assert options["max_requests"] == settings.MAX_REQUESTS
+    assert options["keepalive"] == settings.KEEPALIVE_TIMEOUT
+    assert "reload" not in options
@@ -0,0 +1,221 @@
+import json
+import threading
+
+import pytest
+from fastapi import Request
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+
+from app.database import Base, get_db
+from app.main import app
+from app.models.article import Article, ArticleTombstone
+from app.models.user import UserRole
+from app.repositories.sql import SqlArticleRepository
+from app.services import deadlines
+from app.services.events import PostgresBroker
+from app.services.sharding import HashRing, ShardedDatabase, article_ids, fan_out, shard_sessions
+from tests.conftest import auth_headers, make_user
+
+
+def _sqlite(path):
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    primary = _sqlite(tmp_path / "primary.db")
+    Base.metadata.create_all(primary)
+    database = ShardedDatabase(primary, {f"s{i}": _sqlite(tmp_path / f"s{i}.db") for i in range(3)}, vnodes=64)
+    database.create_schema()
+
+    def _get_db(request: Request):
+        db = database.session()
+        deadlines.attach(db, request)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = _get_db
+    yield database
+    app.dependency_overrides[get_db] = previous
+    database.dispose()
+    primary.dispose()
+
+
+@pytest.fixture
+def authors(sharded):
+    with Session(sharded.primary, expire_on_commit=False) as db:
+        return [make_user(db, f"author{i}", f"author{i}@test.com", UserRole.user) for i in range(6)]
+
+
+def _shard_rows(sharded, model=Article):
+    rows = {}
+    for name, engine in sharded.shards.items():
+        with Session(engine) as db:
+            rows[name] = db.scalars(select(model)).all()
+    return rows
+
+
+def _count_selects(sharded):
+    counts = {name: 0 for name in sharded.shards}
+    for name, engine in sharded.shards.items():
+        def count(conn, cursor, statement, *args, name=name):
+            if statement.lstrip().upper().startswith("SELECT"):
+                counts[name] += 1
+        event.listen(engine, "before_cursor_execute", count)
+    return counts
+
+
+def test_ring_is_stable_and_moves_about_one_nth_of_keys():
+    three = HashRing(["a", "b", "c"], vnodes=128)
+    four = HashRing(["a", "b", "c", "d"], vnodes=128)
+    keys = range(3000)
+    placed = [three.shard_for(k) for k in keys]
+    assert placed == [HashRing(["c", "b", "a"], vnodes=128).shard_for(k) for k in keys]
+    assert min(placed.count(s) for s in "abc") > 700
+
+    moved = [k for k in keys if three.shard_for(k) != four.shard_for(k)]
+    # Only keys claimed by the new shard move
+    assert all(four.shard_for(k) == "d" for k in moved)
+    assert 0.15 < len(moved) / len(keys) < 0.35
+
+
+def test_articles_are_written_to_their_authors_shard(client, sharded, authors):
+    created = []
+    for user in authors:
+        for n in range(2):
+            resp = client.post(
+                "/articles/", json={"title": f"{user.username}-{n}", "content": "x"}, headers=auth_headers(user)
+            )
+            assert resp.status_code == 201
+            created.append(resp.json())
+
+    rows = _shard_rows(sharded)
+    assert sum(len(r) for r in rows.values()) == len(created)
+    assert len({a["id"] for a in created}) == len(created)
+    for name, articles in rows.items():
+        assert all(sharded.shard_for_author(a.author_id) == name for a in articles)
+    assert len([name for name, articles in rows.items() if articles]) > 1
+
+
+def test_list_fans_out_and_single_author_reads_one_shard(client, sharded, authors):
+    for user in authors:
+        client.post("/articles/", json={"title": user.username, "content": "x"}, headers=auth_headers(user))
+    headers = auth_headers(authors[0])
+
+    everything = client.get("/articles/", params={"limit": 100}, headers=headers).json()
+    ids = [a["id"] for a in everything]
+    assert len(ids) == len(authors) and ids == sorted(ids)
+    page = client.get("/articles/", params={"limit": 2, "offset": 2}, headers=headers).json()
+    assert [a["id"] for a in page] == ids[2:4]
+
+    selects = _count_selects(sharded)
+    mine = client.get("/articles/", params={"author_id": authors[3].id}, headers=headers).json()
+    assert [a["title"] for a in mine] == ["author3"]
+    home = sharded.shard_for_author(authors[3].id)
+    assert selects[home] == 1
+    assert sum(selects.values()) == 1
+
+    found = client.get("/articles/search", params={"q": "author5"}, headers=headers).json()
+    assert [a["title"] for a in found] == ["author5"]
+
+
+def test_read_update_delete_by_id_and_stats(client, sharded, authors):
+    owner = authors[1]
+    headers = auth_headers(owner)
+    article = client.post("/articles/", json={"title": "T", "content": "x"}, headers=headers).json()
+    client.post("/articles/", json={"title": "Other", "content": "x"}, headers=auth_headers(authors[2]))
+
+    assert client.get(f"/articles/{article['id']}", headers=headers).json()["title"] == "T"
+    resp = client.put(f"/articles/{article['id']}", json={"title": "T2"}, headers=headers)
+    assert resp.status_code == 200 and resp.json()["version"] == 2
+
+    with Session(sharded.primary, expire_on_commit=False) as db:
+        editor = make_user(db, "editor", "editor@test.com", UserRole.editor)
+    stats = client.get("/stats/articles", headers=auth_headers(editor)).json()
+    assert stats["total"] == 2 and sum(d["article_count"] for d in stats["days"]) == 2
+    top = client.get("/stats/authors/top", headers=auth_headers(editor)).json()
+    assert sorted(row["author_id"] for row in top) == sorted([owner.id, authors[2].id])
+
+    assert client.delete(f"/articles/{article['id']}", headers=headers).status_code == 204
+    tombstones = _shard_rows(sharded, ArticleTombstone)
+    assert [t.article_id for t in tombstones[sharded.shard_for_author(owner.id)]] == [article["id"]]
+    assert client.get(f"/articles/{article['id']}", headers=headers).status_code == 404
+    assert client.get("/stats/articles", headers=auth_headers(editor)).json()["total"] == 1
+
+
+def test_incremental_sync_is_refused_while_sharded(client, sharded, authors):
+    resp = client.get("/articles/changes", headers=auth_headers(authors[0]))
+    assert resp.status_code == 501
+
+
+def test_shard_sessions_share_the_request_deadline_and_cancellation(sharded, monkeypatch):
+    monkeypatch.setattr(deadlines.settings, "STATEMENT_TIMEOUTS_MS", {"/articles/": 750})
+    request = Request({"type": "http", "path": "/articles/", "query_string": b"", "headers": [], "state": {}})
+    db = sharded.session()
+    deadlines.attach(db, request)
+    try:
+        timeouts = fan_out(db, lambda shard_db: shard_db.info["statement_timeout_ms"])
+        with shard_sessions(db) as sessions:
+            names = [name for name, _ in sessions]
+    finally:
+        db.close()
+
+    assert timeouts == [750] * len(sharded.shards)
+    assert names == list(sharded.shards)
+    # The primary session plus one per shard for each of fan_out and shard_sessions
+    assert len(deadlines.request_sessions(request.scope)) == 1 + 2 * len(sharded.shards)
+
+
+def test_overlapping_fan_outs_run_side_by_side(tmp_path):
+    shards = {f"s{i}": _sqlite(tmp_path / f"s{i}.db") for i in range(3)}
+    database = ShardedDatabase(_sqlite(tmp_path / "primary.db"), shards, vnodes=8, concurrency=2)
+    # Only passes if both requests' shard queries hold a worker at the same time
+    everyone = threading.Barrier(2 * len(shards), timeout=5)
+    results = []
+    requests = [
+        threading.Thread(target=lambda: results.append(database.fan_out(lambda shard_db: everyone.wait())))
+        for _ in range(2)
+    ]
+    try:
+        for t in requests:
+            t.start()
+        for t in requests:
+            t.join()
+    finally:
+        database.dispose()
+    assert len(results) == 2
+
+
+def test_article_ids_come_from_the_primary_in_blocks(sharded):
+    other_worker = ShardedDatabase(sharded.primary, sharded.shards, vnodes=64, id_block_size=sharded.id_block_size)
+    mine = [sharded.allocate_article_id() for _ in range(3)]
+    theirs = [other_worker.allocate_article_id() for _ in range(3)]
+    assert mine == [1, 2, 3]
+    assert theirs == [sharded.id_block_size + 1, sharded.id_block_size + 2, sharded.id_block_size + 3]
+    with sharded.primary.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(article_ids)).scalar() == 2
+
+
+def test_notify_runs_on_the_authors_shard_with_the_write(sharded, authors):
+    notified = {name: [] for name in sharded.shards}
+    for name, engine in sharded.shards.items():
+        def register(dbapi_connection, record, name=name):
+            dbapi_connection.create_function("pg_notify", 2, lambda channel, payload: notified[name].append(payload))
+        event.listen(engine, "connect", register)
+        engine.dispose()
+
+    author = authors[0]
+    with sharded.session() as db:
+        SqlArticleRepository(db, PostgresBroker(sharded.primary, sharded.shards.values())).create(
+            {"title": "T", "content": "x"}, author.id
+        )
+
+    # The primary has no pg_notify here, so a NOTIFY sent there would have failed the write
+    shard = sharded.shard_for_author(author.id)
+    assert {name: len(payloads) for name, payloads in notified.items()} == {
+        name: int(name == shard) for name in sharded.shards
+    }
+    assert json.loads(notified[shard][0])["author_id"] == author.id
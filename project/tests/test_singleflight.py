@@ -0,0 +1,149 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.services.singleflight import SingleFlight
+from tests.conftest import auth_headers
+
+
+def _run_concurrently(flight, fn, n):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", fn))) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    threads, results = _run_concurrently(flight, fn, 5)
+    while flight.executed + flight.coalesced < 5:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len({id(r) for r in results}) == 1
+    assert flight.stats() == {"executed": 1, "coalesced": 4, "gave_up": 0, "in_flight": 0}
+
+
+def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flight.do("k", lambda: 42) == 42
+    assert flight.executed == 2
+
+
+def test_waiter_gives_up_after_timeout_and_runs_its_own_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do("k", lambda: release.wait(5)))
+    leader.start()
+    while flight.executed == 0:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    assert flight.do("k", lambda: "own", timeout=0.05) == "own"
+    assert time.monotonic() - started < 1
+    release.set()
+    leader.join()
+    assert flight.gave_up == 1
+
+
+def test_unshared_errors_make_waiters_run_their_own_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def cancelled():
+        release.wait(5)
+        raise RuntimeError("cancelled")
+
+    def lead():
+        try:
+            flight.do("k", cancelled)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    while flight.executed == 0:
+        time.sleep(0.01)
+    follower = threading.Thread(
+        target=lambda: errors.append(flight.do("k", lambda: "own", share_error=lambda exc: False))
+    )
+    follower.start()
+    while flight.coalesced == 0:
+        time.sleep(0.01)
+    release.set()
+    leader.join()
+    follower.join()
+    assert sorted(map(str, errors)) == ["cancelled", "own"]
+
+
+def test_disconnected_leader_does_not_fail_other_readers(regular_user, sample_article):
+    from app.routers.articles import _read_article_or_404, article_reads
+
+    release = threading.Event()
+
+    class CancelledRepo:
+        def get(self, article_id):
+            # The leader's client goes away and cancel_session interrupts its query
+            release.wait(5)
+            raise OperationalError("SELECT", {}, sqlite3.OperationalError("interrupted"))
+
+    class Repo:
+        def get(self, article_id):
+            return sample_article
+
+    outcomes = {}
+
+    def read(name, repo):
+        try:
+            outcomes[name] = _read_article_or_404(sample_article.id, repo).title
+        except OperationalError:
+            outcomes[name] = "cancelled"
+
+    before = article_reads.coalesced
+    leader = threading.Thread(target=read, args=("leader", CancelledRepo()))
+    leader.start()
+    while sample_article.id not in article_reads._calls:
+        time.sleep(0.01)
+    follower = threading.Thread(target=read, args=("follower", Repo()))
+    follower.start()
+    while article_reads.coalesced == before:
+        time.sleep(0.01)
+    release.set()
+    leader.join()
+    follower.join()
+    assert outcomes == {"leader": "cancelled", "follower": sample_article.title}
+
+
+def test_get_article_uses_single_flight(client, regular_user, sample_article):
+    from app.routers.articles import article_reads
+
+    before = article_reads.executed
+    resp = client.get(f"/articles/{sample_article.id}", headers=auth_headers(regular_user))
+    assert resp.status_code == 200
+    assert resp.json()["title"] == "Test Article"
+    assert article_reads.executed == before + 1
+
+
+def test_metrics_admin_only(client, admin_user, regular_user):
+    assert client.get("/metrics/", headers=auth_headers(regular_user)).status_code == 403
+    resp = client.get("/metrics/", headers=auth_headers(admin_user))
+    assert resp.status_code == 200
+    assert "coalesced" in resp.json()["article_reads"]
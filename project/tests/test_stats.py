@@ -0,0 +1,38 @@
+from tests.conftest import auth_headers
+
+
+def _create(client, user, n):
+    for i in range(n):
+        resp = client.post(
+            "/articles/", json={"title": f"T{i}", "content": "c"}, headers=auth_headers(user)
+        )
+        assert resp.status_code == 201
+    return resp.json()
+
+
+def test_stats_follow_creates_and_deletes(client, admin_user, regular_user, editor_user):
+    _create(client, regular_user, 3)
+    last = _create(client, editor_user, 1)
+
+    resp = client.get("/stats/articles", headers=auth_headers(admin_user))
+    assert resp.status_code == 200
+    assert resp.json()["total"] == 4
+    assert sum(d["article_count"] for d in resp.json()["days"]) == 4
+
+    client.delete(f"/articles/{last['id']}", headers=auth_headers(admin_user))
+    top = client.get("/stats/authors/top", headers=auth_headers(admin_user)).json()
+    assert top == [{"author_id": regular_user.id, "article_count": 3}]
+
+
+def test_stats_date_range(client, editor_user):
+    created = _create(client, editor_user, 2)
+    day = created["created_at"][:10]
+    resp = client.get(f"/stats/articles?start={day}&end={day}", headers=auth_headers(editor_user))
+    assert resp.json()["total"] == 2
+    resp = client.get("/stats/articles?end=2000-01-01", headers=auth_headers(editor_user))
+    assert resp.json() == {"total": 0, "days": []}
+
+
+def test_stats_forbidden_for_user(client, regular_user):
+    assert client.get("/stats/articles", headers=auth_headers(regular_user)).status_code == 403
+    assert client.get("/stats/authors/top", headers=auth_headers(regular_user)).status_code == 403
@@ -0,0 +1,153 @@
+import pytest
+
+from app.models.article import Article
+from app.services import suggest
+from app.services.suggest import TitleIndex, sync_title_index
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def warm_index(db, monkeypatch):
+    index = TitleIndex(max_entries=100, key_chars=8)
+    monkeypatch.setattr(suggest, "title_index", index)
+    import app.routers.articles as articles_router
+
+    monkeypatch.setattr(articles_router, "title_index", index)
+    index.load(db.query(Article.id, Article.title))
+    return index
+
+
+def _add(db, user, title):
+    article = Article(title=title, content="c", author_id=user.id)
+    db.add(article)
+    db.commit()
+    return article
+
+
+def _suggest(client, user, prefix):
+    resp = client.get("/articles/suggest", params={"prefix": prefix}, headers=auth_headers(user))
+    assert resp.status_code == 200
+    return [row["title"] for row in resp.json()]
+
+
+def test_prefix_lookup_is_case_insensitive():
+    index = TitleIndex(max_entries=10, key_chars=64)
+    index.load([(1, "Python tips"), (2, "pytest fixtures"), (3, "Rust"), (4, "PYTHON internals")])
+    assert [r["title"] for r in index.search("py", 10)] == ["pytest fixtures", "PYTHON internals", "Python tips"]
+    assert [r["id"] for r in index.search("python", 1)] == [4]
+    assert index.search("go", 10) == []
+
+
+def test_long_prefix_is_checked_against_full_title():
+    index = TitleIndex(max_entries=10, key_chars=4)
+    index.load([(1, "Database tuning"), (2, "Database backups")])
+    assert [r["id"] for r in index.search("database b", 10)] == [2]
+
+
+def test_index_goes_cold_past_capacity():
+    index = TitleIndex(max_entries=2, key_chars=8)
+    assert index.load([(1, "a"), (2, "b"), (3, "c")]) is False
+    assert index.search("a", 10) is None
+    assert index.load([(1, "a")]) is True
+    index.add(2, "b")
+    index.add(3, "c")
+    assert index.warm is False
+
+
+def test_writes_update_the_index(client, db, warm_index, regular_user):
+    resp = client.post("/articles/", json={"title": "Indexing basics", "content": "c"}, headers=auth_headers(regular_user))
+    article_id = resp.json()["id"]
+    assert _suggest(client, regular_user, "index") == ["Indexing basics"]
+
+    client.put(f"/articles/{article_id}", json={"title": "Sharding basics"}, headers=auth_headers(regular_user))
+    assert _suggest(client, regular_user, "index") == []
+    assert _suggest(client, regular_user, "shard") == ["Sharding basics"]
+
+    client.delete(f"/articles/{article_id}", headers=auth_headers(regular_user))
+    assert _suggest(client, regular_user, "shard") == []
+
+
+def test_rolled_back_write_is_not_indexed(db, warm_index, regular_user):
+    db.add(Article(title="Ghost", content="c", author_id=regular_user.id))
+    db.flush()
+    db.rollback()
+    assert warm_index.search("gh", 10) == []
+
+
+def test_sync_catches_up_from_the_change_feed(db, regular_user):
+    # Not the module index, so commits here reach it only through the feed, like another worker's
+    index = TitleIndex(max_entries=10, key_chars=8)
+    first = _add(db, regular_user, "Feed one")
+    assert index.search("feed", 10) is None
+    assert sync_title_index(index, db) == 1
+    assert index.warm
+
+    second = _add(db, regular_user, "Feed two")
+    first.title = "Fed"
+    db.commit()
+    assert sync_title_index(index, db) == 2
+    assert index.search("fe", 10) == [{"id": first.id, "title": "Fed"}, {"id": second.id, "title": "Feed two"}]
+    assert sync_title_index(index, db) == 0
+
+
+def test_sync_past_capacity_stays_cold(db, regular_user):
+    index = TitleIndex(max_entries=2, key_chars=8)
+    for title in ("a", "b", "c"):
+        _add(db, regular_user, title)
+    sync_title_index(index, db)
+    assert index.warm is False
+    assert index.search("a", 10) is None
+    sync_title_index(index, db)
+    assert len(index) == 0
+
+
+def test_cold_index_falls_back_to_database(client, db, monkeypatch, regular_user):
+    cold = TitleIndex()
+    import app.routers.articles as articles_router
+
+    monkeypatch.setattr(articles_router, "title_index", cold)
+    _add(db, regular_user, "Caching 101")
+    _add(db, regular_user, "Cache_me")
+    assert _suggest(client, regular_user, "Cach") == ["Cache_me", "Caching 101"]
+    assert _suggest(client, regular_user, "Cache_") == ["Cache_me"]
+    assert cold.stats()["misses"] == 2
+
+
+def test_suggest_requires_prefix(client, regular_user):
+    assert client.get("/articles/suggest", headers=auth_headers(regular_user)).status_code == 422
+
+
+def test_readding_an_id_replaces_its_title():
+    index = TitleIndex(max_entries=10, key_chars=8)
+    index.load([(1, "Alpha"), (2, "Beta")])
+    index.add(1, "Alpine")
+    index.add(1, "Alps")
+    assert index.search("alp", 10) == [{"id": 1, "title": "Alps"}]
+    assert len(index) == 2
+    index.remove(1)
+    assert index.search("al", 10) == []
+
+
+def test_writes_during_a_rebuild_survive_the_swap():
+    index = TitleIndex(max_entries=10, key_chars=8)
+    index.load([(1, "Old")])
+
+    def rows():
+        yield 1, "Old"
+        # Commits that land after the rebuild read the table
+        index.add(2, "Fresh")
+        index.remove(1)
+
+    assert index.load(rows()) is True
+    assert [r["id"] for r in index.search("", 10)] == [2]
+
+
+def test_delta_is_merged_into_the_base():
+    index = TitleIndex(max_entries=1000, key_chars=8)
+    index.load([(i, f"title {i:03}") for i in range(100)])
+    for i in range(100, 300):
+        index.add(i, f"title {i:03}")
+    index.remove(5)
+    assert index.stats()["pending_merge"] < 100
+    found = index.search("title", 1000)
+    assert [r["id"] for r in found] == [i for i in range(300) if i != 5]
@@ -0,0 +1,82 @@
+import time
+
+import anyio
+import pytest
+from anyio import to_thread
+
+from app.config import settings
+from app.services import threadpool
+from tests.conftest import auth_headers
+
+
+@pytest.fixture(autouse=True)
+def reset_monitor(monkeypatch):
+    monkeypatch.setattr(threadpool, "_monitor", None)
+
+
+def test_install_resizes_and_probes_waits():
+    async def run():
+        monitor = threadpool.install(1)
+        assert to_thread.current_default_thread_limiter().total_tokens == 1
+        assert threadpool.install(1) is monitor
+
+        idle = await monitor.probe()
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(to_thread.run_sync, time.sleep, 0.1)
+            await anyio.sleep(0.01)
+            assert monitor.stats()["active"] == 1
+            busy = await monitor.probe()
+        return idle, busy
+
+    idle, busy = anyio.run(run)
+    stats = threadpool.stats()
+    assert stats["size"] == 1
+    assert stats["probes"] == 2
+    # The busy probe waited behind the ~100ms sleep that held the only token
+    assert idle < 0.05 and busy >= 0.05
+    assert stats["last_wait_ms"] == round(busy * 1000, 3)
+    assert stats["waited"] >= 1 and stats["max_wait_ms"] >= 50
+    assert stats["active"] == 0 and stats["waiting"] == 0
+
+
+def test_uninstalled_stats_report_configured_size():
+    assert threadpool.stats() == {"size": settings.THREADPOOL_SIZE, "instrumented": False}
+
+
+def test_request_wait_runs_until_it_gets_a_worker_thread():
+    async def run():
+        threadpool.install(1)
+        wait = threadpool.RequestWait()
+        threadpool.request_wait.set(wait)
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(to_thread.run_sync, time.sleep, 0.1)
+            await anyio.sleep(0.01)
+            await to_thread.run_sync(threadpool.measure_wait)
+            # Only the first worker thread of a request counts
+            await to_thread.run_sync(threadpool.measure_wait)
+        return wait, threadpool.current_wait()
+
+    wait, current = anyio.run(run)
+    assert 0.05 <= wait.seconds < 0.5
+    assert current == wait.seconds
+
+
+def test_each_request_reports_its_own_wait(client, regular_user, monkeypatch):
+    seen = []
+    monkeypatch.setattr(threadpool, "note_request", lambda wait, duration: seen.append((wait, duration)))
+    assert client.get("/articles/", headers=auth_headers(regular_user)).status_code == 200
+    [(wait, duration)] = seen
+    assert 0 < wait <= duration
+
+
+def test_wait_dominated_requests_are_flagged(caplog):
+    async def run():
+        return threadpool.install(4)
+
+    monitor = anyio.run(run)
+    assert threadpool.note_request(wait=0.01, duration=0.2) is False
+    assert threadpool.note_request(wait=0.001, duration=0.002) is False
+    with caplog.at_level("WARNING", logger="app.services.threadpool"):
+        assert threadpool.note_request(wait=0.15, duration=0.2) is True
+    assert monitor.wait_dominated == 1
+    assert caplog.records[-1].threadpool_wait_ms == 150.0
@@ -1,4 +1,7 @@
-﻿from tests.conftest import auth_headers
+﻿from app.config import settings
+from app.services.auth import verify_password
+from app.services.users import hash_passwords, shutdown_hash_pool
+from tests.conftest import auth_headers
 
 
 def test_list_users_as_admin(client, admin_user, regular_user):
@@ -124,3 +127,74 @@ def test_get_me(client, regular_user):
 def test_get_me_unauthenticated(client):
     resp = client.get("/users/me")
     assert resp.status_code == 401
+
+
+def test_get_users_by_ids(client, admin_user, regular_user, editor_user):
+    resp = client.get(
+        f"/users/batch?ids={editor_user.id},99999,{regular_user.id}",
+        headers=auth_headers(admin_user),
+    )
+    assert resp.status_code == 200
+    assert [u["username"] for u in resp.json()["items"]] == ["editor", "user1"]
+    assert resp.json()["missing"] == [99999]
+
+
+def test_get_users_by_ids_forbidden_for_user(client, regular_user):
+    resp = client.get(f"/users/batch?ids={regular_user.id}", headers=auth_headers(regular_user))
+    assert resp.status_code == 403
+
+
+def _new_user(name, **extra):
+    return {"username": name, "email": f"{name}@example.com", "password": "pw123456", **extra}
+
+
+def test_bulk_create_users(client, admin_user, regular_user):
+    payload = [
+        _new_user("bulk1"),
+        _new_user("bulk2", role="editor"),
+        _new_user(regular_user.username),
+        {**_new_user("bulk3"), "email": "bulk1@example.com"},
+        _new_user("bulk1"),
+    ]
+    resp = client.post("/users/bulk", json=payload, headers=auth_headers(admin_user))
+    assert resp.status_code == 200
+    assert resp.json() == {"created": 2, "skipped": [regular_user.username, "bulk3", "bulk1"]}
+
+    login = client.post("/auth/login", data={"username": "bulk2", "password": "pw123456"})
+    assert login.status_code == 200
+
+
+def test_bulk_create_users_limits(client, admin_user, regular_user, monkeypatch):
+    assert client.post("/users/bulk", json=[], headers=auth_headers(regular_user)).status_code == 403
+    monkeypatch.setattr(settings, "USER_BULK_MAX_ROWS", 1)
+    payload = [_new_user("a1"), _new_user("a2")]
+    assert client.post("/users/bulk", json=payload, headers=auth_headers(admin_user)).status_code == 422
+
+
+def test_hash_pool_shares_the_cpus_between_server_workers(monkeypatch):
+    from app.services import users
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 0)
+    monkeypatch.setattr(users, "available_cpus", lambda: 8)
+    monkeypatch.setattr(users, "worker_count", lambda: 4)
+    assert users._hash_workers() == 2
+    monkeypatch.setattr(users, "worker_count", lambda: 16)
+    assert users._hash_workers() == 1
+
+
+def test_hash_passwords_in_process_pool(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_PARALLEL_MIN", 1)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 2)
+    try:
+        hashes = hash_passwords(["a", "b", "c"])
+    finally:
+        shutdown_hash_pool()
+    # Workers inherit the test's cheap bcrypt policy
+    assert all(h.startswith("$2b$04$") for h in hashes)
+    assert [verify_password(p, h) for p, h in zip("abc", hashes)] == [True, True, True]
+
+
+def test_list_users_without_trailing_slash_still_lists(client, admin_user):
+    resp = client.get("/users", headers=auth_headers(admin_user))
+    assert resp.status_code == 200
+    assert [u["username"] for u in resp.json()] == ["admin"]
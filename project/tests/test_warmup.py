@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import create_engine
+
+from app.models.user import User
+from app.services import suggest, warmup
+from app.services.suggest import TitleIndex
+from tests.conftest import _savepoint_session
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(warmup, "state", {"ready": False, "duration_ms": None, "steps": {}})
+    monkeypatch.setattr(suggest, "title_index", TitleIndex())
+
+
+def test_not_ready_until_warm_up_finishes(client, connection, sample_article):
+    assert client.get("/health/ready").status_code == 503
+    assert client.get("/health").status_code == 200
+
+    warmup.warm_up(bind=connection, session_factory=lambda: _savepoint_session(connection))
+
+    resp = client.get("/health/ready")
+    assert resp.status_code == 200
+    steps = resp.json()["warmup"]["steps"]
+    assert steps["queries"]["result"] >= 2
+    assert steps["title_index"]["result"] == 1
+    assert "pool" not in steps
+    assert suggest.title_index.search(sample_article.title[:3], 5)[0]["id"] == sample_article.id
+
+
+def test_failed_step_still_becomes_ready(connection, monkeypatch):
+    def broken(db):
+        raise RuntimeError("db unavailable")
+
+    monkeypatch.setattr(warmup, "run_hot_queries", broken)
+    state = warmup.warm_up(bind=connection, session_factory=lambda: _savepoint_session(connection))
+    assert state["ready"] is True
+    assert state["steps"]["queries"] == {"error": "db unavailable"}
+
+
+def test_failed_step_does_not_break_the_next_ones(connection, monkeypatch, sample_article):
+    def broken(db):
+        # A failed flush leaves the session needing a rollback
+        db.add(User())
+        db.flush()
+
+    monkeypatch.setattr(warmup, "run_hot_queries", broken)
+    state = warmup.warm_up(bind=connection, session_factory=lambda: _savepoint_session(connection))
+    assert "error" in state["steps"]["queries"]
+    assert state["steps"]["title_index"]["result"] == 1
+
+
+def test_pool_connections_are_opened_and_returned(tmp_path):
+    bind = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=3)
+    try:
+        assert warmup.open_pool_connections(bind, 3) == 3
+        assert bind.pool.checkedin() == 3
+        assert bind.pool.checkedout() == 0
+    finally:
+        bind.dispose()